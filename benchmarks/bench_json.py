@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark các JSON backend của utils.json_codec trên văn bản thật
+
+Đo cho từng backend (orjson nếu được cài, thư viện chuẩn): giải mã các file đầu vào (văn bản
+tiếng Việt đã sửa chính tả), mã hóa kết quả trích xuất của chúng ở dạng indent=2 (mặc định)
+và dạng gọn (--compact), kèm kích thước đầu ra của từng dạng. Kết quả mã hóa của các backend
+được so sánh để chắc chắn giống hệt nhau. orjson.loads được đo riêng để so với json.loads
+(backend orjson giải mã bằng thư viện chuẩn vì nhanh hơn với văn bản dài).
+
+Cách chạy:
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --input-dir pdf-ocr-extractor/spelling_fixed_json --runs 20
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from main import LawDocumentProcessor
+from utils.json_codec import CODECS, StdlibCodec
+
+
+def load_corpus(input_dir: Path):
+    """(nội dung các file đầu vào, kết quả trích xuất của chúng)"""
+    processor = LawDocumentProcessor(str(input_dir))
+    codec = StdlibCodec()
+    raw_files, results = [], []
+    for file_path in sorted(input_dir.glob('*/*.json')):
+        # Như bước đọc của pipeline: file được đọc thành chuỗi rồi mới parse
+        raw = file_path.read_text(encoding='utf-8')
+        raw_files.append(raw)
+        doc_type = file_path.parent.name
+        if doc_type in processor.processors:
+            data = codec.loads(raw)
+            result = processor.processors[doc_type].process(data['text'], data.get('filename', ''))
+            if result:
+                results.append(result)
+    return raw_files, results
+
+
+def measure(func, items, runs: int) -> float:
+    """Thời gian (trung vị, giây) để chạy func trên mọi phần tử"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark các JSON backend trên văn bản thật")
+    parser.add_argument("--input-dir", default="pdf-ocr-extractor/spelling_fixed_json",
+                        help="Thư mục chứa file JSON đầu vào (chia theo loại văn bản)")
+    parser.add_argument("--runs", type=int, default=10, help="Số lần đo cho mỗi phép đo")
+    args = parser.parse_args()
+
+    input_dir = ROOT_DIR / args.input_dir
+    raw_files, results = load_corpus(input_dir)
+    if not raw_files:
+        print(f"❌ Không tìm thấy file đầu vào trong {args.input_dir}")
+        return 1
+
+    codecs = []
+    for name, codec_class in CODECS.items():
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            print(f"⚠️  Bỏ qua backend {name}: chưa được cài")
+
+    input_mb = sum(len(raw.encode('utf-8')) for raw in raw_files) / 1e6
+    stdlib = StdlibCodec()
+    sizes = {
+        "indent=2": sum(len(stdlib.dumps(result, indent=2).encode('utf-8')) for result in results),
+        "gọn": sum(len(stdlib.dumps(result, compact=True).encode('utf-8')) for result in results),
+    }
+    output_mb = sizes["indent=2"] / 1e6
+    print(f"📄 {len(raw_files)} file đầu vào ({input_mb:.1f} MB), {len(results)} kết quả trích xuất "
+          f"({output_mb:.1f} MB với indent=2), {args.runs} lần đo (trung vị)")
+    print(f"📦 Kích thước đầu ra: indent=2 {sizes['indent=2'] / 1e6:.2f} MB, "
+          f"gọn {sizes['gọn'] / 1e6:.2f} MB ({sizes['gọn'] / sizes['indent=2']:.0%})")
+
+    print(f"   {'Backend':<8} {'đọc MB/s':>9} {'ghi indent=2 MB/s':>18} {'ghi gọn MB/s':>13}")
+    for codec in codecs:
+        for result in results:
+            if codec.dumps(result, indent=2) != stdlib.dumps(result, indent=2):
+                print(f"❌ Backend {codec.name} cho kết quả khác thư viện chuẩn")
+                return 1
+        read = measure(codec.loads, raw_files, args.runs)
+        write = measure(lambda result: codec.dumps(result, indent=2), results, args.runs)
+        write_compact = measure(lambda result: codec.dumps(result, compact=True), results, args.runs)
+        print(f"   {codec.name:<8} {input_mb / read:9.1f} {output_mb / write:18.1f} "
+              f"{sizes['gọn'] / 1e6 / write_compact:13.1f}")
+
+    try:
+        import orjson
+    except ImportError:
+        return 0
+    read = measure(orjson.loads, raw_files, args.runs)
+    print(f"   orjson.loads trực tiếp: {input_mb / read:.1f} MB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: chi phí regex trên mỗi văn bản khi dùng pattern dạng chuỗi
+(re.search(pattern, text, flags) - đi qua cache của module re ở mỗi lần gọi)
+so với pattern đã biên dịch sẵn trong BaseProcessor._pattern_registry
+
+Cách chạy:
+    python benchmarks/bench_patterns.py
+    python benchmarks/bench_patterns.py --input-dir pdf-ocr-extractor/spelling_fixed_json --repeat 20
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import LawDocumentProcessor
+from processors.base_processor import BaseProcessor
+from utils.file_utils import read_json_file, get_all_json_files
+
+
+def load_texts(input_dir: Path, limit_chars: int):
+    """Đọc text của toàn bộ văn bản trong input_dir"""
+    texts = []
+    for doc_type_dir in sorted(input_dir.iterdir()):
+        if doc_type_dir.is_dir():
+            for file_path in get_all_json_files(doc_type_dir):
+                data = read_json_file(file_path)
+                if data and data.get('text'):
+                    texts.append(data['text'][:limit_chars] if limit_chars else data['text'])
+    return texts
+
+
+def run_string_patterns(patterns, texts):
+    """Mỗi lần gọi truyền pattern dạng chuỗi, như cách làm cũ"""
+    for text in texts:
+        for pattern in patterns:
+            re.search(pattern.pattern, text, pattern.flags)
+
+
+def run_compiled_patterns(patterns, texts):
+    """Gọi thẳng trên pattern đã biên dịch trong registry"""
+    for text in texts:
+        for pattern in patterns:
+            pattern.search(text)
+
+
+def best_of(func, repeat, *args):
+    """Thời gian tốt nhất sau `repeat` lần chạy"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark registry pattern đã biên dịch")
+    parser.add_argument("--input-dir", default="pdf-ocr-extractor/spelling_fixed_json",
+                        help="Thư mục chứa file JSON đầu vào")
+    parser.add_argument("--repeat", type=int, default=10, help="Số lần lặp mỗi phép đo")
+    parser.add_argument("--limit-chars", type=int, default=0,
+                        help="Chỉ dùng N ký tự đầu mỗi văn bản (0 = toàn bộ), để tách riêng chi phí gọi")
+    args = parser.parse_args()
+
+    # Khởi tạo toàn bộ processor để registry chứa đủ pattern của 21 loại văn bản
+    LawDocumentProcessor(args.input_dir).processors.load_all()
+    patterns = list(BaseProcessor._pattern_registry.values())
+    texts = load_texts(Path(args.input_dir), args.limit_chars)
+    if not texts:
+        print(f"❌ Không tìm thấy văn bản trong {args.input_dir}")
+        return 1
+
+    string_time = best_of(run_string_patterns, args.repeat, patterns, texts)
+    compiled_time = best_of(run_compiled_patterns, args.repeat, patterns, texts)
+    saved = string_time - compiled_time
+
+    print(f"📄 Văn bản: {len(texts)}, pattern trong registry: {len(patterns)}")
+    print(f"   Pattern dạng chuỗi : {string_time / len(texts) * 1e6:10.1f} µs/văn bản")
+    print(f"   Pattern đã biên dịch: {compiled_time / len(texts) * 1e6:10.1f} µs/văn bản")
+    print(f"   Tiết kiệm          : {saved / len(texts) * 1e6:10.1f} µs/văn bản "
+          f"({saved / string_time * 100:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Benchmark toàn bộ pipeline trên bộ văn bản tổng hợp (benchmarks/synthetic_corpus.py)
+
+Hai phần đo:
+- Từng processor: mỗi văn bản (21 loại x các kích thước x bản sạch/bản lỗi OCR) được xử lý
+  --runs lần trong process hiện tại; báo cáo văn bản/giây và độ trễ p50/p99 theo loại và
+  kích thước.
+- main.py: chạy chương trình như người dùng (process riêng, đọc/ghi file) ở chế độ batch và
+  --stream; báo cáo thời gian, văn bản/giây và bộ nhớ đỉnh (peak RSS) của process đó.
+
+Kết quả được so với baseline đã lưu (benchmarks/baselines/pipeline.json): mỗi chỉ số in kèm
+mức thay đổi so với baseline, chỉ số chậm đi/tốn bộ nhớ hơn quá ngưỡng được đánh dấu. Chỉ so
+sánh khi baseline được đo với cùng cấu hình bộ văn bản; số liệu phụ thuộc máy nên baseline
+cần được đo lại (--save-baseline) khi đổi máy.
+
+Cách chạy:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 2,20 --runs 5 --skip-main
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --check          # exit 1 nếu có chỉ số vượt ngưỡng
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from processors.registry import ProcessorRegistry
+from synthetic_corpus import (DEFAULT_NOISE_RATE, DEFAULT_SIZES_KB, generate_corpus, generate_text,
+                              parse_sizes, write_corpus)
+
+DEFAULT_BASELINE = ROOT_DIR / "benchmarks" / "baselines" / "pipeline.json"
+
+# Các chế độ chạy main.py được đo: tên -> tham số thêm vào dòng lệnh
+MAIN_MODES = {
+    "batch": [],
+    "stream": ["--stream"],
+}
+
+# Mức thay đổi (tỷ lệ) được coi là chậm đi/tốn bộ nhớ hơn
+DEFAULT_THRESHOLD = 0.25
+
+# Độ trễ chỉ bị coi là chậm đi khi tăng thêm ít nhất chừng này (ms): với văn bản nhỏ, nhiễu đo
+# đã lớn hơn ngưỡng tỷ lệ
+MIN_LATENCY_DELTA_MS = 1.0
+
+# p99 của vài chục mẫu gần như là lần chậm nhất (GC, tải máy): ngưỡng tỷ lệ gấp đôi và mức
+# tăng tuyệt đối tối thiểu lớn hơn
+P99_THRESHOLD_FACTOR = 2.0
+MIN_TAIL_DELTA_MS = 5.0
+
+
+def calibrate(runs: int = 7) -> float:
+    """
+    Thời gian (ms, nhỏ nhất của các lần đo) của một khối việc cố định không phụ thuộc code của
+    dự án: regex, lower() và tách dòng trên một văn bản tổng hợp. Tỷ lệ giữa hai lần đo cho
+    biết máy đang nhanh/chậm hơn lúc đo baseline bao nhiêu (tải máy, tần số CPU)
+    """
+    text = generate_text("Luật", 200 * 1024, seed=0)
+    pattern = re.compile(r'(?:Điều|Chương|Căn cứ)\s+[^\n]{0,40}', re.IGNORECASE)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(5):
+            len(pattern.findall(text))
+            text.lower()
+            sum(len(line.strip()) for line in text.split('\n'))
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Phân vị q (0-100) theo nội suy tuyến tính"""
+    ordered = sorted(samples)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def bench_processors(documents, runs: int) -> Dict[str, Dict[str, float]]:
+    """
+    Độ trễ của từng processor, nhóm theo "<loại văn bản>|<kích thước>kb"
+
+    Returns:
+        {nhóm: {"docs", "docs_per_sec", "p50_ms", "p99_ms"}}
+    """
+    registry = ProcessorRegistry()
+    timings: Dict[str, List[float]] = {}
+    # Lần chạy đầu tiên khởi động processor và cache regex, không tính vào kết quả
+    for doc in documents:
+        registry[doc.doc_type].process(doc.text, doc.filename)
+
+    # Các lần đo xen kẽ giữa mọi văn bản: máy chậm đi trong chốc lát ảnh hưởng đều mọi loại
+    # văn bản thay vì dồn vào vài loại đang được đo liên tiếp
+    for _ in range(runs):
+        for doc in documents:
+            processor = registry[doc.doc_type]
+            # Bản sao mới mỗi lần: document_scanner giữ mốc của object text gần nhất, xử lý
+            # lại cùng một object sẽ đo cache thay vì đo một văn bản mới như trong pipeline
+            text = doc.text[:1] + doc.text[1:]
+            start = time.perf_counter()
+            processor.process(text, doc.filename)
+            timings.setdefault(f"{doc.doc_type}|{doc.size_kb}kb", []).append(time.perf_counter() - start)
+
+    return {
+        key: {
+            "docs": len(samples) // runs,
+            "docs_per_sec": round(len(samples) / sum(samples), 2),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        }
+        for key, samples in timings.items()
+    }
+
+
+def run_main(input_dir: Path, output_dir: Path, extra_args: List[str], docs: int) -> Dict[str, float]:
+    """
+    Chạy main.py trong process riêng
+
+    Returns:
+        {"wall_s", "docs_per_sec", "peak_rss_mb"} - peak RSS lấy từ rusage của chính process đó
+    """
+    command = [sys.executable, str(ROOT_DIR / "main.py"), "--input-dir", str(input_dir),
+               "--output-dir", str(output_dir)] + extra_args
+    start = time.perf_counter()
+    child = subprocess.Popen(command, cwd=str(ROOT_DIR), stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(child.pid, 0)
+    wall = time.perf_counter() - start
+    child.returncode = os.waitstatus_to_exitcode(status)
+    if child.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(extra_args)} thoát với mã {child.returncode}")
+
+    # ru_maxrss tính bằng KB trên Linux, byte trên macOS
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return {
+        "wall_s": round(wall, 3),
+        "docs_per_sec": round(docs / wall, 2),
+        "peak_rss_mb": round(peak_rss / 2 ** 20, 1),
+    }
+
+
+def compare(value: float, base: Optional[float], higher_is_better: bool, threshold: float,
+            min_delta: float = 0.0, flag: bool = True):
+    """
+    (chuỗi mức thay đổi so với baseline, có vượt ngưỡng hay không)
+
+    Args:
+        min_delta: Mức tăng tuyệt đối tối thiểu để bị coi là vượt ngưỡng (chỉ số càng nhỏ càng tốt)
+        flag: False nếu chỉ số chỉ để tham khảo, không bao giờ bị coi là vượt ngưỡng
+    """
+    if not base:
+        return "", False
+    change = value / base - 1
+    if not flag:
+        regressed = False
+    elif higher_is_better:
+        regressed = -change > threshold
+    else:
+        regressed = change > threshold and value - base >= min_delta
+    return f"{change:+.0%}{' ⚠️' if regressed else ''}", regressed
+
+
+def print_report(results: Dict, baseline: Optional[Dict], threshold: float) -> int:
+    """
+    In kết quả (kèm mức thay đổi so với baseline), trả về số chỉ số vượt ngưỡng
+
+    Thời gian được quy về tốc độ máy lúc đo baseline (theo tỷ lệ của calibrate()) trước khi so
+    sánh; bộ nhớ được so trực tiếp.
+    """
+    regressions = 0
+    scale = 1.0
+    if baseline and baseline.get("calibration_ms"):
+        scale = results["calibration_ms"] / baseline["calibration_ms"]
+        print(f"⚙️  Máy đang chạy {'chậm' if scale > 1 else 'nhanh'} hơn lúc đo baseline "
+              f"{abs(scale - 1):.0%} (khối việc cố định), thời gian được quy đổi trước khi so sánh")
+    base_processors = (baseline or {}).get("processors", {})
+    print(f"   {'Loại văn bản':<20} {'KB':>5} {'văn bản/s':>10} {'':>7} {'p50 ms':>9} {'':>7} "
+          f"{'p99 ms':>9} {'':>7}")
+    for key, stats in results["processors"].items():
+        doc_type, size = key.split('|')
+        base = base_processors.get(key, {})
+        # Văn bản/s của processor là nghịch đảo độ trễ trung bình: chỉ in để tham khảo, mức chậm
+        # đi được xét trên p50/p99 (có ngưỡng tuyệt đối để bỏ qua nhiễu của văn bản nhỏ)
+        delta, _ = compare(stats["docs_per_sec"] * scale, base.get("docs_per_sec"), True, threshold, flag=False)
+        cells = [f"{stats['docs_per_sec']:10.1f} {delta:>7}"]
+        for name, factor, min_delta in (("p50_ms", 1.0, MIN_LATENCY_DELTA_MS),
+                                        ("p99_ms", P99_THRESHOLD_FACTOR, MIN_TAIL_DELTA_MS)):
+            delta, regressed = compare(stats[name] / scale, base.get(name), False, threshold * factor,
+                                       min_delta)
+            regressions += regressed
+            cells.append(f"{stats[name]:9.1f} {delta:>7}")
+        print(f"   {doc_type:<20} {size[:-2]:>5} {' '.join(cells)}")
+
+    base_main = (baseline or {}).get("main", {})
+    if results["main"]:
+        print(f"\n   {'main.py':<20} {'giây':>8} {'văn bản/s':>10} {'':>7} {'peak RSS MB':>12} {'':>7}")
+    for mode, stats in results["main"].items():
+        base = base_main.get(mode, {})
+        speed, regressed_speed = compare(stats["docs_per_sec"] * scale, base.get("docs_per_sec"), True,
+                                         threshold)
+        rss, regressed_rss = compare(stats["peak_rss_mb"], base.get("peak_rss_mb"), False, threshold)
+        regressions += regressed_speed + regressed_rss
+        print(f"   {mode:<20} {stats['wall_s']:8.2f} {stats['docs_per_sec']:10.1f} {speed:>7} "
+              f"{stats['peak_rss_mb']:12.1f} {rss:>7}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark processor và main.py trên bộ văn bản tổng hợp")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES_KB),
+                        help="Các kích thước văn bản, KB (mặc định: 2,20,200,2000)")
+    parser.add_argument("--docs", type=int, default=1, help="Số văn bản cho mỗi loại, kích thước và biến thể")
+    parser.add_argument("--runs", type=int, default=5, help="Số lần xử lý mỗi văn bản khi đo processor")
+    parser.add_argument("--seed", type=int, default=0, help="Seed của bộ văn bản tổng hợp")
+    parser.add_argument("--noise-rate", type=float, default=DEFAULT_NOISE_RATE, help="Tỷ lệ từ bị lỗi OCR")
+    parser.add_argument("--workers", type=int, default=1, help="Số process khi chạy main.py")
+    parser.add_argument("--skip-main", action="store_true", help="Chỉ đo processor, không chạy main.py")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="File baseline để so sánh/lưu")
+    parser.add_argument("--save-baseline", action="store_true", help="Lưu kết quả lần này làm baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Mức thay đổi bị coi là chậm đi (mặc định: 0.25 = 25%%, p99: gấp đôi)")
+    parser.add_argument("--check", action="store_true", help="Exit 1 nếu có chỉ số vượt ngưỡng so với baseline")
+    args = parser.parse_args()
+
+    config = {
+        "sizes_kb": args.sizes,
+        "docs": args.docs,
+        "runs": args.runs,
+        "seed": args.seed,
+        "noise_rate": args.noise_rate,
+        "workers": args.workers,
+    }
+    documents = list(generate_corpus(sizes_kb=args.sizes, docs=args.docs, seed=args.seed,
+                                     noise_rate=args.noise_rate))
+    corpus_mb = sum(len(doc.text.encode('utf-8')) for doc in documents) / 1e6
+    print(f"📄 {len(documents)} văn bản tổng hợp ({corpus_mb:.1f} MB), kích thước {args.sizes} KB, "
+          f"{args.runs} lần đo mỗi văn bản")
+
+    calibration = calibrate()
+    results = {"config": config, "processors": bench_processors(documents, args.runs), "main": {}}
+    if not args.skip_main:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = Path(tmp) / "input"
+            write_corpus(input_dir, iter(documents))
+            for mode, extra_args in MAIN_MODES.items():
+                output_dir = Path(tmp) / f"output-{mode}"
+                results["main"][mode] = run_main(input_dir, output_dir,
+                                                 extra_args + ["--workers", str(args.workers)], len(documents))
+    # Đo lại sau cùng, lấy lần nhanh hơn: tải máy có thể thay đổi trong lúc chạy benchmark
+    results["calibration_ms"] = round(min(calibration, calibrate()), 3)
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"⚠️  Baseline {baseline_path} đo với cấu hình khác {baseline.get('config')}, không so sánh")
+            baseline = None
+        else:
+            print(f"📊 So với baseline {baseline_path} ({baseline.get('machine', {}).get('measured_at', '?')})")
+
+    regressions = print_report(results, baseline, args.threshold)
+    if baseline is not None:
+        print(f"\n{'⚠️ ' if regressions else '✅'} {regressions} chỉ số vượt ngưỡng {args.threshold:.0%}")
+
+    if args.save_baseline:
+        results["machine"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "measured_at": time.strftime("%Y-%m-%d"),
+        }
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"💾 Đã lưu baseline: {baseline_path}")
+
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark thời gian khởi động: từ lúc import main tới khi có kết quả của văn bản đầu tiên
+
+Mỗi lần đo chạy trong một interpreter mới (như một job ngắn hoặc một worker theo request),
+tách riêng: import main, khởi tạo LawDocumentProcessor, xử lý văn bản đầu tiên (gồm khởi tạo
+processor của loại văn bản đó). Chế độ "eager" khởi tạo cả 21 processor trước, như trước khi
+có registry lazy, để so sánh.
+
+Cách chạy:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --file "pdf-ocr-extractor/spelling_fixed_json/Luật/abc.json" --runs 20
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Chạy trong interpreter con; in ra số liệu dạng JSON
+CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from main import LawDocumentProcessor
+from utils.file_utils import read_json_file
+imported = time.perf_counter()
+processor = LawDocumentProcessor()
+if {eager!r}:
+    processor.processors.load_all()
+ready = time.perf_counter()
+data = read_json_file({file!r})
+result = processor.processors[{doc_type!r}].process(data['text'], data.get('filename', ''))
+done = time.perf_counter()
+print(json.dumps({{"import": imported - start, "init": ready - imported, "first_result": done - ready,
+                  "total": done - start, "loaded": len(processor.processors.loaded()),
+                  "ok": bool(result)}}))
+"""
+
+
+def find_first_file(input_dir: Path):
+    """File JSON đầu tiên (theo thứ tự tên) trong thư mục đầu vào"""
+    for doc_type_dir in sorted(input_dir.iterdir()):
+        if doc_type_dir.is_dir():
+            files = sorted(doc_type_dir.glob('*.json'))
+            if files:
+                return files[0]
+    return None
+
+
+def run_once(file_path: Path, eager: bool):
+    """Một lần đo trong interpreter mới, trả về (số liệu, thời gian của cả process)"""
+    code = CHILD_CODE.format(root=str(ROOT_DIR), eager=eager, file=str(file_path),
+                             doc_type=file_path.parent.name)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True,
+                            cwd=str(ROOT_DIR)).stdout
+    wall = time.perf_counter() - start
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1]), wall
+
+
+def summarize(runs):
+    """Trung vị (ms) của từng bước"""
+    keys = ("import", "init", "first_result", "total", "process")
+    return {key: statistics.median(run[key] for run in runs) * 1000 for key in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thời gian khởi động tới kết quả đầu tiên")
+    parser.add_argument("--input-dir", default="pdf-ocr-extractor/spelling_fixed_json",
+                        help="Thư mục chứa file JSON đầu vào")
+    parser.add_argument("--file", help="File cần xử lý (mặc định: file đầu tiên trong --input-dir)")
+    parser.add_argument("--runs", type=int, default=10, help="Số lần đo cho mỗi chế độ")
+    args = parser.parse_args()
+
+    file_path = Path(args.file) if args.file else find_first_file(ROOT_DIR / args.input_dir)
+    if file_path is None or not file_path.exists():
+        print(f"❌ Không tìm thấy file đầu vào trong {args.input_dir}")
+        return 1
+    file_path = file_path.resolve()
+
+    print(f"📄 File: {file_path.parent.name}/{file_path.name}, {args.runs} lần đo mỗi chế độ (trung vị, ms)")
+    print(f"   {'Chế độ':<6} {'import':>8} {'khởi tạo':>9} {'văn bản 1':>10} {'tổng':>8} {'process':>8}  processor")
+    for mode, eager in (("lazy", False), ("eager", True)):
+        runs = []
+        for _ in range(args.runs):
+            stats, wall = run_once(file_path, eager)
+            stats["process"] = wall
+            runs.append(stats)
+        median = summarize(runs)
+        print(f"   {mode:<6} {median['import']:8.1f} {median['init']:9.1f} {median['first_result']:10.1f} "
+              f"{median['total']:8.1f} {median['process']:8.1f}  {runs[-1]['loaded']}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,68 +5,209 @@ Chương trình xử lý văn bản pháp luật
 """
 
 import os
-import json
 import argparse
+import hashlib
+import tempfile
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any
-
-from processors.lenh_processor import LenhProcessor
-from processors.luat_processor import LuatProcessor
-from processors.nghi_dinh_processor import NghiDinhProcessor
-from processors.nghi_quyet_processor import NghiQuyetProcessor
-from processors.quyet_dinh_processor import QuyetDinhProcessor
-from processors.thong_tu_processor import ThongTuProcessor
-from processors.chi_thi_processor import ChiThiProcessor
-from processors.cong_van_processor import CongVanProcessor
-from processors.cong_dien_processor import CongDienProcessor
-from processors.ket_luan_processor import KetLuanProcessor
-from processors.phap_lenh_processor import PhapLenhProcessor
-from processors.thong_bao_processor import ThongBaoProcessor
-from processors.huong_dan_processor import HuongDanProcessor
-from processors.ke_hoach_processor import KeHoachProcessor
-from processors.quy_dinh_processor import QuyDinhProcessor
-from processors.quy_che_processor import QuyCheProcessor
-from processors.phuong_an_processor import PhuongAnProcessor
-from processors.de_an_processor import DeAnProcessor
-from processors.thong_tu_lien_tich_processor import ThongTuLienTichProcessor
-from processors.van_ban_hop_nhat_processor import VanBanHopNhatProcessor
-from processors.quy_chuan_viet_nam_processor import QuyChuanVietNamProcessor
-from utils.file_utils import read_json_file, write_json_file, get_all_json_files
-from utils.text_utils import clean_text
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Tuple
+
+from processors.registry import ProcessorRegistry, processor_class
+from utils.file_utils import (read_text_file, parse_json_text, write_json_file,
+                              get_all_json_files, get_all_jsonl_files, iter_jsonl_lines,
+                              JsonlWriter, JsonDirectoryWriter, TarShardWriter)
+from utils.text_utils import UNICODE_FORM, clean_text, normalize_unicode
+from utils import json_codec
+
+if TYPE_CHECKING:
+    # Chỉ import khi cần (--workers, --incremental, --profile, khi ghi kết quả) để khởi động nhanh
+    from utils.manifest import ProcessingManifest, Fingerprint
+    from utils.output_index import OutputIndex
+    from utils.result_cache import CacheKey, ResultCache
+
+# Đơn vị công việc: (loại văn bản, nguồn, dòng JSONL hoặc None nếu nguồn là file JSON); ở chế
+# độ --classify loại văn bản được xác định khi xử lý, phần tử đầu là loại cần lọc (None: mọi loại)
+WorkItem = Tuple[Optional[str], str, Optional[str]]
+
+# Kết quả xử lý một đơn vị công việc: (loại văn bản, kết quả hoặc None nếu lỗi hay bị bỏ qua)
+ProcessedItem = Tuple[Optional[str], Optional[Dict[str, Any]]]
+
+# Task: (đơn vị công việc, kết quả lấy từ manifest nếu có, dấu vân tay để ghi vào manifest)
+Task = Tuple[WorkItem, Optional[Dict[str, Any]], Optional['Fingerprint']]
+
+# Số văn bản gửi cho worker trong mỗi lần
+WORKER_BATCH_SIZE = 16
+
+# Chỉ mục kết quả (nguồn -> số hiệu, vị trí kết quả) trong thư mục đầu ra
+INDEX_FILE = "index.sqlite"
+
+# Số ký tự tối đa của phần số hiệu trong tên file kết quả
+MAX_FILENAME_SO_HIEU = 60
+
+# Trường đánh dấu kết quả của văn bản phải chuẩn hóa Unicode khi đọc vào (giá trị: dạng chuẩn)
+UNICODE_FIELD = "chuan_hoa_unicode"
+
+# Mục profile của các bước chạy trước khi biết loại văn bản (đọc, parse, chuẩn hóa, phân loại)
+# ở chế độ --classify
+CLASSIFY_PROFILE_TYPE = "(phân loại)"
+
+
+def _document_filename(doc: Dict[str, Any], source: str = '') -> str:
+    """
+    Tên file kết quả của một văn bản: số hiệu (để dễ tìm) kèm khóa lấy từ nguồn đầu vào
+    
+    Khóa là hash của đường dẫn tuyệt đối của nguồn (file, hoặc shard:dòng), nên các văn bản
+    trùng số hiệu hay không có số hiệu (kể cả các file cùng tên ở thư mục khác) không ghi đè lên
+    nhau, còn xử lý lại cùng một nguồn thì ghi đè đúng file kết quả cũ.
+    """
+    so_hieu = _so_hieu(doc) or 'unknown'
+    # Loại bỏ ký tự không hợp lệ trong tên file
+    stem = "".join(c for c in so_hieu.replace('/', '-') if c.isalnum() or c in ('-', '_', '.'))
+    stem = stem[:MAX_FILENAME_SO_HIEU].strip('.') or 'unknown'
+    source_key = hashlib.sha1(str(Path(source).resolve()).encode('utf-8', 'surrogatepass')).hexdigest()[:10]
+    return f"{stem}-{source_key}.json"
+
+
+def _so_hieu(doc: Dict[str, Any]) -> Optional[str]:
+    """Số hiệu của văn bản (None nếu không trích xuất được)"""
+    so_hieu = doc.get('so_hieu')
+    return str(so_hieu) if so_hieu is not None else None
+
+
+def result_cache_key(text: str, doc_type: str) -> 'CacheKey':
+    """
+    Khóa cache kết quả của một văn bản đã chuẩn hóa Unicode (normalize_unicode)
+    
+    Dùng chung cho CLI và service (server.py) nên một file cache dùng chung được tra trúng từ cả
+    hai phía; văn bản NFC và NFD cùng nội dung có cùng khóa.
+    """
+    from utils import result_cache
+    return result_cache.ResultCache.make_key(text, doc_type, processor_class(doc_type).get_version())
+
+
+def _summary_entry(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Thông tin rút gọn của một văn bản trong file tổng hợp"""
+    return {
+        "so_hieu": doc.get("so_hieu"),
+        "ngay_ban_hanh": doc.get("ngay_ban_hanh"),
+        "trich_yeu": doc.get("trich_yeu"),
+        "co_quan_ban_hanh": doc.get("co_quan_ban_hanh"),
+        "nguoi_ky": doc.get("nguoi_ky")
+    }
+
+
+class SummaryBuilder:
+    """
+    Tích lũy file tổng hợp từng văn bản một
+    
+    Chỉ giữ số đếm theo loại trong bộ nhớ; thông tin rút gọn của từng văn bản được ghi tạm
+    ra đĩa (mỗi loại một file tạm) và chép sang summary.json khi kết thúc. Kết quả giống hệt
+    _save_summary; các loại được xếp theo thứ tự văn bản đầu tiên của loại đó được thêm vào.
+    """
+    
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self._spools: Dict[str, Any] = {}
+    
+    def add(self, doc_type: str, doc: Dict[str, Any]):
+        """Thêm một văn bản đã xử lý, văn bản của các loại có thể xen kẽ nhau"""
+        spool = self._spools.get(doc_type)
+        if spool is None:
+            spool = self._spools[doc_type] = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self.counts[doc_type] = self.counts.get(doc_type, 0) + 1
+        spool.write(json_codec.dumps(_summary_entry(doc), compact=True))
+        spool.write('\n')
+    
+    def write(self, summary_file: str):
+        """Ghi summary.json với cùng định dạng (indent=2) như write_json_file"""
+        tong_quan = {
+            "tong_so_van_ban": sum(self.counts.values()),
+            "so_loai_van_ban": len(self.counts),
+            "thong_ke_theo_loai": self.counts
+        }
+        
+        summary_path = Path(summary_file)
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write('{\n  "tong_quan": ')
+            f.write(_indent_json(tong_quan, 2))
+            f.write(',\n  "chi_tiet_theo_loai": {')
+            if not self.counts:
+                f.write('}\n}')
+                return
+            
+            for type_index, (doc_type, spool) in enumerate(self._spools.items()):
+                f.write(',\n    ' if type_index else '\n    ')
+                f.write(f'{json_codec.dumps(doc_type)}: [')
+                spool.seek(0)
+                for doc_index, line in enumerate(spool):
+                    f.write(',\n      ' if doc_index else '\n      ')
+                    f.write(_indent_json(json_codec.loads(line), 6))
+                f.write('\n    ]')
+            f.write('\n  }\n}')
+    
+    def close(self):
+        """Xóa các file tạm"""
+        for spool in self._spools.values():
+            spool.close()
+    
+    def __enter__(self) -> 'SummaryBuilder':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _indent_json(value: Any, level: int) -> str:
+    """json.dumps(indent=2) của value khi được lồng ở độ thụt lề level"""
+    return json_codec.dumps(value, indent=2).replace('\n', '\n' + ' ' * level)
 
 
 class LawDocumentProcessor:
     """Lớp chính để xử lý các văn bản pháp luật"""
     
-    def __init__(self, input_dir: str = "pdf-ocr-extractor/spelling_fixed_json"):
+    def __init__(self, input_dir: str = "pdf-ocr-extractor/spelling_fixed_json", workers: int = 1,
+                 input_format: str = "json", output_format: str = "json",
+                 manifest_path: Optional[str] = None, profile: bool = False, classify: bool = False,
+                 compact: bool = False, cache_options: Optional[Dict[str, Any]] = None):
         self.input_dir = Path(input_dir)
+        self.workers = max(1, workers)
+        self.input_format = input_format
+        self.output_format = output_format
+        # Ghi kết quả dạng JSON gọn (không indent) thay vì indent=2
+        self.compact = compact
+        # Đường dẫn manifest cho chế độ xử lý tăng dần (None để xử lý lại toàn bộ)
+        self.manifest_path = manifest_path
+        # Xác định loại văn bản từ nội dung thay vì từ thư mục chứa file
+        self.classify = classify
+        # Đo thời gian từng extractor và các bước đọc/parse/ghi (chế độ --profile)
+        self.profiler = None
+        if profile:
+            from utils.profiler import Profiler
+            self.profiler = Profiler()
+        # Cache kết quả theo nội dung văn bản: tham số của ResultCache, None để luôn trích xuất
+        self.cache_options = cache_options
+        self.cache: Optional['ResultCache'] = None
+        if cache_options is not None:
+            from utils import result_cache
+            self.cache = result_cache.ResultCache(**cache_options)
         self.processors = self._init_processors()
+        # Process pool dùng chung cho aprocess_file và aprocess_directory (khởi tạo khi cần,
+        # đóng bằng close()) và khóa để các lần ghi kết quả của aprocess_file lần lượt từng lần
+        self._async_executor = None
+        self._async_write_lock = None
         
-    def _init_processors(self) -> Dict[str, Any]:
-        """Khởi tạo các processor cho từng loại văn bản"""
-        return {
-            "Lệnh": LenhProcessor(),
-            "Luật": LuatProcessor(),
-            "Nghị định": NghiDinhProcessor(),
-            "Nghị quyết": NghiQuyetProcessor(),
-            "Quyết định": QuyetDinhProcessor(),
-            "Thông tư": ThongTuProcessor(),
-            "Chỉ thị": ChiThiProcessor(),
-            "Công văn": CongVanProcessor(),
-            "Công điện": CongDienProcessor(),
-            "Kết luận": KetLuanProcessor(),
-            "Pháp lệnh": PhapLenhProcessor(),
-            "Thông báo": ThongBaoProcessor(),
-            "Hướng dẫn": HuongDanProcessor(),
-            "Kế hoạch": KeHoachProcessor(),
-            "Quy định": QuyDinhProcessor(),
-            "Quy chế": QuyCheProcessor(),
-            "Phương án": PhuongAnProcessor(),
-            "Đề án": DeAnProcessor(),
-            "Thông tư liên tịch": ThongTuLienTichProcessor(),
-            "Văn bản hợp nhất": VanBanHopNhatProcessor(),
-            "Quy chuẩn việt nam": QuyChuanVietNamProcessor(),
-        }
+    def _init_processors(self) -> ProcessorRegistry:
+        """Các processor cho từng loại văn bản, chỉ được khởi tạo khi loại văn bản được dùng lần đầu"""
+        return ProcessorRegistry(on_load=self._on_processor_loaded)
+    
+    def _on_processor_loaded(self, doc_type: str, processor: Any):
+        """Gắn phần đo thời gian cho processor vừa được khởi tạo (chế độ --profile)"""
+        if self.profiler is not None:
+            self.profiler.instrument(processor, doc_type)
     
     def process_directory(self, doc_type: str = None, output_dir: str = "output") -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -80,69 +221,407 @@ class LawDocumentProcessor:
             Dict với key là loại văn bản và value là list các văn bản đã được phân tích
         """
         results = {}
+        docs_to_save: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        
+        with self._open_manifest() as manifest, self._open_index(output_dir) as index:
+            # Văn bản của các loại có thể xen kẽ nhau (chế độ --classify)
+            for doc_type_name, source, processed_doc, reused in self._iter_results(doc_type, manifest):
+                if processed_doc:
+                    results.setdefault(doc_type_name, []).append(processed_doc)
+                    if self._needs_write(reused, source, index, output_dir, doc_type_name):
+                        docs_to_save.setdefault(doc_type_name, []).append((source, processed_doc))
+                    else:
+                        index.touch(source)
+            
+            for doc_type_name, documents in docs_to_save.items():
+                self._save_by_document_type(doc_type_name, documents, output_dir, index)
+            index.prune(self._doc_types(doc_type))
+        
+        return results
+    
+    def stream_directory(self, doc_type: str = None, output_dir: str = "output") -> Dict[str, int]:
+        """
+        Xử lý thư mục ở chế độ streaming: mỗi văn bản được ghi ra ngay khi xử lý xong và
+        file tổng hợp được tích lũy dần, nên bộ nhớ không tăng theo số lượng văn bản
+        
+        Args:
+            doc_type: Loại văn bản cần xử lý (None để xử lý tất cả)
+            output_dir: Thư mục đầu ra
+            
+        Returns:
+            Dict với key là loại văn bản và value là số văn bản đã được phân tích
+        """
+        with self._open_manifest() as manifest, SummaryBuilder() as summary, \
+                self._open_index(output_dir) as index:
+            # Mỗi loại văn bản giữ một nơi ghi mở tới cuối, vì văn bản các loại có thể xen kẽ nhau
+            with ExitStack() as stack:
+                writers = {}
+                for doc_type_name, source, processed_doc, reused in self._iter_results(doc_type, manifest):
+                    if not processed_doc:
+                        continue
+                    summary.add(doc_type_name, processed_doc)
+                    if not self._needs_write(reused, source, index, output_dir, doc_type_name):
+                        index.touch(source)
+                        continue
+                    writer = writers.get(doc_type_name)
+                    if writer is None:
+                        writer = stack.enter_context(self._open_writer(doc_type_name, output_dir))
+                        writers[doc_type_name] = writer
+                    try:
+                        self._write_document(writer, index, output_dir, doc_type_name, source, processed_doc)
+                    except Exception as e:
+                        print(f"❌ Lỗi khi lưu văn bản {doc_type_name}: {str(e)}")
+            index.prune(self._doc_types(doc_type))
+            
+            for doc_type_name, writer in writers.items():
+                if writer.count:
+                    print(f"✅ Đã lưu {writer.count} văn bản {doc_type_name} vào: {writer.location}")
+            
+            summary_file = Path(output_dir) / "summary.json"
+            try:
+                summary.write(str(summary_file))
+                print(f"📊 Đã tạo file tổng hợp: {summary_file}")
+            except Exception as e:
+                print(f"❌ Lỗi khi tạo file tổng hợp: {str(e)}")
+            
+            return dict(summary.counts)
+    
+    def _doc_types(self, doc_type: str = None) -> List[str]:
+        """Các loại văn bản cần xử lý (có thư mục đầu vào và có processor), theo thứ tự cố định"""
+        if self.classify:
+            # Đầu vào không chia theo loại: mọi loại văn bản (hoặc loại được chọn) đều có thể có
+            if doc_type:
+                return [doc_type] if doc_type in self.processors else []
+            return list(self.processors)
         
         if doc_type:
             # Xử lý chỉ một loại văn bản
             doc_dir = self.input_dir / doc_type
-            if doc_dir.exists() and doc_type in self.processors:
-                files = get_all_json_files(doc_dir)
-                processed_docs = self._process_files(files, doc_type)
-                if processed_docs:
-                    results[doc_type] = processed_docs
-                    self._save_by_document_type(doc_type, processed_docs, output_dir)
+            return [doc_type] if doc_dir.exists() and doc_type in self.processors else []
+        
+        # Xử lý tất cả loại văn bản
+        return [doc_type_dir.name for doc_type_dir in sorted(self.input_dir.iterdir())
+                if doc_type_dir.is_dir() and doc_type_dir.name in self.processors]
+    
+    def _iter_jobs(self, doc_type: str = None) -> Iterator[Tuple[str, List[Path]]]:
+        """Lần lượt sinh từng loại văn bản cần xử lý cùng danh sách file đầu vào"""
+        list_files = get_all_jsonl_files if self.input_format == 'jsonl' else get_all_json_files
+        
+        for doc_type_name in self._doc_types(doc_type):
+            yield doc_type_name, list_files(self.input_dir / doc_type_name)
+    
+    def _iter_work_items(self, doc_type: str = None) -> Iterator[WorkItem]:
+        """
+        Sinh lần lượt các đơn vị công việc (loại văn bản, nguồn, dòng JSONL)
+        
+        Với file JSON, dòng JSONL là None và file được đọc khi xử lý. Với shard JSONL,
+        mỗi dòng là một đơn vị công việc, shard được đọc dần nên không nạp cả shard vào bộ nhớ.
+        """
+        if self.classify:
+            yield from self._iter_classified_items(doc_type)
+            return
+        
+        for doc_type, files in self._iter_jobs(doc_type):
+            for file_path in files:
+                if self.input_format == 'jsonl':
+                    for line_no, line in iter_jsonl_lines(file_path):
+                        yield doc_type, f"{file_path}:{line_no}", line
+                else:
+                    yield doc_type, str(file_path), None
+    
+    def _iter_classified_items(self, doc_type: str = None) -> Iterator[WorkItem]:
+        """
+        Sinh đơn vị công việc từ thư mục đầu vào không chia theo loại
+        
+        Đơn vị công việc chỉ mang đường dẫn file (hoặc dòng JSONL); loại văn bản được xác định
+        từ phần đầu văn bản khi xử lý (trong worker khi workers > 1), cùng lần đọc, parse và
+        chuẩn hóa dùng để trích xuất.
+        """
+        if doc_type and doc_type not in self.processors:
+            return
+        
+        if self.input_format == 'jsonl':
+            for file_path in get_all_jsonl_files(self.input_dir):
+                for line_no, line in iter_jsonl_lines(file_path):
+                    yield doc_type, f"{file_path}:{line_no}", line
         else:
-            # Xử lý tất cả loại văn bản
-            for doc_type_dir in self.input_dir.iterdir():
-                if doc_type_dir.is_dir() and doc_type_dir.name in self.processors:
-                    doc_type_name = doc_type_dir.name
-                    files = get_all_json_files(doc_type_dir)
-                    processed_docs = self._process_files(files, doc_type_name)
-                    if processed_docs:
-                        results[doc_type_name] = processed_docs
-                        self._save_by_document_type(doc_type_name, processed_docs, output_dir)
+            for file_path in get_all_json_files(self.input_dir):
+                yield doc_type, str(file_path), None
+    
+    def _iter_results(self, doc_type: str = None,
+                      manifest: Optional['ProcessingManifest'] = None) -> Iterator[Tuple[str, str, Optional[Dict[str, Any]], bool]]:
+        """
+        Sinh (loại văn bản, nguồn, kết quả, có lấy lại từ manifest không) theo thứ tự đầu vào
         
-        return results
+        Khi có manifest, nguồn không đổi (cùng nội dung và phiên bản processor) được lấy
+        kết quả từ manifest thay vì trích xuất lại; kết quả mới được ghi vào manifest.
+        """
+        work_items = self._iter_work_items(doc_type)
+        if manifest is None:
+            tasks = ((item, None, None) for item in work_items)
+        else:
+            tasks = (self._check_manifest(item, manifest) for item in work_items)
+            tasks = (task for task in tasks if task is not None)
+        
+        for (item, cached_doc, fingerprint), (doc_type_name, processed_doc) in self._run_tasks(tasks):
+            if fingerprint is not None and processed_doc:
+                if fingerprint.version is None:
+                    # Chế độ --classify: phiên bản theo loại văn bản vừa xác định được
+                    fingerprint = fingerprint._replace(version=processor_class(doc_type_name).get_version())
+                manifest.record(item[1], doc_type_name, fingerprint, processed_doc)
+            yield doc_type_name, item[1], processed_doc, cached_doc is not None
+        
+        if manifest is not None:
+            # Chỉ dọn manifest khi đã duyệt hết đầu vào
+            removed = manifest.prune(self._doc_types(doc_type))
+            if removed:
+                print(f"🧹 Đã xóa {removed} mục không còn đầu vào khỏi manifest")
     
-    def _process_files(self, files: List[Path], doc_type: str) -> List[Dict[str, Any]]:
-        """Xử lý danh sách file của một loại văn bản"""
-        results = []
-        processor = self.processors[doc_type]
+    def _check_manifest(self, item: WorkItem, manifest: 'ProcessingManifest') -> Optional[Task]:
+        """
+        Đối chiếu một đơn vị công việc với manifest
+        
+        Ở chế độ --classify, nguồn không đổi giữ loại văn bản đã xác định lần trước (bộ phân loại
+        thuộc package processors nên đổi code phân loại thì phiên bản cũng đổi); trả về None nếu
+        loại đó không phải loại cần xử lý.
+        """
+        from utils.manifest import Fingerprint, hash_bytes
+        
+        doc_type, source, line = item
+        entry = manifest.get(source)
+        type_filter = None
+        if self.classify:
+            type_filter = doc_type
+            doc_type = entry.doc_type if entry is not None and entry.doc_type in self.processors else None
+        version = processor_class(doc_type).get_version() if doc_type is not None else None
+        if entry is not None and (entry.doc_type, entry.fingerprint.version) != (doc_type, version):
+            entry = None
+        if entry is not None:
+            if type_filter is not None and entry.doc_type != type_filter:
+                return None
+            item = (entry.doc_type, source, line)
         
-        for file_path in files:
+        size = mtime_ns = None
+        if line is None:
             try:
-                print(f"Đang xử lý: {file_path}")
-                data = read_json_file(file_path)
-                
-                if data and 'text' in data:
-                    processed_doc = processor.process(data['text'], data.get('filename', ''))
-                    if processed_doc:
-                        results.append(processed_doc)
-                        
-            except Exception as e:
-                print(f"Lỗi khi xử lý file {file_path}: {str(e)}")
-                continue
+                stat = os.stat(source)
+            except OSError:
+                # Để bước xử lý báo lỗi như bình thường
+                return item, None, None
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            
+            # File không đổi kích thước và thời gian sửa thì không cần đọc lại để hash
+            if entry is not None and (entry.fingerprint.size, entry.fingerprint.mtime_ns) == (size, mtime_ns):
+                manifest.touch(source, entry.fingerprint)
+                return item, entry.result, None
+            
+            with open(source, 'rb') as f:
+                content_hash = hash_bytes(f.read())
+        else:
+            content_hash = hash_bytes(line.encode('utf-8'))
         
-        return results
+        fingerprint = Fingerprint(version, content_hash, size, mtime_ns)
+        if entry is not None and entry.fingerprint.content_hash == content_hash:
+            manifest.touch(source, fingerprint)
+            return item, entry.result, None
+        
+        return item, None, fingerprint
+    
+    def _run_tasks(self, tasks: Iterator[Task]) -> Iterator[Tuple[Task, ProcessedItem]]:
+        """
+        Xử lý các task tuần tự hoặc trên process pool (khi workers > 1)
+        
+        Task đã có kết quả từ manifest không cần xử lý lại. Kết quả luôn được trả về theo
+        đúng thứ tự đầu vào, bất kể worker nào xử lý xong trước. Ở chế độ process pool,
+        chỉ một số lô giới hạn được gửi đi cùng lúc.
+        """
+        if self.workers <= 1:
+            for task in tasks:
+                item, cached_doc, _ = task
+                yield task, (item[0], cached_doc) if cached_doc is not None else self._process_item(item)
+            return
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(str(self.input_dir), self.profiler is not None,
+                                           self.cache_options, self.classify)) as executor:
+            pending = deque()
+            for batch in _batched(tasks, WORKER_BATCH_SIZE):
+                items = [item for item, cached_doc, _ in batch if cached_doc is None]
+                future = executor.submit(_process_batch_in_worker, items) if items else None
+                pending.append((batch, future))
+                if len(pending) >= self.workers * 4:
+                    yield from self._collect_batch(*pending.popleft())
+            while pending:
+                yield from self._collect_batch(*pending.popleft())
+    
+    def _collect_batch(self, batch: List[Task], future) -> Iterator[Tuple[Task, ProcessedItem]]:
+        """Ghép kết quả của một lô (phần gửi cho worker và phần lấy từ manifest) theo thứ tự"""
+        processed_items, timings, cache_stats = future.result() if future is not None else ((), None, None)
+        self._merge_worker_stats(timings, cache_stats)
+        processed_items = iter(processed_items)
+        for task in batch:
+            item, cached_doc, _ = task
+            yield task, (item[0], cached_doc) if cached_doc is not None else next(processed_items)
+    
+    def _merge_worker_stats(self, timings: Optional[Dict], cache_stats: Optional[Dict[str, int]]):
+        """Gộp số liệu đo và số liệu cache của một lô do worker gửi về"""
+        if timings:
+            self.profiler.merge(timings)
+        if cache_stats:
+            self.cache.merge(cache_stats)
     
-    def _save_by_document_type(self, doc_type: str, documents: List[Dict[str, Any]], output_dir: str):
-        """Lưu các văn bản theo loại vào thư mục riêng"""
+    def _process_item(self, item: WorkItem) -> ProcessedItem:
+        """
+        Xử lý một văn bản, lỗi của văn bản nào chỉ ảnh hưởng tới văn bản đó
+        
+        Ở chế độ --classify, loại văn bản được xác định ở đây sau khi đọc văn bản; kết quả là
+        None nếu không xác định được hoặc không phải loại cần xử lý.
+        """
+        doc_type, source, line = item
+        # Ở chế độ --classify, các bước trước khi biết loại văn bản được đo vào mục riêng
+        step_type = CLASSIFY_PROFILE_TYPE if self.classify else doc_type
+        
         try:
-            # Tạo thư mục cho loại văn bản
-            type_dir = Path(output_dir) / doc_type
-            type_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Lưu từng văn bản vào file riêng
-            for doc in documents:
-                filename = f"{doc.get('so_hieu', 'unknown').replace('/', '-')}.json"
-                # Loại bỏ ký tự không hợp lệ trong tên file
-                filename = "".join(c for c in filename if c.isalnum() or c in ('-', '_', '.')).rstrip()
-                if not filename.endswith('.json'):
-                    filename += '.json'
+            if not self.classify:
+                print(f"Đang xử lý: {source}")
+            if line is None:
+                with self._measure(step_type, 'read'):
+                    content = read_text_file(Path(source))
+                with self._measure(step_type, 'parse'):
+                    data = parse_json_text(content, Path(source)) if content is not None else None
+            else:
+                with self._measure(step_type, 'parse'):
+                    data = json_codec.loads(line)
+            
+            if data and 'text' in data:
+                with self._measure(step_type, 'normalize'):
+                    text, normalized = normalize_unicode(data['text'])
+                if self.classify:
+                    from processors.classifier import classify_document
+                    
+                    with self._measure(step_type, 'classify'):
+                        doc_type_name = classify_document(text)
+                    if doc_type_name is None:
+                        print(f"⚠️  Không xác định được loại văn bản: {source}")
+                        return None, None
+                    if doc_type is not None and doc_type_name != doc_type:
+                        return None, None
+                    doc_type = doc_type_name
+                    print(f"Đang xử lý: {source}")
                 
-                file_path = type_dir / filename
-                write_json_file(doc, str(file_path))
+                processor = self.processors[doc_type]
+                processor.reset_pattern_timings()
+                result = self._extract(doc_type, text, data.get('filename', ''), normalized)
+                for name, seconds in processor.slow_patterns():
+                    print(f"⚠️  Pattern '{name}' chạy chậm ({seconds:.2f}s) với {source}")
+                return doc_type, result
                 
-            print(f"✅ Đã lưu {len(documents)} văn bản {doc_type} vào: {type_dir}")
+        except Exception as e:
+            print(f"Lỗi khi xử lý file {source}: {str(e)}")
+        
+        return doc_type, None
+    
+    def _extract(self, doc_type: str, text: str, filename: str, normalized: bool,
+                 extract: Optional[Callable[[str, str, str], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Trích xuất văn bản đã chuẩn hóa Unicode (normalize_unicode); kết quả của văn bản phải
+        chuẩn hóa được đánh dấu bằng trường UNICODE_FIELD
+        
+        Khi có cache, văn bản đã gặp (cùng nội dung, loại văn bản và phiên bản processor) được
+        lấy kết quả từ cache, không trích xuất lại.
+        
+        Args:
+            extract: Hàm (doc_type, text, filename) -> kết quả dùng khi cache chưa có (None để
+                     trích xuất bằng processor của process này)
+        """
+        key = result = None
+        if self.cache is not None:
+            key = result_cache_key(text, doc_type)
+            try:
+                result = self.cache.get(key)
+            except Exception as e:
+                # Lỗi cache (vd. file cache dùng chung đang bị khóa) không làm hỏng văn bản
+                print(f"⚠️  Không đọc được cache kết quả, trích xuất lại: {str(e)}")
+        if result is None:
+            if extract is None:
+                result = self.processors[doc_type].process(text, filename)
+            else:
+                result = extract(doc_type, text, filename)
+            # Cache giữ kết quả chưa đánh dấu: văn bản NFC và NFD cùng nội dung dùng chung một mục
+            if key is not None and result:
+                try:
+                    self.cache.put(key, result)
+                except Exception as e:
+                    print(f"⚠️  Không lưu được kết quả vào cache: {str(e)}")
+        if normalized and result:
+            result[UNICODE_FIELD] = UNICODE_FORM
+        return result
+    
+    def _measure(self, doc_type: str, name: str):
+        """Đo thời gian một bước khi đang ở chế độ --profile"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.measure(doc_type, name)
+    
+    def _open_manifest(self):
+        """Mở manifest nếu đang ở chế độ xử lý tăng dần"""
+        if self.manifest_path is None:
+            return nullcontext()
+        from utils.manifest import ProcessingManifest
+        return ProcessingManifest(self.manifest_path)
+    
+    def _open_index(self, output_dir: str) -> 'OutputIndex':
+        """Mở chỉ mục kết quả của thư mục đầu ra"""
+        from utils.output_index import OutputIndex
+        return OutputIndex(str(Path(output_dir) / INDEX_FILE))
+    
+    def _needs_write(self, reused: bool, source: str, index: 'OutputIndex', output_dir: str,
+                     doc_type: str) -> bool:
+        """
+        Kết quả lấy từ manifest đã được ghi ra ở lần chạy trước nếu mỗi văn bản một file và chỉ
+        mục trỏ tới file riêng của văn bản (không phải bản ghi trong shard) nằm trong thư mục của
+        loại văn bản và vẫn còn trên đĩa; shard (JSONL, tar) được ghi lại toàn bộ nên vẫn cần ghi
+        """
+        if not reused or self.output_format != 'json':
+            return True
+        entry = index.get(source)
+        if entry is None or entry.location.member is not None or entry.location.offset is not None:
+            return True
+        path = Path(output_dir) / entry.location.path
+        return path.parent != Path(output_dir) / doc_type or not path.is_file()
+    
+    def _write_document(self, writer, index: 'OutputIndex', output_dir: str, doc_type: str,
+                        source: str, doc: Dict[str, Any]):
+        """Ghi một kết quả và lưu vị trí của nó (tương đối với thư mục đầu ra) vào chỉ mục"""
+        with self._measure(doc_type, 'write'):
+            location = writer.write(doc, source)
+            if location is not None:
+                location = location._replace(path=os.path.relpath(location.path, output_dir))
+                index.record(source, doc_type, _so_hieu(doc), location)
+    
+    def _open_writer(self, doc_type: str, output_dir: str, append: bool = False):
+        """Mở nơi ghi kết quả của một loại văn bản theo output_format"""
+        if self.output_format == 'jsonl':
+            return JsonlWriter(str(Path(output_dir) / f"{doc_type}.jsonl"), append=append,
+                               compact=self.compact)
+        if self.output_format == 'tar':
+            return TarShardWriter(str(Path(output_dir) / f"{doc_type}.tar"), doc_type, _document_filename,
+                                  compact=self.compact, append=append)
+        return JsonDirectoryWriter(str(Path(output_dir) / doc_type), _document_filename,
+                                   compact=self.compact)
+    
+    def _save_by_document_type(self, doc_type: str, documents: List[Tuple[str, Dict[str, Any]]],
+                               output_dir: str, index: 'OutputIndex'):
+        """Lưu các văn bản (kèm nguồn) theo loại vào thư mục riêng (hoặc shard JSONL/tar riêng)"""
+        try:
+            with self._open_writer(doc_type, output_dir) as writer:
+                for source, doc in documents:
+                    self._write_document(writer, index, output_dir, doc_type, source, doc)
+                
+            print(f"✅ Đã lưu {writer.count} văn bản {doc_type} vào: {writer.location}")
             
         except Exception as e:
             print(f"❌ Lỗi khi lưu văn bản {doc_type}: {str(e)}")
@@ -163,16 +642,7 @@ class LawDocumentProcessor:
             
             # Thêm chi tiết từng loại
             for doc_type, docs in results.items():
-                summary["chi_tiet_theo_loai"][doc_type] = [
-                    {
-                        "so_hieu": doc.get("so_hieu"),
-                        "ngay_ban_hanh": doc.get("ngay_ban_hanh"),
-                        "trich_yeu": doc.get("trich_yeu"),
-                        "co_quan_ban_hanh": doc.get("co_quan_ban_hanh"),
-                        "nguoi_ky": doc.get("nguoi_ky")
-                    }
-                    for doc in docs
-                ]
+                summary["chi_tiet_theo_loai"][doc_type] = [_summary_entry(doc) for doc in docs]
             
             summary_file = Path(output_dir) / "summary.json"
             write_json_file(summary, str(summary_file))
@@ -181,26 +651,203 @@ class LawDocumentProcessor:
         except Exception as e:
             print(f"❌ Lỗi khi tạo file tổng hợp: {str(e)}")
 
+    def process_text(self, text: str, doc_type: Optional[str] = None, filename: str = '',
+                     extract: Optional[Callable[[str, str, str], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Trích xuất một văn bản đã có sẵn text, không đọc hay ghi file
+        
+        Args:
+            doc_type: Loại văn bản (None để xác định từ phần đầu văn bản)
+            extract: Hàm (doc_type, text, filename) -> kết quả trên văn bản đã chuẩn hóa, dùng khi
+                     cache chưa có (None để trích xuất bằng processor của process này)
+        """
+        text, normalized = normalize_unicode(text)
+        if doc_type is None:
+            doc_type = self._classify(text)
+        if doc_type not in self.processors:
+            raise ValueError(f"Không hỗ trợ loại văn bản: {doc_type}")
+        
+        return self._extract(doc_type, text, filename, normalized, extract)
+    
+    def _classify(self, text: str) -> str:
+        """Loại văn bản xác định từ nội dung, ValueError nếu không xác định được"""
+        from processors.classifier import classify_document
+        
+        doc_type = classify_document(text)
+        if doc_type is None:
+            raise ValueError("Không xác định được loại văn bản từ nội dung")
+        return doc_type
+    
     def process_single_file(self, file_path: str, output_dir: str = "output") -> Dict[str, Any]:
         """Xử lý một file cụ thể"""
+        doc_type, result = self._extract_file(file_path)
+        self._save_file_result(doc_type, file_path, result, output_dir)
+        return result
+    
+    def _extract_file(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
+        """Đọc và trích xuất một file, trả về (loại văn bản, kết quả)"""
         file_path = Path(file_path)
         
-        # Xác định loại văn bản từ thư mục cha
+        # Xác định loại văn bản từ thư mục cha, hoặc từ nội dung nếu thư mục cha không phải
+        # tên loại văn bản (hay ở chế độ --classify)
         doc_type = file_path.parent.name
         
-        if doc_type not in self.processors:
-            raise ValueError(f"Không hỗ trợ loại văn bản: {doc_type}")
+        if self.classify or doc_type not in self.processors:
+            content = read_text_file(file_path)
+            data = parse_json_text(content, file_path) if content is not None else None
+            if not data or not isinstance(data.get('text'), str):
+                raise ValueError(f"Không đọc được văn bản: {file_path}")
+            text, normalized = normalize_unicode(data['text'])
+            doc_type = self._classify(text)
+        else:
+            with self._measure(doc_type, 'read'):
+                content = read_text_file(file_path)
+            with self._measure(doc_type, 'parse'):
+                data = parse_json_text(content, file_path) if content is not None else None
+            with self._measure(doc_type, 'normalize'):
+                text, normalized = normalize_unicode(data['text'])
         
-        data = read_json_file(file_path)
-        processor = self.processors[doc_type]
+        return doc_type, self._extract(doc_type, text, data.get('filename', ''), normalized)
+    
+    def _save_file_result(self, doc_type: str, file_path: str, result: Dict[str, Any], output_dir: str):
+        """Lưu kết quả của một file vào thư mục output"""
+        if result:
+            with self._open_index(output_dir) as index, \
+                    self._open_writer(doc_type, output_dir, append=True) as writer:
+                self._write_document(writer, index, output_dir, doc_type, str(Path(file_path)), result)
+            print(f"✅ Đã lưu 1 văn bản {doc_type} vào: {writer.location}")
+    
+    async def aprocess_file(self, file_path: str, output_dir: str = "output") -> Dict[str, Any]:
+        """
+        Phiên bản asyncio của process_single_file: đọc và trích xuất trên process pool dùng chung
+        với aprocess_directory (regex giữ GIL suốt một lần tìm trên văn bản lớn, nên trích xuất
+        trong thread sẽ chặn event loop), các lời gọi đồng thời chạy song song trên các worker.
+        Kết quả được ghi trong thread pool mặc định, lần lượt từng lời gọi một.
+        """
+        import asyncio
         
-        result = processor.process(data['text'], data.get('filename', ''))
+        loop = asyncio.get_running_loop()
+        doc_type, result, timings, cache_stats = await loop.run_in_executor(
+            self._process_pool(), _extract_file_in_worker, str(file_path))
+        self._merge_worker_stats(timings, cache_stats)
         
-        # Lưu kết quả vào thư mục output
         if result:
-            self._save_by_document_type(doc_type, [result], output_dir)
-        
+            if self._async_write_lock is None:
+                self._async_write_lock = asyncio.Lock()
+            async with self._async_write_lock:
+                await loop.run_in_executor(None, self._save_file_result, doc_type, file_path, result,
+                                           output_dir)
         return result
+    
+    def _process_pool(self):
+        """Process pool của các hàm asyncio, khởi tạo ở lần dùng đầu tiên"""
+        if self._async_executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            
+            self._async_executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(str(self.input_dir), self.profiler is not None, self.cache_options, self.classify))
+        return self._async_executor
+    
+    def close(self):
+        """Dừng process pool của các hàm asyncio (nếu có) và đóng cache"""
+        if self._async_executor is not None:
+            self._async_executor.shutdown(wait=False, cancel_futures=True)
+            self._async_executor = None
+        if self.cache is not None:
+            self.cache.close()
+    
+    async def aprocess_directory(self, doc_type: str = None) -> AsyncIterator[Tuple[str, str, Optional[Dict[str, Any]]]]:
+        """
+        Phiên bản asyncio của xử lý thư mục: sinh (loại văn bản, nguồn, kết quả) theo thứ tự
+        xử lý xong, để bên dùng xử lý tiếp (ghi, đánh chỉ mục...) ngay trong event loop
+        
+        Việc duyệt thư mục chạy trong thread pool mặc định; việc đọc, xác định loại văn bản (ở
+        chế độ --classify) và trích xuất chạy trên process pool dùng chung với aprocess_file
+        (workers process, kể cả khi workers = 1, vì regex giữ GIL suốt một lần tìm trên văn bản
+        lớn; dừng bằng close()), nên hai bước chồng lên nhau và event loop không bị chặn. Chỉ
+        một số lô văn bản giới hạn được gửi đi cùng lúc.
+        Kết quả không được ghi ra thư mục đầu ra và manifest không được dùng; kết quả là None
+        nếu văn bản lỗi.
+        
+        Args:
+            doc_type: Loại văn bản cần xử lý (None để xử lý tất cả)
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        executor = self._process_pool()
+        # Văn bản được gửi theo lô như _run_tasks, mỗi lô một lần gửi tới worker
+        max_pending = self.workers * 4
+        
+        batches = _batched(self._iter_work_items(doc_type), WORKER_BATCH_SIZE)
+        pending: Dict['asyncio.Future', List[WorkItem]] = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    batch = await loop.run_in_executor(None, next, batches, None)
+                    if batch is None:
+                        exhausted = True
+                    else:
+                        pending[loop.run_in_executor(executor, _process_batch_in_worker, batch)] = batch
+                if not pending:
+                    return
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    processed_items, timings, cache_stats = future.result()
+                    self._merge_worker_stats(timings, cache_stats)
+                    for (_, source, _), (doc_type_name, result) in zip(batch, processed_items):
+                        # Chế độ --classify: văn bản không xác định được loại hoặc không phải loại cần xử lý
+                        if doc_type_name is not None:
+                            yield doc_type_name, source, result
+        finally:
+            # Bên dùng có thể dừng giữa chừng: bỏ các văn bản chưa xử lý, không chờ worker
+            for future in pending:
+                future.cancel()
+
+
+# Mỗi worker của process pool giữ một bộ processor riêng, khởi tạo một lần
+_worker_processor: Optional[LawDocumentProcessor] = None
+
+
+def _init_worker(input_dir: str, profile: bool = False, cache_options: Optional[Dict[str, Any]] = None,
+                 classify: bool = False):
+    """Khởi tạo bộ processor cho worker"""
+    global _worker_processor
+    _worker_processor = LawDocumentProcessor(input_dir, profile=profile, classify=classify,
+                                             cache_options=cache_options)
+
+
+def _process_batch_in_worker(batch: List[WorkItem]) -> Tuple[List[ProcessedItem], Optional[Dict],
+                                                             Optional[Dict[str, int]]]:
+    """Xử lý một lô văn bản bên trong worker, trả về kèm số liệu đo và số liệu cache của lô (nếu có)"""
+    results = [_worker_processor._process_item(item) for item in batch]
+    profiler = _worker_processor.profiler
+    cache = _worker_processor.cache
+    return (results, profiler.snapshot(reset=True) if profiler is not None else None,
+            cache.stats(reset=True) if cache is not None else None)
+
+
+def _extract_file_in_worker(file_path: str) -> Tuple[str, Dict[str, Any], Optional[Dict], Optional[Dict[str, int]]]:
+    """Đọc và trích xuất một file bên trong worker, trả về kèm số liệu đo và số liệu cache"""
+    doc_type, result = _worker_processor._extract_file(file_path)
+    profiler = _worker_processor.profiler
+    cache = _worker_processor.cache
+    return (doc_type, result, profiler.snapshot(reset=True) if profiler is not None else None,
+            cache.stats(reset=True) if cache is not None else None)
+
+
+def _batched(items: Iterable[WorkItem], size: int) -> Iterator[List[WorkItem]]:
+    """Chia dòng đơn vị công việc thành các lô có kích thước tối đa size"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 def main():
@@ -212,10 +859,58 @@ def main():
                        help="Thư mục đầu ra")
     parser.add_argument("--doc-type", help="Loại văn bản cần xử lý (tùy chọn)")
     parser.add_argument("--single-file", help="Xử lý một file cụ thể")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Số process xử lý song song (mặc định: 1, xử lý tuần tự)")
+    parser.add_argument("--input-format", choices=["json", "jsonl"], default="json",
+                       help="json: mỗi văn bản một file; jsonl: shard nhiều văn bản, mỗi dòng một văn bản")
+    parser.add_argument("--output-format", choices=["json", "jsonl", "tar"], default="json",
+                       help="json: mỗi văn bản một file; jsonl/tar: một shard <loại văn bản>.jsonl "
+                            "hoặc <loại văn bản>.tar cho mỗi loại")
+    parser.add_argument("--compact", action="store_true",
+                       help="Ghi kết quả dạng JSON gọn (không indent), file nhỏ hơn và ghi nhanh hơn")
+    
+    parser.add_argument("--stream", action="store_true",
+                       help="Ghi từng văn bản ngay khi xử lý xong, bộ nhớ không tăng theo số văn bản")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Chỉ trích xuất lại văn bản mới hoặc đã thay đổi (dựa trên manifest)")
+    parser.add_argument("--manifest",
+                       help="Đường dẫn manifest cho --incremental (mặc định: <output-dir>/manifest.sqlite)")
+    parser.add_argument("--classify", action="store_true",
+                       help="Xác định loại văn bản từ phần đầu văn bản; đầu vào là các file trực tiếp "
+                            "trong --input-dir, không cần chia thư mục theo loại")
+    parser.add_argument("--profile", action="store_true",
+                       help="Đo thời gian từng extractor theo loại văn bản và các bước đọc/parse/ghi, "
+                            "báo cáo ở <output-dir>/profile.json và profile.txt")
+    parser.add_argument("--cache", action="store_true",
+                       help="Cache kết quả theo nội dung văn bản: văn bản trùng nội dung không trích xuất lại")
+    parser.add_argument("--cache-file",
+                       help="Lưu cache kết quả trên đĩa (SQLite), dùng lại giữa các lần chạy (bật --cache)")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                       help="Số kết quả tối đa giữ trong bộ nhớ (mặc định: 1024)")
+    parser.add_argument("--cache-disk-size", type=int, default=100_000,
+                       help="Số kết quả tối đa lưu trong --cache-file (mặc định: 100000)")
+    parser.add_argument("--cache-ttl", type=float,
+                       help="Số giây một kết quả trong cache còn được dùng (mặc định: không hết hạn)")
     
     args = parser.parse_args()
     
-    processor = LawDocumentProcessor(args.input_dir)
+    manifest_path = None
+    if args.incremental:
+        manifest_path = args.manifest or str(Path(args.output_dir) / "manifest.sqlite")
+    
+    cache_options = None
+    if args.cache or args.cache_file:
+        cache_options = {"db_path": args.cache_file, "max_entries": args.cache_size,
+                         "max_disk_entries": args.cache_disk_size, "ttl": args.cache_ttl}
+    
+    processor = LawDocumentProcessor(args.input_dir, workers=args.workers,
+                                     input_format=args.input_format,
+                                     output_format=args.output_format,
+                                     manifest_path=manifest_path,
+                                     profile=args.profile,
+                                     classify=args.classify,
+                                     compact=args.compact,
+                                     cache_options=cache_options)
     
     try:
         if args.single_file:
@@ -229,20 +924,38 @@ def main():
                 return 1
         else:
             # Xử lý thư mục
-            results = processor.process_directory(args.doc_type, args.output_dir)
-            
-            # Tạo file tổng hợp
-            processor._save_summary(results, args.output_dir)
+            if args.stream:
+                # File tổng hợp được tạo ngay trong quá trình xử lý
+                counts = processor.stream_directory(args.doc_type, args.output_dir)
+            else:
+                results = processor.process_directory(args.doc_type, args.output_dir)
+                
+                # Tạo file tổng hợp
+                processor._save_summary(results, args.output_dir)
+                counts = {doc_type: len(docs) for doc_type, docs in results.items()}
             
-            total_docs = sum(len(docs) for docs in results.values())
+            total_docs = sum(counts.values())
             print(f"\n🎉 Hoàn thành! Đã xử lý {total_docs} văn bản.")
             print(f"📁 Kết quả được lưu trong thư mục: {args.output_dir}")
             
             # Hiển thị thống kê
-            if results:
+            if counts:
                 print(f"\n📊 Thống kê theo loại văn bản:")
-                for doc_type, docs in results.items():
-                    print(f"   📄 {doc_type}: {len(docs)} văn bản")
+                for doc_type, count in counts.items():
+                    print(f"   📄 {doc_type}: {count} văn bản")
+        
+        if processor.profiler is not None:
+            profile_file = Path(args.output_dir) / "profile.json"
+            table_file = Path(args.output_dir) / "profile.txt"
+            report = processor.profiler.write(str(profile_file), str(table_file))
+            print(f"\n⏱️  Các mục tốn thời gian nhất:\n{processor.profiler.format_table(report, limit=20)}")
+            print(f"📊 Đã lưu báo cáo profile: {profile_file}, {table_file}")
+        
+        if processor.cache is not None:
+            stats = processor.cache.stats()
+            print(f"\n💾 Cache kết quả: {stats['hits']} hit ({stats['disk_hits']} từ đĩa), "
+                  f"{stats['misses']} miss, {stats['expired']} hết hạn, {stats['evictions']} bị loại")
+        processor.close()
                     
     except Exception as e:
         print(f"❌ Lỗi: {str(e)}")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trích xuất văn bản từ PDF sang JSON (cùng bố cục raw_json_output với extract_pdf_to_json.sh)
+
+Khác với script bash:
+- Từng trang được trích xuất song song trong một pool worker, trang của nhiều file đan xen
+  nhau nên một file scan dài không chặn các file còn lại
+- Chỉ OCR những trang mà pdftotext không lấy được đủ chữ, không rasterize cả file
+- Text của từng trang được ghi dần vào file JSON theo thứ tự trang, không giữ cả văn bản trong bộ nhớ
+
+Cách chạy:
+    python extract_pdf_to_json.py
+    python extract_pdf_to_json.py --src-dir pdf_files --dest-dir raw_json_output --workers 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Số ký tự không phải khoảng trắng tối thiểu để coi text của một trang là đủ
+MIN_TEXT_CHARS = 50
+
+
+def safe_print(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+def run_command(args: List[str]) -> str:
+    """Chạy lệnh, trả về stdout (rỗng nếu lệnh lỗi), bỏ các dòng trống cuối như $(...) của bash"""
+    try:
+        result = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        return ""
+    if result.returncode != 0:
+        return ""
+    return result.stdout.decode('utf-8', errors='replace').rstrip('\n')
+
+
+def is_text_sufficient(text: str, min_chars: int = MIN_TEXT_CHARS) -> bool:
+    """Kiểm tra text có đủ số ký tự không phải khoảng trắng"""
+    count = 0
+    for char in text:
+        if not char.isspace():
+            count += 1
+            if count >= min_chars:
+                return True
+    return False
+
+
+def get_page_count(pdf_path: Path) -> Optional[int]:
+    """Số trang của PDF theo pdfinfo, None nếu không đọc được"""
+    for line in run_command(['pdfinfo', str(pdf_path)]).splitlines():
+        if line.startswith('Pages:'):
+            try:
+                return int(line.split()[1])
+            except (IndexError, ValueError):
+                return None
+    return None
+
+
+def ocr_page(pdf_path: Path, page: int, lang: str) -> str:
+    """Rasterize một trang rồi OCR bằng tesseract"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_prefix = Path(tmp_dir) / 'page'
+        try:
+            subprocess.run(['pdftoppm', '-png', '-singlefile', '-f', str(page), '-l', str(page),
+                            str(pdf_path), str(image_prefix)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            return ""
+        image_path = image_prefix.with_suffix('.png')
+        if not image_path.exists():
+            return ""
+        return run_command(['tesseract', str(image_path), 'stdout', '-l', lang])
+
+
+def extract_page(pdf_path: Path, page: int, lang: str, min_chars: int) -> Tuple[str, bool]:
+    """
+    Trích xuất một trang: thử pdftotext trước, OCR nếu text không đủ
+
+    Returns:
+        (text của trang, trang có dùng OCR hay không)
+    """
+    text = run_command(['pdftotext', '-f', str(page), '-l', str(page), str(pdf_path), '-'])
+    if is_text_sufficient(text, min_chars):
+        return text, False
+
+    ocr_text = ocr_page(pdf_path, page, lang)
+    # Trang trắng hoặc OCR không tốt hơn thì giữ text gốc
+    if len(ocr_text.strip()) > len(text.strip()):
+        return ocr_text, True
+    return text, False
+
+
+class PdfJob:
+    """Một file PDF đang được trích xuất, ghi text từng trang vào JSON theo thứ tự trang"""
+
+    def __init__(self, pdf_path: Path, json_path: Path, page_count: int):
+        self.pdf_path = pdf_path
+        self.json_path = json_path
+        self.page_count = page_count
+        self.next_page = 1
+        self.done_pages: Dict[int, Tuple[str, bool]] = {}
+        self.written_pages = 0
+        self.ocr_pages = 0
+        self.text_length = 0
+        # Các dòng trống cuối chỉ được ghi khi có text phía sau (bash bỏ dòng trống cuối văn bản)
+        self.pending_newlines = ""
+
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        self.temp_path = json_path.with_name(json_path.name + '.tmp')
+        self.file = open(self.temp_path, 'w', encoding='utf-8')
+        self.file.write('{\n  "filename": ' + json.dumps(pdf_path.name, ensure_ascii=False)
+                        + ',\n  "text": "')
+
+    @property
+    def has_pending_pages(self) -> bool:
+        return self.next_page <= self.page_count
+
+    @property
+    def is_complete(self) -> bool:
+        return self.written_pages == self.page_count
+
+    def page_done(self, page: int, text: str, used_ocr: bool):
+        """Nhận kết quả một trang, ghi tiếp các trang liền mạch đã có"""
+        self.done_pages[page] = (text, used_ocr)
+        while self.written_pages + 1 in self.done_pages:
+            self.written_pages += 1
+            text, used_ocr = self.done_pages.pop(self.written_pages)
+            self.ocr_pages += used_ocr
+            self._write_text(text + '\n\n')
+
+    def _write_text(self, text: str):
+        body = text.rstrip('\n')
+        if not body:
+            self.pending_newlines += text
+            return
+        piece = self.pending_newlines + body
+        self.pending_newlines = text[len(body):]
+        self.text_length += len(piece)
+        self.file.write(json.dumps(piece, ensure_ascii=False)[1:-1])
+
+    @property
+    def extraction_method(self) -> str:
+        if self.ocr_pages == 0:
+            return "direct_text"
+        if self.ocr_pages == self.page_count:
+            return "ocr"
+        return "mixed"
+
+    def finish(self):
+        """Ghi các trường còn lại và đổi tên file tạm thành file JSON"""
+        self.file.write('",\n  "extraction_method": ' + json.dumps(self.extraction_method)
+                        + ',\n  "processed_at": ' + json.dumps(datetime.now().astimezone().isoformat(timespec='seconds'))
+                        + ',\n  "text_length": ' + str(self.text_length)
+                        + ',\n  "page_count": ' + str(self.page_count)
+                        + ',\n  "ocr_pages": ' + str(self.ocr_pages) + '\n}\n')
+        self.file.close()
+        self.temp_path.replace(self.json_path)
+
+    def abort(self):
+        self.file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+class PdfExtractor:
+    """Trích xuất toàn bộ PDF trong src_dir, các trang được lập lịch xoay vòng giữa các file"""
+
+    def __init__(self, src_dir: Path, dest_dir: Path, workers: int, lang: str = 'vie+eng',
+                 min_chars: int = MIN_TEXT_CHARS):
+        self.src_dir = src_dir
+        self.dest_dir = dest_dir
+        self.workers = max(1, workers)
+        self.lang = lang
+        self.min_chars = min_chars
+        # Số file mở cùng lúc và số trang chờ trong pool
+        self.max_open_files = self.workers * 2
+        self.max_in_flight = self.workers * 2
+        self.stats = {'files': 0, 'failed': 0, 'pages': 0, 'ocr_pages': 0}
+
+    def iter_jobs(self):
+        """Tạo PdfJob cho từng file PDF, bỏ qua file không đọc được số trang"""
+        for pdf_path in sorted(self.src_dir.rglob('*.pdf')):
+            relative_path = pdf_path.relative_to(self.src_dir)
+            json_path = self.dest_dir / relative_path.parent / (pdf_path.stem + '.json')
+            page_count = get_page_count(pdf_path)
+            if not page_count:
+                safe_print(f"❌ Không đọc được số trang: {pdf_path}")
+                self.stats['failed'] += 1
+                continue
+            safe_print(f"📄 Đang xử lý: {relative_path} ({page_count} trang)")
+            yield PdfJob(pdf_path, json_path, page_count)
+
+    def run(self):
+        pending_jobs = self.iter_jobs()
+        open_jobs: List[PdfJob] = []
+        futures = {}
+        turn = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    while len(open_jobs) < self.max_open_files:
+                        job = next(pending_jobs, None)
+                        if job is None:
+                            break
+                        open_jobs.append(job)
+
+                    # Xoay vòng giữa các file còn trang chưa gửi
+                    while len(futures) < self.max_in_flight:
+                        candidates = [job for job in open_jobs if job.has_pending_pages]
+                        if not candidates:
+                            break
+                        job = candidates[turn % len(candidates)]
+                        turn += 1
+                        future = pool.submit(extract_page, job.pdf_path, job.next_page, self.lang, self.min_chars)
+                        futures[future] = (job, job.next_page)
+                        job.next_page += 1
+
+                    if not futures:
+                        break
+
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job, page = futures.pop(future)
+                        text, used_ocr = future.result()
+                        job.page_done(page, text, used_ocr)
+                        if job.is_complete:
+                            self._finish_job(job)
+                            open_jobs.remove(job)
+            except BaseException:
+                for job in open_jobs:
+                    job.abort()
+                raise
+
+        safe_print(f"✅ Đã trích xuất {self.stats['files']} file ({self.stats['pages']} trang, "
+                   f"OCR {self.stats['ocr_pages']} trang), lỗi {self.stats['failed']} file, sang: {self.dest_dir}/")
+
+    def _finish_job(self, job: PdfJob):
+        job.finish()
+        self.stats['files'] += 1
+        self.stats['pages'] += job.page_count
+        self.stats['ocr_pages'] += job.ocr_pages
+        status = "✓" if job.text_length else "⚠"
+        safe_print(f"   {status} {job.json_path.name}: {job.text_length} ký tự, "
+                   f"{job.page_count} trang (OCR {job.ocr_pages})")
+
+
+def find_src_dir(src_dir: Optional[str]) -> Optional[Path]:
+    """Tìm thư mục pdf_files như script bash: cạnh script, thư mục hiện tại hoặc thư mục cha"""
+    if src_dir:
+        return Path(src_dir)
+    for candidate in (SCRIPT_DIR / 'pdf_files', Path.cwd() / 'pdf_files', Path.cwd().parent / 'pdf_files'):
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trích xuất văn bản PDF sang JSON (pdftotext + OCR theo trang)")
+    parser.add_argument("--src-dir", help="Thư mục chứa file PDF (mặc định: pdf_files)")
+    parser.add_argument("--dest-dir", help="Thư mục đầu ra (mặc định: raw_json_output cạnh pdf_files)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Số trang được trích xuất đồng thời")
+    parser.add_argument("--lang", default="vie+eng", help="Ngôn ngữ OCR của tesseract")
+    parser.add_argument("--min-chars", type=int, default=MIN_TEXT_CHARS,
+                        help="Số ký tự tối thiểu của một trang để không phải OCR")
+    args = parser.parse_args()
+
+    src_dir = find_src_dir(args.src_dir)
+    if src_dir is None or not src_dir.is_dir():
+        safe_print("❌ Không thể tìm thấy thư mục pdf_files")
+        safe_print("💡 Hãy chạy script từ thư mục chứa pdf_files hoặc chỉ định --src-dir")
+        return 1
+    dest_dir = Path(args.dest_dir) if args.dest_dir else src_dir.parent / 'raw_json_output'
+
+    safe_print(f"📂 Thư mục nguồn: {src_dir}")
+    safe_print(f"📂 Thư mục đích: {dest_dir}")
+    PdfExtractor(src_dir, dest_dir, args.workers, args.lang, args.min_chars).run()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
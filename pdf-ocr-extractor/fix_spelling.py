@@ -4,9 +4,11 @@
 import json
 import asyncio
 import aiohttp
+import hashlib
+import sqlite3
 import time
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 # Configuration management
@@ -17,9 +19,26 @@ except ImportError:
     YAML_AVAILABLE = False
     print("PyYAML not found. Install with: pip install pyyaml")
 
+# Ghi JSON nhanh hơn nếu có orjson (cùng định dạng đầu ra với json.dump(ensure_ascii=False, indent=2));
+# đọc vẫn dùng json vì nhanh hơn orjson với văn bản tiếng Việt dài
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 def safe_print(message):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
 
+def dump_json_bytes(data) -> bytes:
+    """Mã hóa dữ liệu thành JSON UTF-8, indent=2, giữ nguyên tiếng Việt"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
 class ConfigManager:
     """Quản lý cấu hình từ file YAML"""
     
@@ -76,11 +95,31 @@ class ConfigManager:
             },
             'paths': {
                 'input_dir': 'raw_json_output',
-                'output_dir': 'spelling_fixed_json'
+                'output_dir': 'spelling_fixed_json',
+                'temp_dir': 'temp_processing'
             },
             'processing': {
+                'max_workers': 2,
                 'max_chunk_size': 2000,
+                'batch_size': 5,
+                'chunk_sleep': 0.5,
                 'max_retries': 3
+            },
+            'text_processing': {
+                'skip_existing': False,
+                'resume': True
+            },
+            'performance': {
+                'connection_pool_size': 10,
+                'keep_alive': True
+            },
+            'advanced': {
+                'parallel_chunks': True
+            },
+            'cache': {
+                'enabled': True,
+                'path': 'cache/corrections.db',
+                'max_entries': 50000
             }
         }
     
@@ -97,6 +136,157 @@ class ConfigManager:
         
         return value
 
+class CorrectionCache:
+    """Cache kết quả sửa lỗi theo chunk, lưu trong SQLite để dùng lại giữa các file và các lần chạy"""
+    
+    def __init__(self, db_path: str, max_entries: int = 50000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS corrections ("
+            " key TEXT PRIMARY KEY,"
+            " corrected TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS corrections_last_used ON corrections (last_used)")
+        self.size = self.conn.execute("SELECT COUNT(*) FROM corrections").fetchone()[0]
+    
+    @staticmethod
+    def make_key(model_name: str, options: dict, prompt_template: str, text: str) -> str:
+        """Khóa cache: model, tham số sinh, mẫu prompt và hash nội dung chunk"""
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        raw = json.dumps([model_name, options, prompt_template, text_hash], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Lấy kết quả đã lưu, None nếu chưa có"""
+        row = self.conn.execute("SELECT corrected FROM corrections WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE corrections SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+    
+    def put(self, key: str, corrected: str):
+        """Lưu kết quả, xóa các bản ghi ít dùng nhất khi vượt quá max_entries"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO corrections VALUES (?, ?, ?)", (key, corrected, time.time())
+        )
+        self.size += cursor.rowcount
+        if self.size > self.max_entries:
+            # Xóa dư 10% để không phải dọn lại sau mỗi lần ghi
+            excess = self.size - self.max_entries + self.max_entries // 10
+            cursor = self.conn.execute(
+                "DELETE FROM corrections WHERE key IN "
+                "(SELECT key FROM corrections ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.size -= cursor.rowcount
+        self.conn.commit()
+    
+    def close(self):
+        """Commit và đóng cache"""
+        self.conn.commit()
+        self.conn.close()
+
+class FileProgress:
+    """Các chunk đã sửa xong của một file chưa hoàn tất"""
+    
+    def __init__(self, journal: 'ProgressJournal', source: str, source_hash: str):
+        self.journal = journal
+        self.source = source
+        self.source_hash = source_hash
+        self.chunks = journal.load_chunks(source, source_hash)
+    
+    def get(self, index: int, chunk: str) -> Optional[str]:
+        """Kết quả đã lưu của chunk, None nếu chunk chưa được sửa (hoặc cách chia chunk đã đổi)"""
+        saved = self.chunks.get(index)
+        if saved is not None and saved[0] == ProgressJournal.hash_text(chunk):
+            return saved[1]
+        return None
+    
+    def put(self, index: int, chunk: str, corrected: str):
+        """Ghi ngay kết quả của chunk để không mất khi tiến trình bị dừng"""
+        self.journal.save_chunk(self.source, self.source_hash, index, ProgressJournal.hash_text(chunk), corrected)
+
+class ProgressJournal:
+    """Nhật ký tiến độ trong SQLite: file đã xong và các chunk đã sửa của file đang dở"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " source TEXT PRIMARY KEY,"
+            " source_hash TEXT NOT NULL,"
+            " completed_at TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " source TEXT NOT NULL,"
+            " source_hash TEXT NOT NULL,"
+            " chunk_index INTEGER NOT NULL,"
+            " chunk_hash TEXT NOT NULL,"
+            " corrected TEXT NOT NULL,"
+            " PRIMARY KEY (source, chunk_index))"
+        )
+    
+    @staticmethod
+    def hash_text(text) -> str:
+        """Hash nội dung file hoặc chunk"""
+        data = text.encode('utf-8') if isinstance(text, str) else text
+        return hashlib.sha256(data).hexdigest()
+    
+    def is_completed(self, source: str, source_hash: str) -> bool:
+        """File đã được xử lý xong với đúng nội dung hiện tại"""
+        row = self.conn.execute("SELECT source_hash FROM files WHERE source = ?", (source,)).fetchone()
+        return row is not None and row[0] == source_hash
+    
+    def open_file(self, source: str, source_hash: str) -> FileProgress:
+        """Tiến độ của một file, gồm các chunk đã sửa ở lần chạy trước"""
+        return FileProgress(self, source, source_hash)
+    
+    def load_chunks(self, source: str, source_hash: str) -> dict:
+        """Các chunk đã lưu của file: chunk_index -> (chunk_hash, corrected)"""
+        rows = self.conn.execute(
+            "SELECT chunk_index, chunk_hash, corrected FROM chunks WHERE source = ? AND source_hash = ?",
+            (source, source_hash)
+        )
+        return {index: (chunk_hash, corrected) for index, chunk_hash, corrected in rows}
+    
+    def save_chunk(self, source: str, source_hash: str, index: int, chunk_hash: str, corrected: str):
+        """Lưu kết quả một chunk"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)",
+            (source, source_hash, index, chunk_hash, corrected)
+        )
+        self.conn.commit()
+    
+    def mark_completed(self, source: str, source_hash: str):
+        """Đánh dấu file đã xong, bỏ các chunk tạm của file"""
+        self.conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+            (source, source_hash, datetime.now().isoformat())
+        )
+        self.conn.commit()
+    
+    def clear(self):
+        """Xóa toàn bộ nhật ký sau một lần chạy hoàn tất"""
+        self.conn.execute("DELETE FROM chunks")
+        self.conn.execute("DELETE FROM files")
+        self.conn.commit()
+    
+    def close(self):
+        """Đóng nhật ký"""
+        self.conn.commit()
+        self.conn.close()
+
 class OllamaSpellChecker:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
@@ -117,6 +307,23 @@ class OllamaSpellChecker:
         self.max_chunk_size = self.config.get('processing.max_chunk_size', 2000)
         self.max_retries = self.config.get('processing.max_retries', 3)
         
+        # Concurrency
+        self.parallel_chunks = self.config.get('advanced.parallel_chunks', True)
+        self.chunk_batch_size = max(1, self.config.get('processing.batch_size', 5))
+        self.chunk_sleep = self.config.get('processing.chunk_sleep', 0.5)
+        self.connection_pool_size = max(1, self.config.get('performance.connection_pool_size', 10))
+        self.keep_alive = self.config.get('performance.keep_alive', True)
+        # Giới hạn số request đồng thời tới Ollama trên toàn bộ các file
+        self.request_slots = asyncio.Semaphore(self.connection_pool_size)
+        
+        # Cache kết quả theo chunk
+        self.cache = None
+        if self.config.get('cache.enabled', True):
+            self.cache = CorrectionCache(self.config.get('cache.path', 'cache/corrections.db'),
+                                         self.config.get('cache.max_entries', 50000))
+        # Các chunk giống nhau đang chờ model trả lời, chỉ gửi một request
+        self.pending_chunks = {}
+        
         self.check_connection()
         
     def check_connection(self):
@@ -166,8 +373,46 @@ VĂN BẢN CẦN SỬA:
 
 VĂN BẢN ĐÃ SỬA:"""
 
-    async def fix_text(self, text: str, session: aiohttp.ClientSession, retries: int = 0) -> str:
-        """Sử dụng Ollama để sửa lỗi chính tả"""
+    def options(self) -> dict:
+        """Tham số sinh gửi kèm request"""
+        return {
+            "temperature": self.temperature,
+            "top_p": self.top_p
+        }
+
+    async def fix_text(self, text: str, session: aiohttp.ClientSession) -> str:
+        """Sửa lỗi chính tả một chunk, giữ nguyên văn bản nếu model lỗi"""
+        corrected_text = await self.correct_text(text, session)
+        return corrected_text if corrected_text is not None else text
+
+    async def correct_text(self, text: str, session: aiohttp.ClientSession) -> Optional[str]:
+        """Sửa lỗi chính tả một chunk, dùng kết quả trong cache nếu đã có; None nếu model lỗi"""
+        if self.cache is None:
+            return await self.request_correction(text, session)
+        
+        # Model có thể đổi sau check_connection nên khóa được tính tại thời điểm gọi
+        key = CorrectionCache.make_key(self.model_name, self.options(), self.create_prompt('{text}'), text)
+        cached_text = self.cache.get(key)
+        if cached_text is not None:
+            return cached_text
+        
+        if key in self.pending_chunks:
+            corrected_text = await asyncio.shield(self.pending_chunks[key])
+        else:
+            task = asyncio.ensure_future(self.request_correction(text, session))
+            self.pending_chunks[key] = task
+            try:
+                corrected_text = await task
+            finally:
+                del self.pending_chunks[key]
+            # Không lưu chunk bị lỗi để lần sau còn gửi lại
+            if corrected_text is not None:
+                self.cache.put(key, corrected_text)
+        
+        return corrected_text
+
+    async def request_correction(self, text: str, session: aiohttp.ClientSession, retries: int = 0) -> Optional[str]:
+        """Gửi chunk tới Ollama, trả về None nếu vẫn lỗi sau max_retries lần thử lại"""
         try:
             prompt = self.create_prompt(text)
             
@@ -175,31 +420,29 @@ VĂN BẢN ĐÃ SỬA:"""
                 "model": self.model_name,
                 "prompt": prompt,
                 "stream": False,
-                "options": {
-                    "temperature": self.temperature,
-                    "top_p": self.top_p
-                }
+                "options": self.options()
             }
             
             timeout = aiohttp.ClientTimeout(total=self.timeout)
             
-            async with session.post(self.api_url, json=payload, timeout=timeout) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    corrected_text = result.get('response', '').strip()
-                    return corrected_text if corrected_text else text
-                else:
-                    if retries < self.max_retries:
-                        await asyncio.sleep(2)
-                        return await self.fix_text(text, session, retries + 1)
-                    return text
+            async with self.request_slots:
+                async with session.post(self.api_url, json=payload, timeout=timeout) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        corrected_text = result.get('response', '').strip()
+                        return corrected_text if corrected_text else text
+            
+            if retries < self.max_retries:
+                await asyncio.sleep(2)
+                return await self.request_correction(text, session, retries + 1)
+            return None
                     
         except Exception as e:
             if retries < self.max_retries:
                 await asyncio.sleep(2)
-                return await self.fix_text(text, session, retries + 1)
+                return await self.request_correction(text, session, retries + 1)
             safe_print(f"❌ Error processing text: {e}")
-            return text
+            return None
 
     def split_text(self, text: str) -> List[str]:
         """Chia văn bản thành các chunk nhỏ hơn"""
@@ -227,23 +470,76 @@ VĂN BẢN ĐÃ SỬA:"""
         
         return chunks
 
-    async def process_text(self, text: str, session: aiohttp.ClientSession) -> str:
-        """Xử lý văn bản, chia nhỏ nếu cần"""
+    async def process_text(self, text: str, session: aiohttp.ClientSession,
+                           progress: Optional['FileProgress'] = None) -> Optional[str]:
+        """
+        Xử lý văn bản, chia nhỏ nếu cần; chunk đã sửa được ghi vào progress (nếu có)
+        
+        Trả về None nếu có chunk không sửa được (model lỗi): các chunk còn lại vẫn được sửa
+        và ghi vào progress, để lần chạy sau chỉ phải gửi lại các chunk lỗi.
+        """
         if not text or len(text) < 50:
             return text
         
         if len(text) > self.max_chunk_size:
             chunks = self.split_text(text)
-            corrected_chunks = []
             
-            for chunk in chunks:
-                corrected_chunk = await self.fix_text(chunk, session)
-                corrected_chunks.append(corrected_chunk)
-                await asyncio.sleep(0.5)
+            if self.parallel_chunks:
+                corrected_chunks = await self.fix_chunks_concurrently(chunks, session, progress)
+            else:
+                corrected_chunks = []
+                for index, chunk in enumerate(chunks):
+                    corrected_chunk = await self.fix_chunk(index, chunk, session, progress)
+                    corrected_chunks.append(corrected_chunk)
+                    await asyncio.sleep(self.chunk_sleep)
             
+            if any(corrected_chunk is None for corrected_chunk in corrected_chunks):
+                return None
             return '. '.join(corrected_chunks)
         else:
-            return await self.fix_text(text, session)
+            return await self.fix_chunk(0, text, session, progress)
+
+    async def fix_chunk(self, index: int, chunk: str, session: aiohttp.ClientSession,
+                        progress: Optional['FileProgress'] = None) -> Optional[str]:
+        """
+        Sửa một chunk của file, bỏ qua chunk đã sửa xong ở lần chạy trước
+        
+        Trả về None nếu model lỗi; chunk lỗi không được ghi vào progress.
+        """
+        if progress is not None:
+            saved_chunk = progress.get(index, chunk)
+            if saved_chunk is not None:
+                return saved_chunk
+        
+        corrected_chunk = await self.correct_text(chunk, session)
+        if corrected_chunk is None:
+            return None
+        
+        if progress is not None:
+            progress.put(index, chunk, corrected_chunk)
+        return corrected_chunk
+
+    async def fix_chunks_concurrently(self, chunks: List[str], session: aiohttp.ClientSession,
+                                      progress: Optional['FileProgress'] = None) -> List[Optional[str]]:
+        """
+        Sửa các chunk song song, tối đa chunk_batch_size chunk của một file cùng lúc, giữ nguyên
+        thứ tự; chunk lỗi là None
+        """
+        corrected_chunks = [None] * len(chunks)
+        next_index = iter(range(len(chunks)))
+        
+        async def worker():
+            for index in next_index:
+                corrected_chunks[index] = await self.fix_chunk(index, chunks[index], session, progress)
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.chunk_batch_size, len(chunks)))))
+        return corrected_chunks
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """Tạo HTTP session với connection pool theo cấu hình"""
+        connector = aiohttp.TCPConnector(limit=self.connection_pool_size,
+                                         force_close=not self.keep_alive)
+        return aiohttp.ClientSession(connector=connector)
 
 class SpellCheckProcessor:
     def __init__(self, config_manager: ConfigManager):
@@ -254,10 +550,21 @@ class SpellCheckProcessor:
         self.input_dir = Path(self.config.get('paths.input_dir', 'raw_json_output'))
         self.output_dir = Path(self.config.get('paths.output_dir', 'spelling_fixed_json'))
         
+        # Số file được xử lý đồng thời
+        self.max_workers = max(1, self.config.get('processing.max_workers', 2))
+        
+        # Resume
+        self.skip_existing = self.config.get('text_processing.skip_existing', False)
+        self.journal = None
+        if self.config.get('text_processing.resume', True):
+            temp_dir = Path(self.config.get('paths.temp_dir', 'temp_processing'))
+            self.journal = ProgressJournal(temp_dir / 'spell_check_journal.db')
+        
         # Stats
         self.stats = {
             'total_files': 0,
             'processed_files': 0,
+            'skipped_files': 0,
             'failed_files': 0,
             'changes_made': 0
         }
@@ -269,9 +576,24 @@ class SpellCheckProcessor:
     async def process_json_file(self, input_file: Path, output_file: Path, session: aiohttp.ClientSession) -> bool:
         """Xử lý một file JSON"""
         try:
+            if self.skip_existing and output_file.exists():
+                safe_print(f"⏭️  Skipped (output exists): {input_file.name}")
+                self.stats['skipped_files'] += 1
+                return True
+            
             # Đọc file JSON
-            with open(input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            raw = input_file.read_bytes()
+            data = json.loads(raw.decode('utf-8'))
+            
+            progress = None
+            if self.journal is not None:
+                source = str(input_file.relative_to(self.input_dir))
+                source_hash = ProgressJournal.hash_text(raw)
+                if self.journal.is_completed(source, source_hash) and output_file.exists():
+                    safe_print(f"⏭️  Skipped (completed in previous run): {input_file.name}")
+                    self.stats['skipped_files'] += 1
+                    return True
+                progress = self.journal.open_file(source, source_hash)
 
             # Sửa lỗi chính tả trong nội dung text
             if isinstance(data, dict) and 'text' in data:
@@ -279,7 +601,13 @@ class SpellCheckProcessor:
                 if original_text and isinstance(original_text, str):
                     safe_print(f"🔄 Processing: {input_file.name}")
                     
-                    corrected_text = await self.ollama_checker.process_text(original_text, session)
+                    corrected_text = await self.ollama_checker.process_text(original_text, session, progress)
+                    if corrected_text is None:
+                        # Không ghi output và không đánh dấu hoàn tất: lần chạy sau (kể cả với
+                        # skip_existing) còn gửi lại các chunk lỗi
+                        safe_print(f"❌ Some chunks failed: {input_file.name}")
+                        self.stats['failed_files'] += 1
+                        return False
                     
                     if corrected_text != original_text:
                         data['text'] = corrected_text
@@ -288,10 +616,14 @@ class SpellCheckProcessor:
                     else:
                         safe_print(f"➖ No changes: {input_file.name}")
 
-            # Lưu file
+            # Lưu file qua file tạm để không để lại output dở dang khi bị dừng giữa chừng
             output_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            temp_file = output_file.with_name(output_file.name + '.tmp')
+            temp_file.write_bytes(dump_json_bytes(data))
+            temp_file.replace(output_file)
+            
+            if progress is not None:
+                self.journal.mark_completed(progress.source, progress.source_hash)
 
             self.stats['processed_files'] += 1
             return True
@@ -310,14 +642,32 @@ class SpellCheckProcessor:
         safe_print(f"🤖 Using model: {self.ollama_checker.model_name}")
         safe_print(f"📁 Input: {self.input_dir}")
         safe_print(f"📁 Output: {self.output_dir}")
+        safe_print(f"⚙️  Workers: {self.max_workers} files, "
+                   f"{self.ollama_checker.connection_pool_size} concurrent requests")
         
         start_time = time.time()
         
-        async with aiohttp.ClientSession() as session:
-            for json_file in json_files:
-                relative_path = json_file.relative_to(self.input_dir)
-                output_file = self.output_dir / relative_path
-                await self.process_json_file(json_file, output_file, session)
+        async with self.ollama_checker.create_session() as session:
+            pending_files = iter(json_files)
+            
+            async def worker():
+                # Các worker cùng lấy file từ một iterator, không file nào bị xử lý hai lần
+                for json_file in pending_files:
+                    relative_path = json_file.relative_to(self.input_dir)
+                    output_file = self.output_dir / relative_path
+                    await self.process_json_file(json_file, output_file, session)
+            
+            await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(json_files)))))
+
+        cache = self.ollama_checker.cache
+        if cache is not None:
+            cache.close()
+        
+        if self.journal is not None:
+            # Lần chạy hoàn tất thì bắt đầu lại từ đầu ở lần sau; còn file lỗi thì giữ để chạy tiếp
+            if self.stats['failed_files'] == 0:
+                self.journal.clear()
+            self.journal.close()
 
         total_duration = time.time() - start_time
         
@@ -327,8 +677,13 @@ class SpellCheckProcessor:
         safe_print(f"{'='*50}")
         safe_print(f"📊 Total files: {self.stats['total_files']}")
         safe_print(f"✅ Processed: {self.stats['processed_files']}")
+        safe_print(f"⏭️  Skipped: {self.stats['skipped_files']}")
         safe_print(f"🔄 Changes made: {self.stats['changes_made']}")
         safe_print(f"❌ Failed: {self.stats['failed_files']}")
+        if cache is not None:
+            lookups = cache.hits + cache.misses
+            hit_rate = cache.hits / lookups * 100 if lookups else 0.0
+            safe_print(f"💾 Cache: {cache.hits} hits, {cache.misses} misses ({hit_rate:.1f}% hit rate)")
         safe_print(f"⏱️  Time: {total_duration:.2f} seconds")
 
 async def main():
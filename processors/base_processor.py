@@ -3,28 +3,138 @@ Base processor cho các loại văn bản pháp luật
 Chứa các phương thức chung để trích xuất thông tin từ văn bản
 """
 
+import functools
+import hashlib
 import re
-from typing import Dict, List, Any, Optional
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Pattern, Set, Tuple
 from abc import ABC, abstractmethod
 
+from utils.text_utils import UNICODE_FORM, iter_lines_reversed
+from .document_scanner import scan_document
+from .linear_scanner import find_can_cu, find_trich_yeu
+
+
+def timed_pattern(name: str):
+    """
+    Cộng dồn thời gian chạy của extractor vào processor.pattern_timings[name]
+    
+    Override của extractor trong processor con cũng được gắn cùng tên; khi override gọi lại
+    extractor của lớp cha, chỉ lần gọi ngoài cùng được tính để không cộng thời gian hai lần.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            active = self._active_timings
+            if name in active:
+                return method(self, *args, **kwargs)
+            active.add(name)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                active.discard(name)
+                timings = self.pattern_timings
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        return wrapper
+    return decorator
+
 
 class BaseProcessor(ABC):
     """Lớp cơ sở cho tất cả các processor"""
     
+    # Kho pattern đã biên dịch, dùng chung cho mọi processor trong cùng một process
+    _pattern_registry: Dict[Tuple[str, int], Pattern] = {}
+    
+    # Hash mã nguồn của package processors, tính một lần khi cần
+    _code_hash: Optional[str] = None
+    
+    # Các module ngoài package processors mà kết quả trích xuất phụ thuộc vào
+    # (đường dẫn tính từ thư mục gốc của dự án)
+    VERSION_DEPENDENCIES = ('utils/text_utils.py', 'utils/keyword_automaton.py')
+    
+    # Extractor chạy lâu hơn ngưỡng này (giây) trên một văn bản được báo là chậm
+    SLOW_PATTERN_SECONDS = 0.5
+    
     def __init__(self):
         self.patterns = self._init_patterns()
+        # Thời gian chạy (giây) của từng nhóm pattern trên văn bản hiện tại
+        self.pattern_timings: Dict[str, float] = {}
+        # Các nhóm pattern đang được đo (extractor đang chạy)
+        self._active_timings: Set[str] = set()
+    
+    @classmethod
+    def get_version(cls) -> str:
+        """
+        Phiên bản của processor, dùng để biết kết quả trích xuất cũ còn dùng lại được không
+        
+        Gồm tên lớp và hash toàn bộ mã nguồn trong package processors cùng các module trong
+        VERSION_DEPENDENCIES, nên mọi thay đổi code của các processor (kể cả BaseProcessor)
+        hay của các hàm xử lý text mà processor dùng đều làm đổi phiên bản.
+        """
+        if BaseProcessor._code_hash is None:
+            package_dir = Path(__file__).parent
+            source_files = sorted(package_dir.glob('*.py'))
+            source_files += [package_dir.parent / name for name in BaseProcessor.VERSION_DEPENDENCIES]
+            digest = hashlib.sha256()
+            for source_file in source_files:
+                digest.update(source_file.relative_to(package_dir.parent).as_posix().encode('utf-8'))
+                digest.update(source_file.read_bytes())
+            BaseProcessor._code_hash = digest.hexdigest()[:16]
+        return f"{cls.__name__}-{BaseProcessor._code_hash}"
+    
+    @staticmethod
+    def compile_pattern(pattern: str, flags: int = 0) -> Pattern:
+        """
+        Biên dịch pattern regex, mỗi cặp (pattern, flags) chỉ biên dịch một lần
+        
+        Args:
+            pattern: Pattern regex dạng chuỗi
+            flags: Cờ regex (re.IGNORECASE, re.DOTALL, ...)
+            
+        Returns:
+            Pattern đã biên dịch, dùng chung giữa các processor
+        """
+        key = (pattern, flags)
+        compiled = BaseProcessor._pattern_registry.get(key)
+        if compiled is None:
+            # Văn bản được chuẩn hóa về UNICODE_FORM khi đọc vào, pattern cũng phải ở dạng đó
+            compiled = re.compile(unicodedata.normalize(UNICODE_FORM, pattern), flags)
+            BaseProcessor._pattern_registry[key] = compiled
+        return compiled
     
-    def _init_patterns(self) -> Dict[str, str]:
-        """Khởi tạo các pattern regex chung"""
+    def _init_patterns(self) -> Dict[str, Any]:
+        """
+        Khởi tạo các pattern regex chung (đã biên dịch kèm cờ tương ứng)
+        
+        Pattern dùng trong các extractor chung phải bắt đầu bằng từ khóa mốc tương ứng
+        trong document_scanner.ANCHORS, extractor chỉ tìm từ vị trí mốc đó.
+        Căn cứ pháp lý và trích yếu dùng bộ quét tuyến tính trong linear_scanner.
+        """
+        compile_pattern = self.compile_pattern
         return {
-            'so_hieu': r'Số:\s*([^\n]+)',
-            'ngay_ban_hanh': r'ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})',
-            'nguoi_ky': r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ\s]+)$',
-            'can_cu': r'Căn cứ\s+([^;]+(?:;[^;]+)*)',
-            'cong_bao': r'CÔNG BÁO[/\s]*Số:\s*([^\n/]+)/?([^\n/]*)/Ngày\s*([^\n]+)',
-            'thoi_gian_ky': r'Thời gian ký:\s*([^\n]+)',
-            'co_quan_ky': r'Cơ quan:\s*([^\n]+)',
-            'nguoi_ky_dien_tu': r'Người ký:\s*([^\n]+)',
+            'so_hieu': compile_pattern(r'Số:\s*([^\n]+)', re.IGNORECASE),
+            'ngay_ban_hanh': compile_pattern(r'ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})', re.IGNORECASE),
+            'nguoi_ky': compile_pattern(r'^[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ\s]+$'),
+            'chuc_vu_ky': compile_pattern(r'^(CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|GIÁM ĐỐC)'),
+            'cong_bao': compile_pattern(r'CÔNG BÁO[/\s]*Số:\s*([^\n/]+)/?([^\n/]*)/Ngày\s*([^\n]+)', re.IGNORECASE),
+            'thoi_gian_ky': compile_pattern(r'Thời gian ký:\s*([^\n]+)'),
+            'co_quan_ky': compile_pattern(r'Cơ quan:\s*([^\n]+)'),
+            'nguoi_ky_dien_tu': compile_pattern(r'Người ký:\s*([^\n]+)'),
+            # Các pattern thử lần lượt theo thứ tự
+            'co_quan_ban_hanh': tuple(compile_pattern(pattern, re.IGNORECASE) for pattern in (
+                r'(CHỦ TỊCH NƯỚC[^\n]*)',
+                r'(THỦ TƯỚNG[^\n]*)',
+                r'(BỘ TRƯỞNG[^\n]*)',
+                r'(CHỦ TỊCH[^\n]*)',
+                r'(GIÁM ĐỐC[^\n]*)',
+            )),
+            'dinh_dang_ngay': tuple(compile_pattern(pattern) for pattern in (
+                r'(\d{1,2})/(\d{1,2})/(\d{4})',
+                r'(\d{1,2})-(\d{1,2})-(\d{4})',
+            )),
         }
     
     @abstractmethod
@@ -35,49 +145,79 @@ class BaseProcessor(ABC):
         """
         pass
     
+    def _anchor(self, text: str, *kinds: str) -> Optional[int]:
+        """Vị trí mốc sớm nhất trong các loại mốc cho trước, None nếu văn bản không có mốc nào"""
+        scan = scan_document(text)
+        starts = [start for start in map(scan.start, kinds) if start is not None]
+        return min(starts) if starts else None
+    
+    def reset_pattern_timings(self):
+        """Bắt đầu đo thời gian cho một văn bản mới"""
+        self.pattern_timings.clear()
+    
+    def slow_patterns(self) -> List[Tuple[str, float]]:
+        """Các nhóm pattern chạy quá SLOW_PATTERN_SECONDS trên văn bản vừa xử lý, chậm nhất trước"""
+        slow = [(name, seconds) for name, seconds in self.pattern_timings.items()
+                if seconds >= self.SLOW_PATTERN_SECONDS]
+        return sorted(slow, key=lambda item: item[1], reverse=True)
+    
+    @timed_pattern('so_hieu')
     def extract_so_hieu(self, text: str) -> Optional[str]:
         """Trích xuất số hiệu văn bản"""
-        match = re.search(self.patterns['so_hieu'], text, re.IGNORECASE)
+        start = self._anchor(text, 'so_hieu')
+        if start is None:
+            return None
+        match = self.patterns['so_hieu'].search(text, start)
         return match.group(1).strip() if match else None
     
+    @timed_pattern('ngay_ban_hanh')
     def extract_ngay_ban_hanh(self, text: str) -> Optional[str]:
         """Trích xuất ngày ban hành"""
-        match = re.search(self.patterns['ngay_ban_hanh'], text, re.IGNORECASE)
+        start = self._anchor(text, 'ngay')
+        if start is None:
+            return None
+        match = self.patterns['ngay_ban_hanh'].search(text, start)
         if match:
             day, month, year = match.groups()
             return f"{day.zfill(2)}/{month.zfill(2)}/{year}"
         return None
     
+    @timed_pattern('nguoi_ky')
     def extract_nguoi_ky(self, text: str) -> Optional[str]:
-        """Trích xuất người ký"""
-        lines = text.strip().split('\n')
-        for i in range(len(lines) - 1, -1, -1):
-            line = lines[i].strip()
-            if line and not re.match(r'^(CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|GIÁM ĐỐC)', line):
+        """Trích xuất người ký (duyệt từ cuối văn bản lên, dừng ở dòng tên đầu tiên)"""
+        for line in iter_lines_reversed(text):
+            line = line.strip()
+            if line and not self.patterns['chuc_vu_ky'].match(line):
                 # Kiểm tra xem có phải là tên người không
-                if re.match(r'^[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ\s]+$', line):
+                if self.patterns['nguoi_ky'].match(line):
                     return line
         return None
     
+    @timed_pattern('can_cu')
     def extract_can_cu_phap_ly(self, text: str) -> List[str]:
         """Trích xuất các căn cứ pháp lý"""
         can_cu_list = []
         
-        # Tìm tất cả "Căn cứ"
-        can_cu_pattern = r'Căn cứ\s+([^;]+(?:;[^;]+)*?)(?=\s*(?:Căn cứ|NAY|QUYẾT ĐỊNH|CHÍNH PHỦ|CHỦ TỊCH))'
-        matches = re.finditer(can_cu_pattern, text, re.IGNORECASE | re.DOTALL)
+        start = self._anchor(text, 'can_cu')
+        if start is None:
+            return can_cu_list
         
-        for match in matches:
-            can_cu_text = match.group(1).strip()
+        # Tìm tất cả "Căn cứ"
+        for can_cu_text in find_can_cu(scan_document(text), start):
+            can_cu_text = can_cu_text.strip()
             # Loại bỏ dấu ";" cuối và split theo ";"
             can_cu_items = [item.strip() for item in can_cu_text.split(';') if item.strip()]
             can_cu_list.extend(can_cu_items)
         
         return can_cu_list
     
+    @timed_pattern('cong_bao')
     def extract_thong_tin_cong_bao(self, text: str) -> Dict[str, str]:
         """Trích xuất thông tin công báo"""
-        match = re.search(self.patterns['cong_bao'], text, re.IGNORECASE)
+        start = self._anchor(text, 'cong_bao')
+        if start is None:
+            return {}
+        match = self.patterns['cong_bao'].search(text, start)
         if match:
             so = match.group(1).strip()
             so_2 = match.group(2).strip() if match.group(2) else ""
@@ -95,59 +235,48 @@ class BaseProcessor(ABC):
             }
         return {}
     
+    @timed_pattern('ky_so')
     def extract_thong_tin_ky_so(self, text: str) -> Dict[str, str]:
         """Trích xuất thông tin ký số"""
         result = {}
         
-        # Người ký điện tử
-        match = re.search(self.patterns['nguoi_ky_dien_tu'], text)
-        if match:
-            result['nguoi_ky'] = match.group(1).strip()
-        
-        # Cơ quan
-        match = re.search(self.patterns['co_quan_ky'], text)
-        if match:
-            result['co_quan'] = match.group(1).strip()
-        
-        # Thời gian ký
-        match = re.search(self.patterns['thoi_gian_ky'], text)
-        if match:
-            result['thoi_gian_ky'] = match.group(1).strip()
+        for key, kind in (('nguoi_ky', 'nguoi_ky_dien_tu'),  # Người ký điện tử
+                          ('co_quan', 'co_quan_ky'),          # Cơ quan
+                          ('thoi_gian_ky', 'thoi_gian_ky')):  # Thời gian ký
+            start = self._anchor(text, kind)
+            if start is None:
+                continue
+            match = self.patterns[kind].search(text, start)
+            if match:
+                result[key] = match.group(1).strip()
         
         return result
     
+    @timed_pattern('co_quan_ban_hanh')
     def extract_co_quan_ban_hanh(self, text: str) -> Optional[str]:
         """Trích xuất cơ quan ban hành - method này sẽ được override trong các processor con"""
-        # Pattern chung cho các chức vụ
-        patterns = [
-            r'(CHỦ TỊCH NƯỚC[^\n]*)',
-            r'(THỦ TƯỚNG[^\n]*)',
-            r'(BỘ TRƯỞNG[^\n]*)',
-            r'(CHỦ TỊCH[^\n]*)',
-            r'(GIÁM ĐỐC[^\n]*)',
-        ]
+        start = self._anchor(text, 'chuc_vu')
+        if start is None:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        # Pattern chung cho các chức vụ
+        for pattern in self.patterns['co_quan_ban_hanh']:
+            match = pattern.search(text, start)
             if match:
                 return match.group(1).strip()
         
         return None
     
+    @timed_pattern('trich_yeu')
     def extract_trich_yeu(self, text: str) -> Optional[str]:
         """Trích xuất trích yếu văn bản"""
-        # Pattern chung để tìm tiêu đề sau số hiệu
-        patterns = [
-            r'Số:\s*[^\n]+\s*\n\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*(?:CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|GIÁM ĐỐC|Căn cứ))',
-            r'(?:LỆNH|LUẬT|NGHỊ ĐỊNH|QUYẾT ĐỊNH|THÔNG TƯ|CHỈ THỊ)\s*\n\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*(?:CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|GIÁM ĐỐC|Căn cứ))',
-        ]
+        start = self._anchor(text, 'so_hieu', 'ten_loai')
+        if start is None:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        
-        return None
+        # Tiêu đề sau số hiệu, hoặc sau tên loại văn bản
+        trich_yeu = find_trich_yeu(scan_document(text), start)
+        return trich_yeu.strip() if trich_yeu is not None else None
     
     def _format_date(self, date_str: str) -> str:
         """Chuẩn hóa format ngày tháng"""
@@ -155,13 +284,8 @@ class BaseProcessor(ABC):
         date_str = date_str.replace('-', '/')
         
         # Pattern để match các format ngày tháng
-        patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, date_str)
+        for pattern in self.patterns['dinh_dang_ngay']:
+            match = pattern.search(date_str)
             if match:
                 day, month, year = match.groups()
                 return f"{day.zfill(2)}-{month.zfill(2)}-{year}"
@@ -173,12 +297,10 @@ class BaseProcessor(ABC):
         if not text:
             return ""
         
-        # Loại bỏ các ký tự không cần thiết
-        text = re.sub(r'\s+', ' ', text)  # Thay nhiều space thành 1
-        text = text.strip()
-        
-        return text
+        # Thay mỗi chuỗi khoảng trắng thành 1 space (như re.sub(r'\s+', ' ', text).strip())
+        return ' '.join(text.split())
     
+    @timed_pattern('van_ban_cong_bo')
     def extract_van_ban_duoc_cong_bo(self, text: str) -> Dict[str, Any]:
         """
         Trích xuất thông tin văn bản được công bố
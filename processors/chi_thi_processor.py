@@ -4,58 +4,92 @@ Processor cho văn bản loại "Chỉ thị" - Phiên bản cập nhật
 
 import re
 from typing import Dict, Any, Optional, List
-from .base_processor import BaseProcessor
+from .base_processor import BaseProcessor, timed_pattern
+from utils.text_utils import fold_case
+from .document_scanner import DocumentScan, scan_document
+from .linear_scanner import find_numbered_items, find_until
 
 
 class ChiThiProcessor(BaseProcessor):
     """Processor chuyên xử lý văn bản Chỉ thị, kế thừa từ BaseProcessor."""
     
+    # Mapping tên đơn vị (so khớp không phân biệt hoa thường) -> tên chuẩn hóa
+    DON_VI_MAPPING = {
+        "Sở Xây dựng": "Sở Xây dựng",
+        "Công an thành phố": "Công an thành phố", 
+        "Thường trực Ban An toàn giao thông thành phố": "Ban An toàn giao thông thành phố",
+        "Các Ban Quản lý Dự án": "Các Ban Quản lý Dự án",
+        "Sở Nông nghiệp và Môi trường": "Sở Nông nghiệp và Môi trường",
+        "Sở Giáo dục và Đào tạo": "Sở Giáo dục và Đào tạo",
+        "Sở Tài chính": "Sở Tài chính",
+        "Báo Cần Thơ": "Báo Cần Thơ, Đài Phát thanh và Truyền Hình",
+        "Ủy ban Mặt Trận Tổ Quốc": "Ủy ban Mặt trận Tổ quốc Việt Nam và các tổ chức chính trị - xã hội",
+        "Ủy ban nhân dân phường, xã": "Ủy ban nhân dân phường, xã"
+    }
+    
+    # Các đoạn "TỪ KHÓA\s+(.*?)(?=KẾT THÚC|...)" tìm bằng bộ quét tuyến tính (không phân biệt hoa thường)
+    YEU_CAU = 'chủ tịch ủy ban nhân dân thành phố yêu cầu'
+    # Căn cứ\s+(.*?)(?=Nhằm ngăn ngừa|Thực hiện|Theo báo cáo|Chủ tịch ... yêu cầu)
+    CAN_CU = ('căn cứ',)
+    CAN_CU_KET_THUC = ('nhằm ngăn ngừa', 'thực hiện', 'theo báo cáo', YEU_CAU)
+    # Theo báo cáo\s+(.*?)(?=Nhằm ngăn ngừa|Chủ tịch ... yêu cầu)
+    THEO_BAO_CAO = ('theo báo cáo',)
+    THEO_BAO_CAO_KET_THUC = ('nhằm ngăn ngừa', YEU_CAU)
+    # Nhằm\s+(.*?)(?=,\s*Chủ tịch ... yêu cầu)
+    MUC_TIEU = ('nhằm',)
+    MUC_TIEU_KET_THUC = (YEU_CAU,)
+    # (\d+)\.\s+(.*?):\s*(.*?)(?=\n\d+\.|Yêu cầu Giám đốc sở|Trong quá trình thực hiện|$)
+    NHIEM_VU_KET_THUC = ('yêu cầu giám đốc sở', 'trong quá trình thực hiện')
+    
     def __init__(self):
         super().__init__()
+        # Tên đơn vị chuyển chữ thường một lần, so với bản chữ thường chung của văn bản
+        self._don_vi_keys = [(fold_case(key), value) for key, value in self.DON_VI_MAPPING.items()]
         # Cập nhật các pattern đặc biệt cho loại văn bản "Chỉ thị"
+        compile_pattern = self.compile_pattern
         self.patterns.update({
-            "trich_yeu": re.compile(
+            "trich_yeu": compile_pattern(
                 r"CHỈ THỊ\s+Về việc\s+(.*?)\s*(?=\n|$)",
                 re.IGNORECASE | re.DOTALL
             ),
-            "co_quan_ban_hanh": re.compile(
+            "co_quan_ban_hanh": compile_pattern(
                 r"ỦY BAN NHÂN DÂN\s+THÀNH PHỐ CẦN THƠ",
                 re.IGNORECASE | re.DOTALL
             ),
-            "so_hieu": re.compile(
+            "so_hieu": compile_pattern(
                 r"Số:\s*(\d+)/\s*(CT-UBND)",
                 re.IGNORECASE
             ),
-            "ngay_ban_hanh": re.compile(
+            "ngay_ban_hanh": compile_pattern(
                 r"(?:Cần Thơ, ngày)\s*(\d{1,2})?\s*tháng\s*(\d{1,2})\s+năm\s*(\d{4})",
                 re.IGNORECASE
             ),
-            "can_cu_phap_ly": re.compile(
-                r"Căn cứ\s+(.*?)(?=Nhằm ngăn ngừa|Thực hiện|Theo báo cáo|Chủ tịch Ủy ban nhân dân thành phố yêu cầu)",
+            "nguoi_ky": compile_pattern(
+                r"CHỦ TỊCH\s*\n\s*([^\n]+)",
                 re.IGNORECASE | re.DOTALL
             ),
-            "muc_tieu": re.compile(
-                r"Nhằm\s+(.*?)(?=,\s*Chủ tịch Ủy ban nhân dân thành phố yêu cầu)",
+            "so_hieu_du_phong": compile_pattern(r"Số:\s*([^/\n]+/CT-UBND)", re.IGNORECASE),
+            "tach_boi_canh": compile_pattern(r'(?=Căn cứ|Thực hiện|Theo báo cáo)'),
+            "nhiem_vu_con": compile_pattern(r'([a-z])\)\s+(.*?)(?=\s*[a-z]\)|$)', re.DOTALL | re.IGNORECASE),
+            "chi_dao_thuc_hien": compile_pattern(
+                r"Yêu cầu\s+(.*?)(?=Trong quá trình thực hiện|Nơi nhận|CHỦ TỊCH|$)",
                 re.IGNORECASE | re.DOTALL
             ),
-            "nguoi_ky": re.compile(
-                r"CHỦ TỊCH\s*\n\s*([^\n]+)",
-                re.IGNORECASE | re.DOTALL
-            )
         })
 
     def process(self, text: str, filename: str = "") -> Dict[str, Any]:
         """Xử lý văn bản Chỉ thị và trả về theo cấu trúc JSON mẫu."""
+        so_hieu = self.extract_so_hieu(text)
         
         result = {
             # Thêm các field cũ để tương thích với code chính
-            "so_hieu": "chi-thi",  # Đặt so_hieu để tạo filename
-            "filename": "chi-thi.json",
+            "so_hieu": so_hieu,
+            "filename": "chi-thi.json",  # Giữ để tương thích; tên file kết quả do main.py đặt
             
             # Cấu trúc mới theo JSON mẫu
             "chi_thi": {
                 "ten": self.extract_trich_yeu(text),
-                "so": self.extract_so_hieu(text),
+                "so": so_hieu,
                 "ngay_ban_hanh": self.extract_ngay_ban_hanh(text),
                 "co_quan_ban_hanh": self.extract_co_quan_ban_hanh(text),
                 "boi_canh": self.extract_boi_canh(text),
@@ -68,21 +102,19 @@ class ChiThiProcessor(BaseProcessor):
         
         return result
     
-    def get_output_filename(self, text: str = "", original_filename: str = "") -> str:
-        """Trả về tên file output cố định cho chỉ thị."""
-        return "chi-thi.json"
-    
+    @timed_pattern('so_hieu')
     def extract_so_hieu(self, text: str) -> Optional[str]:
         """Trích xuất số hiệu Chỉ thị từ văn bản."""
         match = self.patterns["so_hieu"].search(text)
         if match:
             return f"{match.group(1)}/{match.group(2)}"
         # Fallback: tìm trong dạng khác
-        fallback_match = re.search(r"Số:\s*([^/\n]+/CT-UBND)", text, re.IGNORECASE)
+        fallback_match = self.patterns["so_hieu_du_phong"].search(text)
         if fallback_match:
             return fallback_match.group(1).strip()
-        return "CT-UBND"
+        return None
         
+    @timed_pattern('ngay_ban_hanh')
     def extract_ngay_ban_hanh(self, text: str) -> Optional[str]:
         """Trích xuất ngày ban hành từ văn bản."""
         match = self.patterns["ngay_ban_hanh"].search(text)
@@ -93,6 +125,7 @@ class ChiThiProcessor(BaseProcessor):
                 return f"tháng {int(match.group(2))} năm {match.group(3)}"
         return None
     
+    @timed_pattern('co_quan_ban_hanh')
     def extract_co_quan_ban_hanh(self, text: str) -> Optional[str]:
         """Trích xuất tên cơ quan ban hành."""
         match = self.patterns["co_quan_ban_hanh"].search(text)
@@ -100,6 +133,7 @@ class ChiThiProcessor(BaseProcessor):
             return "Ủy ban nhân dân Thành phố Cần Thơ"
         return None
         
+    @timed_pattern('trich_yeu')
     def extract_trich_yeu(self, text: str) -> Optional[str]:
         """Trích xuất trích yếu (tên chỉ thị)."""
         match = self.patterns["trich_yeu"].search(text)
@@ -108,40 +142,42 @@ class ChiThiProcessor(BaseProcessor):
             return f"Chỉ thị về việc {title}"
         return None
     
+    @timed_pattern('boi_canh')
     def extract_boi_canh(self, text: str) -> List[str]:
         """Trích xuất bối cảnh ban hành chỉ thị."""
         boi_canh = []
         
+        scan = scan_document(text)
+        
         # Tìm phần căn cứ
-        can_cu_match = self.patterns["can_cu_phap_ly"].search(text)
-        if can_cu_match:
-            can_cu_text = can_cu_match.group(1)
+        can_cu_span = find_until(scan, 0, self.CAN_CU, self.CAN_CU_KET_THUC)
+        if can_cu_span:
+            can_cu_text = text[can_cu_span[0]:can_cu_span[1]]
             # Tách các văn bản căn cứ
-            can_cu_items = re.split(r'(?=Căn cứ|Thực hiện|Theo báo cáo)', can_cu_text)
+            can_cu_items = self.patterns["tach_boi_canh"].split(can_cu_text)
             for item in can_cu_items:
                 if item.strip():
                     boi_canh.append(item.strip())
         
         # Tìm thêm phần "Theo báo cáo"
-        theo_bao_cao = re.search(
-            r"Theo báo cáo\s+(.*?)(?=Nhằm ngăn ngừa|Chủ tịch Ủy ban nhân dân thành phố yêu cầu)",
-            text, re.IGNORECASE | re.DOTALL
-        )
+        theo_bao_cao = find_until(scan, 0, self.THEO_BAO_CAO, self.THEO_BAO_CAO_KET_THUC)
         if theo_bao_cao:
-            boi_canh.append(f"Theo báo cáo {theo_bao_cao.group(1).strip()}")
+            boi_canh.append(f"Theo báo cáo {text[theo_bao_cao[0]:theo_bao_cao[1]].strip()}")
         
         return boi_canh if boi_canh else [
             "Tình hình giao thông trong mùa mưa bão diễn biến phức tạp, tai nạn giao thông đường thủy có chiều hướng tăng cao.",
             "Nguy cơ ùn tắc và tai nạn giao thông khi triều cường dâng cao."
         ]
     
+    @timed_pattern('muc_tieu')
     def extract_muc_tieu(self, text: str) -> Optional[str]:
         """Trích xuất mục tiêu của chỉ thị."""
-        match = self.patterns["muc_tieu"].search(text)
-        if match:
-            return match.group(1).strip()
+        span = find_until(scan_document(text), 0, self.MUC_TIEU, self.MUC_TIEU_KET_THUC, separator=',')
+        if span:
+            return text[span[0]:span[1]].strip()
         return None
     
+    @timed_pattern('nguoi_ky')
     def extract_nguoi_ky(self, text: str) -> Optional[str]:
         """Trích xuất tên người ký chỉ thị."""
         match = self.patterns["nguoi_ky"].search(text)
@@ -149,39 +185,19 @@ class ChiThiProcessor(BaseProcessor):
             return match.group(1).strip()
         return None
     
+    @timed_pattern('nhiem_vu')
     def extract_nhiem_vu_cu_the(self, text: str) -> List[Dict[str, Any]]:
         """Trích xuất nhiệm vụ cụ thể cho từng đơn vị."""
         nhiem_vu_list = []
+        scan = scan_document(text)
         
-        # Mapping tên đơn vị
-        don_vi_mapping = {
-            "Sở Xây dựng": "Sở Xây dựng",
-            "Công an thành phố": "Công an thành phố", 
-            "Thường trực Ban An toàn giao thông thành phố": "Ban An toàn giao thông thành phố",
-            "Các Ban Quản lý Dự án": "Các Ban Quản lý Dự án",
-            "Sở Nông nghiệp và Môi trường": "Sở Nông nghiệp và Môi trường",
-            "Sở Giáo dục và Đào tạo": "Sở Giáo dục và Đào tạo",
-            "Sở Tài chính": "Sở Tài chính",
-            "Báo Cần Thơ": "Báo Cần Thơ, Đài Phát thanh và Truyền Hình",
-            "Ủy ban Mặt Trận Tổ Quốc": "Ủy ban Mặt trận Tổ quốc Việt Nam và các tổ chức chính trị - xã hội",
-            "Ủy ban nhân dân phường, xã": "Ủy ban nhân dân phường, xã"
-        }
-        
-        # Pattern để tìm các mục từ 1. đến 10.
-        task_pattern = re.compile(
-            r"(\d+)\.\s+(.*?):\s*(.*?)(?=\n\d+\.|Yêu cầu Giám đốc sở|Trong quá trình thực hiện|$)",
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        matches = task_pattern.finditer(text)
-        
-        for match in matches:
-            so_thu_tu = match.group(1)
-            ten_don_vi = match.group(2).strip()
-            noi_dung = match.group(3).strip()
+        # Tìm các mục từ 1. đến 10.
+        for so_thu_tu, ten_span, noi_dung_span in find_numbered_items(scan, self.NHIEM_VU_KET_THUC):
+            ten_don_vi = text[ten_span[0]:ten_span[1]].strip()
+            noi_dung = text[noi_dung_span[0]:noi_dung_span[1]].strip()
             
             # Chuẩn hóa tên đơn vị
-            don_vi_chuan = self._chuan_hoa_ten_don_vi(ten_don_vi, don_vi_mapping)
+            don_vi_chuan = self._chuan_hoa_ten_don_vi(scan, *ten_span) or ten_don_vi
             
             # Tách các nhiệm vụ con (a), b), c)...)
             nhiem_vu_con = self._tach_nhiem_vu_con(noi_dung)
@@ -193,18 +209,17 @@ class ChiThiProcessor(BaseProcessor):
         
         return nhiem_vu_list
     
-    def _chuan_hoa_ten_don_vi(self, ten_goc: str, mapping: Dict[str, str]) -> str:
-        """Chuẩn hóa tên đơn vị theo mapping."""
-        for key, value in mapping.items():
-            if key.lower() in ten_goc.lower():
+    def _chuan_hoa_ten_don_vi(self, scan: DocumentScan, start: int, end: int) -> Optional[str]:
+        """Tên chuẩn của đơn vị có tên ở đoạn [start, end) của văn bản, None nếu không có trong mapping."""
+        for key, value in self._don_vi_keys:
+            if scan.contains(start, end, key):
                 return value
-        return ten_goc
+        return None
     
     def _tach_nhiem_vu_con(self, noi_dung: str) -> List[str]:
         """Tách các nhiệm vụ con từ nội dung."""
         # Tìm các mục a), b), c)...
-        sub_tasks_pattern = re.compile(r'([a-z])\)\s+(.*?)(?=\s*[a-z]\)|$)', re.DOTALL | re.IGNORECASE)
-        sub_tasks = sub_tasks_pattern.findall(noi_dung)
+        sub_tasks = self.patterns["nhiem_vu_con"].findall(noi_dung)
         
         if sub_tasks:
             return [task[1].strip().replace('\n', ' ').replace('  ', ' ') for task in sub_tasks]
@@ -212,16 +227,11 @@ class ChiThiProcessor(BaseProcessor):
             # Nếu không có mục con, trả về toàn bộ nội dung
             return [noi_dung.replace('\n', ' ').replace('  ', ' ')]
     
+    @timed_pattern('chi_dao_thuc_hien')
     def extract_chi_dao_thuc_hien(self, text: str) -> Optional[str]:
         """Trích xuất phần chỉ đạo thực hiện."""
-        pattern = re.compile(
-            r"Yêu cầu\s+(.*?)(?=Trong quá trình thực hiện|Nơi nhận|CHỦ TỊCH|$)",
-            re.IGNORECASE | re.DOTALL
-        )
-        match = pattern.search(text)
+        match = self.patterns["chi_dao_thuc_hien"].search(text)
         if match:
-            chi_dao = match.group(1).strip()
             # Làm sạch text
-            chi_dao = re.sub(r'\s+', ' ', chi_dao)
-            return chi_dao
+            return scan_document(text).collapse(*match.span(1))
         return None
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Xác định loại văn bản từ phần đầu văn bản, để đầu vào không cần được chia sẵn vào thư mục
+theo loại
+
+Phần đầu văn bản được duyệt một lần bằng automaton Aho-Corasick chứa mọi dấu hiệu:
+quốc hiệu/tiêu ngữ, tên loại văn bản viết hoa ở đầu dòng (NGHỊ ĐỊNH, CHỈ THỊ, ...), ký hiệu
+trong số hiệu (/NĐ-CP, /CT-UBND, ...) và "V/v" của công văn. Thứ tự ưu tiên:
+
+1. Ký hiệu văn bản hợp nhất (/VBHN-) hoặc khối "XÁC THỰC VĂN BẢN HỢP NHẤT" (nằm ở cuối phần
+   nội dung, trước phụ lục): văn bản hợp nhất mang tên loại của văn bản gốc
+2. Tên loại đầu tiên đứng đầu dòng sau quốc hiệu/tiêu ngữ (hoặc trong cả phần đầu nếu không có)
+3. "V/v" (công văn không có tên loại)
+4. Ký hiệu đầu tiên trong số hiệu
+"""
+
+from typing import Dict, Optional, Tuple
+
+from utils.keyword_automaton import KeywordAutomaton
+
+# Số ký tự đầu văn bản được dùng để phân loại (đủ cho khối chữ ký số, công báo và tiêu đề)
+HEADER_CHARS = 4000
+
+# Tên loại văn bản viết hoa, phải đứng đầu dòng
+TITLES: Dict[str, Tuple[str, ...]] = {
+    "Lệnh": ('LỆNH',),
+    "Luật": ('LUẬT',),
+    "Nghị định": ('NGHỊ ĐỊNH',),
+    "Nghị quyết": ('NGHỊ QUYẾT',),
+    "Quyết định": ('QUYẾT ĐỊNH',),
+    "Thông tư": ('THÔNG TƯ',),
+    "Chỉ thị": ('CHỈ THỊ',),
+    "Công điện": ('CÔNG ĐIỆN',),
+    "Kết luận": ('KẾT LUẬN',),
+    "Pháp lệnh": ('PHÁP LỆNH',),
+    "Thông báo": ('THÔNG BÁO',),
+    "Hướng dẫn": ('HƯỚNG DẪN',),
+    "Kế hoạch": ('KẾ HOẠCH',),
+    "Quy định": ('QUY ĐỊNH',),
+    "Quy chế": ('QUY CHẾ',),
+    "Phương án": ('PHƯƠNG ÁN',),
+    "Đề án": ('ĐỀ ÁN',),
+    "Thông tư liên tịch": ('THÔNG TƯ LIÊN TỊCH',),
+    "Văn bản hợp nhất": ('VĂN BẢN HỢP NHẤT',),
+    "Quy chuẩn việt nam": ('QUY CHUẨN KỸ THUẬT QUỐC GIA',),
+}
+
+# Ký hiệu loại văn bản trong số hiệu (kể cả dạng OCR mất dấu)
+CODES: Dict[str, Tuple[str, ...]] = {
+    "Lệnh": ('/L-CTN',),
+    "Luật": ('/QH1',),
+    "Nghị định": ('/NĐ-', '/ND-'),
+    "Nghị quyết": ('/NQ-', '-NQ/'),
+    "Quyết định": ('/QĐ-', '/QD-'),
+    "Thông tư": ('/TT-',),
+    "Chỉ thị": ('/CT-', '-CT/'),
+    "Công điện": ('/CĐ-', '/CD-'),
+    "Kết luận": ('/KL-', '-KL/'),
+    "Pháp lệnh": ('/UBTVQH',),
+    "Thông báo": ('/TB-', '-TB/'),
+    "Hướng dẫn": ('/HD-', '-HD/'),
+    "Kế hoạch": ('/KH-', '-KH/'),
+    "Quy chế": ('/QC-', '-QC/'),
+    "Phương án": ('/PA-',),
+    "Đề án": ('/ĐA-', '/DA-', '-ĐA/'),
+    "Thông tư liên tịch": ('/TTLT-',),
+    "Quy chuẩn việt nam": ('QCVN ',),
+}
+
+# Ký hiệu được ưu tiên hơn tên loại
+OVERRIDE_CODES: Dict[str, Tuple[str, ...]] = {
+    "Văn bản hợp nhất": ('/VBHN-', '-VBHN-'),
+}
+
+# Khối xác thực của văn bản hợp nhất, tìm trong toàn bộ văn bản
+VBHN_MARKERS = ('XÁC THỰC VĂN BẢN HỢP NHẤT',)
+
+MOTTOS = ('CỘNG HÒA XÃ HỘI CHỦ NGHĨA', 'CỘNG HOÀ XÃ HỘI CHỦ NGHĨA', 'Độc lập - Tự do', 'ĐỘC LẬP - TỰ DO')
+CONG_VAN_MARKERS = ('V/v', 'V/V')
+
+# Loại dấu hiệu
+_MOTTO, _TITLE, _CODE, _OVERRIDE, _CONG_VAN = range(5)
+
+
+def _build_automaton() -> KeywordAutomaton:
+    keywords = [(keyword, (_MOTTO, None)) for keyword in MOTTOS]
+    keywords += [(keyword, (_CONG_VAN, "Công văn")) for keyword in CONG_VAN_MARKERS]
+    for kind, table in ((_TITLE, TITLES), (_CODE, CODES), (_OVERRIDE, OVERRIDE_CODES)):
+        keywords += [(keyword, (kind, doc_type)) for doc_type, group in table.items() for keyword in group]
+    return KeywordAutomaton(keywords)
+
+
+_AUTOMATON = _build_automaton()
+
+
+def _is_title(text: str, start: int, end: int) -> bool:
+    """Tên loại đứng đầu dòng (sau khoảng trắng) và không dính liền chữ phía sau"""
+    line_start = text.rfind('\n', 0, start) + 1
+    if text[line_start:start].strip():
+        return False
+    return end == len(text) or not text[end].isalpha()
+
+
+def classify_document(text: str) -> Optional[str]:
+    """
+    Loại văn bản (khóa của registry processor) xác định từ phần đầu văn bản
+
+    Returns:
+        Loại văn bản, None nếu không có dấu hiệu nào
+    """
+    header = text[:HEADER_CHARS]
+    motto_end = None
+    titles = []
+    first_code = None
+    cong_van = False
+
+    for start, end, (kind, doc_type) in _AUTOMATON.iter_matches(header):
+        if kind == _OVERRIDE:
+            return doc_type
+        if kind == _MOTTO:
+            if motto_end is None:
+                motto_end = end
+        elif kind == _TITLE:
+            if _is_title(header, start, end):
+                titles.append((start, -(end - start), doc_type))
+        elif kind == _CODE:
+            if first_code is None:
+                first_code = doc_type
+        else:
+            cong_van = True
+
+    if any(marker in text for marker in VBHN_MARKERS):
+        return "Văn bản hợp nhất"
+    if titles:
+        # Tên loại đầu tiên sau quốc hiệu; cùng vị trí thì lấy tên dài hơn (THÔNG TƯ LIÊN TỊCH)
+        after_motto = [title for title in titles if motto_end is not None and title[0] >= motto_end]
+        return min(after_motto or titles)[2]
+    if cong_van:
+        return "Công văn"
+    return first_code
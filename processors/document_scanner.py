@@ -0,0 +1,110 @@
+"""
+Xác định vị trí các mốc (số hiệu, ngày, chức vụ, căn cứ, công báo, thông tin ký số, ...)
+của văn bản, tính một lần và dùng chung cho mọi extractor
+
+Mỗi pattern của extractor bắt đầu bằng một mốc cố định, nên match đầu tiên của pattern
+không thể nằm trước lần xuất hiện đầu tiên của mốc đó. Extractor chỉ cần tìm từ vị trí
+mốc thay vì quét lại toàn bộ văn bản, và bỏ qua hẳn khi văn bản không có mốc.
+
+DocumentScan cũng là dạng đã chuẩn bị của văn bản dùng chung cho mọi extractor: bản chữ
+thường được tính một lần (cùng độ dài và vị trí với bản gốc, nên vị trí match trên bản gốc
+dùng được trực tiếp), extractor so khớp không phân biệt hoa thường và chuẩn hóa khoảng trắng
+trên một đoạn của văn bản qua vị trí, không phải tự lower()/re.sub lại từng đoạn.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.text_utils import fold_case
+
+
+# Từ khóa của từng loại mốc, so khớp không phân biệt hoa thường
+ANCHORS = {
+    'so_hieu': ('số:',),
+    'ngay': ('ngày',),
+    'chuc_vu': ('chủ tịch', 'thủ tướng', 'bộ trưởng', 'giám đốc'),
+    'ten_loai': ('lệnh', 'luật', 'nghị định', 'quyết định', 'thông tư', 'chỉ thị'),
+    'can_cu': ('căn cứ',),
+    'cong_bao': ('công báo',),
+    'nguoi_ky_dien_tu': ('người ký:',),
+    'co_quan_ky': ('cơ quan:',),
+    'thoi_gian_ky': ('thời gian ký:',),
+}
+
+
+class DocumentScan:
+    """Bản chữ thường và vị trí các mốc của một văn bản, tính khi cần và dùng chung"""
+
+    __slots__ = ('text', 'anchors', '_folded', '_positions')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.anchors: Dict[str, Optional[int]] = {}
+        self._folded: Optional[str] = None
+        self._positions: Dict[Tuple[str, ...], List[int]] = {}
+
+    @property
+    def folded(self) -> str:
+        """Bản chữ thường của văn bản, cùng độ dài và vị trí với bản gốc"""
+        if self._folded is None:
+            self._folded = fold_case(self.text)
+        return self._folded
+
+    def contains(self, start: int, end: int, keyword: str) -> bool:
+        """
+        Đoạn [start, end) của văn bản có chứa từ khóa không, không phân biệt hoa thường
+
+        Args:
+            keyword: Từ khóa đã chuyển qua fold_case()
+        """
+        return self.folded.find(keyword, start, end) != -1
+
+    def collapse(self, start: int, end: int) -> str:
+        """
+        Đoạn [start, end) của văn bản với mỗi chuỗi khoảng trắng thay bằng một space, bỏ
+        khoảng trắng hai đầu (cùng kết quả với re.sub(r'\\s+', ' ', ...).strip())
+        """
+        return ' '.join(self.text[start:end].split())
+
+    def start(self, kind: str) -> Optional[int]:
+        """Vị trí bắt đầu tìm cho một loại mốc, None nếu văn bản không có mốc này"""
+        if kind not in self.anchors:
+            folded = self.folded
+            starts = [pos for pos in (folded.find(keyword) for keyword in ANCHORS[kind]) if pos != -1]
+            self.anchors[kind] = min(starts) if starts else None
+        return self.anchors[kind]
+
+    def positions(self, keywords: Tuple[str, ...]) -> List[int]:
+        """Mọi vị trí xuất hiện (tăng dần) của các từ khóa chữ thường, không phân biệt hoa thường"""
+        if keywords not in self._positions:
+            folded = self.folded
+            found = set()
+            for keyword in keywords:
+                pos = folded.find(keyword)
+                while pos != -1:
+                    found.add(pos)
+                    pos = folded.find(keyword, pos + 1)
+            self._positions[keywords] = sorted(found)
+        return self._positions[keywords]
+
+
+# Mỗi thread giữ kết quả của văn bản gần nhất; các extractor trong cùng một lần
+# process() nhận cùng một object text nên mốc chỉ được tính một lần
+_local = threading.local()
+
+
+def scan_document(text: str) -> DocumentScan:
+    """
+    Lấy DocumentScan của văn bản, chỉ tạo mới khi gặp văn bản khác
+
+    Args:
+        text: Nội dung văn bản
+
+    Returns:
+        DocumentScan của văn bản
+    """
+    scan = getattr(_local, 'scan', None)
+    if scan is None or scan.text is not text:
+        scan = DocumentScan(text)
+        _local.scan = scan
+    return scan
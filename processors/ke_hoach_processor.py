@@ -4,7 +4,7 @@ Processor cho văn bản loại "Kế hoạch"
 
 import re
 from typing import Dict, Any, Optional
-from .base_processor import BaseProcessor
+from .base_processor import BaseProcessor, timed_pattern
 
 
 class KeHoachProcessor(BaseProcessor):
@@ -35,16 +35,19 @@ class KeHoachProcessor(BaseProcessor):
         
         return result
     
+    @timed_pattern('co_quan_ban_hanh')
     def extract_co_quan_ban_hanh(self, text: str) -> Optional[str]:
         """Trích xuất cơ quan ban hành cho Kế hoạch"""
         # TODO: Implement logic đặc biệt cho Kế hoạch
         return super().extract_co_quan_ban_hanh(text)
     
+    @timed_pattern('trich_yeu')
     def extract_trich_yeu(self, text: str) -> Optional[str]:
         """Trích xuất trích yếu cho Kế hoạch"""
         # TODO: Implement logic đặc biệt cho Kế hoạch
         return super().extract_trich_yeu(text)
     
+    @timed_pattern('van_ban_cong_bo')
     def extract_van_ban_duoc_cong_bo(self, text: str) -> Dict[str, Any]:
         """Trích xuất thông tin văn bản được công bố trong Kế hoạch"""
         # TODO: Implement logic đặc biệt cho Kế hoạch
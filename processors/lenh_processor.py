@@ -4,19 +4,36 @@ Processor cho văn bản loại "Lệnh"
 
 import re
 from typing import Dict, Any, Optional
-from .base_processor import BaseProcessor
+from .base_processor import BaseProcessor, timed_pattern
+from .document_scanner import scan_document
+from .linear_scanner import find_title_after
 
 
 class LenhProcessor(BaseProcessor):
     """Processor chuyên xử lý văn bản Lệnh"""
     
+    # Trích yếu: LỆNH\s*\n\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*CHỦ TỊCH), tìm bằng bộ quét tuyến tính.
+    # Dạng có "Số:" ở trước (Số:...\n...\n\s*LỆNH...) không cần thử riêng: khi dạng đó match thì
+    # dạng trên cũng match, ở cùng chữ "LỆNH" hoặc sớm hơn.
+    TRICH_YEU = ('lệnh',)
+    TRICH_YEU_KET_THUC = ('chủ tịch',)
+    # Văn bản được công bố: (?:NAY CÔNG BỐ:|CÔNG BỐ:)\s*\n?\s*(TIÊU ĐỀ)(?=\s*Đã được); hai cách
+    # viết cùng kết thúc ở "CÔNG BỐ:" nên chỉ cần tìm "công bố:"
+    CONG_BO = ('công bố:',)
+    CONG_BO_KET_THUC = ('đã được',)
+    
     def __init__(self):
         super().__init__()
+        compile_pattern = self.compile_pattern
         self.patterns.update({
-            'co_quan_ban_hanh': r'(CHỦ TỊCH\s*NƯỚC[^\n]*)',
-            'van_ban_cong_bo': r'(?:NAY CÔNG BỐ:|CÔNG BỐ:)\s*\n?\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*Đã được)',
-            'co_quan_thong_qua': r'Đã được\s+([^,]+),?\s*([^,]*),?\s*([^,]*)\s*thông qua',
-            'ngay_thong_qua': r'thông qua\s+ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})',
+            'co_quan_ban_hanh': tuple(compile_pattern(pattern, re.IGNORECASE) for pattern in (
+                r'(CHỦ TỊCH\s*NƯỚC\s*CỘNG\s*HÒA\s*XÃ\s*HỘI\s*CHỦ\s*NGHĨA\s*VIỆT\s*NAM)',
+                r'(CHỦ TỊCH\s*NƯỚC[^\n]*)',
+            )),
+            'co_quan_thong_qua': compile_pattern(r'Đã được\s+([^,\n]+(?:,[^,\n]+)*?)\s+(?:khóa|thông qua)', re.IGNORECASE),
+            'tach_khoa': compile_pattern(r'\s+khóa\s+', re.IGNORECASE),
+            'khoa_ky_hop': compile_pattern(r'khóa\s+([^,\s]+)(?:,\s*([^,\n]+))?', re.IGNORECASE),
+            'ngay_thong_qua': compile_pattern(r'thông qua\s+ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})', re.IGNORECASE),
         })
     
     def process(self, text: str, filename: str = "") -> Dict[str, Any]:
@@ -37,61 +54,55 @@ class LenhProcessor(BaseProcessor):
         
         return result
     
+    @timed_pattern('co_quan_ban_hanh')
     def extract_co_quan_ban_hanh(self, text: str) -> Optional[str]:
         """Trích xuất cơ quan ban hành cho Lệnh"""
-        patterns = [
-            r'(CHỦ TỊCH\s*NƯỚC\s*CỘNG\s*HÒA\s*XÃ\s*HỘI\s*CHỦ\s*NGHĨA\s*VIỆT\s*NAM)',
-            r'(CHỦ TỊCH\s*NƯỚC[^\n]*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        start = self._anchor(text, 'chuc_vu')
+        if start is not None:
+            for pattern in self.patterns['co_quan_ban_hanh']:
+                match = pattern.search(text, start)
+                if match:
+                    return match.group(1).strip()
         
         return "Chủ tịch nước Cộng hòa xã hội chủ nghĩa Việt Nam"
     
+    @timed_pattern('trich_yeu')
     def extract_trich_yeu(self, text: str) -> Optional[str]:
         """Trích xuất trích yếu cho Lệnh"""
-        patterns = [
-            r'LỆNH\s*\n\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*CHỦ TỊCH)',
-            r'Số:\s*[^\n]+\s*\n[^\n]*\n\s*LỆNH\s*\n\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*CHỦ TỊCH)',
-        ]
+        start = self._anchor(text, 'so_hieu', 'ten_loai')
+        if start is None:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-            if match:
-                trich_yeu = match.group(1).strip()
-                # Loại bỏ các dòng trống và chuẩn hóa
-                trich_yeu = re.sub(r'\s+', ' ', trich_yeu)
-                return trich_yeu
+        scan = scan_document(text)
+        span = find_title_after(scan, start, self.TRICH_YEU, self.TRICH_YEU_KET_THUC)
+        if span is not None:
+            # Loại bỏ các dòng trống và chuẩn hóa
+            return scan.collapse(*span)
         
         return None
     
+    @timed_pattern('van_ban_cong_bo')
     def extract_van_ban_duoc_cong_bo(self, text: str) -> Dict[str, Any]:
         """Trích xuất thông tin văn bản được công bố trong Lệnh"""
         result = {}
         
         # Tìm tên văn bản được công bố
-        van_ban_pattern = r'(?:NAY CÔNG BỐ:|CÔNG BỐ:)\s*\n?\s*([^\n]+(?:\n[^\n]+)*?)(?=\s*Đã được)'
-        match = re.search(van_ban_pattern, text, re.IGNORECASE | re.DOTALL)
-        if match:
-            result['ten'] = match.group(1).strip()
+        span = find_title_after(scan_document(text), 0, self.CONG_BO, self.CONG_BO_KET_THUC, newline=False)
+        if span is not None:
+            result['ten'] = text[span[0]:span[1]].strip()
         
         # Tìm cơ quan thông qua
-        co_quan_pattern = r'Đã được\s+([^,\n]+(?:,[^,\n]+)*?)\s+(?:khóa|thông qua)'
-        match = re.search(co_quan_pattern, text, re.IGNORECASE)
+        match = self.patterns['co_quan_thong_qua'].search(text)
         if match:
             co_quan_text = match.group(1).strip()
             
             # Tách cơ quan và khóa
             if 'khóa' in co_quan_text.lower():
-                parts = re.split(r'\s+khóa\s+', co_quan_text, flags=re.IGNORECASE)
+                parts = self.patterns['tach_khoa'].split(co_quan_text)
                 if len(parts) >= 2:
                     result['co_quan_thong_qua'] = parts[0].strip()
                     # Tìm thông tin khóa và kỳ họp
-                    khoa_ky_pattern = r'khóa\s+([^,\s]+)(?:,\s*([^,\n]+))?'
-                    khoa_match = re.search(khoa_ky_pattern, co_quan_text, re.IGNORECASE)
+                    khoa_match = self.patterns['khoa_ky_hop'].search(co_quan_text)
                     if khoa_match:
                         khoa = khoa_match.group(1).strip()
                         result['co_quan_thong_qua'] = f"{result['co_quan_thong_qua']} khóa {khoa}"
@@ -101,8 +112,7 @@ class LenhProcessor(BaseProcessor):
                 result['co_quan_thong_qua'] = co_quan_text
         
         # Tìm ngày thông qua
-        ngay_pattern = r'thông qua\s+ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})'
-        match = re.search(ngay_pattern, text, re.IGNORECASE)
+        match = self.patterns['ngay_thong_qua'].search(text)
         if match:
             day, month, year = match.groups()
             result['ngay_thong_qua'] = f"{day.zfill(2)}/{month.zfill(2)}/{year}"
@@ -0,0 +1,339 @@
+"""
+Bộ quét tuyến tính thay cho các regex dễ backtrack nặng của các processor
+
+- Căn cứ pháp lý: Căn cứ\\s+([^;]+(?:;[^;]+)*?)(?=\\s*(?:Căn cứ|NAY|QUYẾT ĐỊNH|CHÍNH PHỦ|CHỦ TỊCH))
+- Trích yếu: Số:\\s*[^\\n]+\\s*\\n\\s*(TIÊU ĐỀ), sau đó (?:LỆNH|LUẬT|...)\\s*\\n\\s*(TIÊU ĐỀ), với
+  TIÊU ĐỀ = ([^\\n]+(?:\\n[^\\n]+)*?)(?=\\s*(?:CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|GIÁM ĐỐC|Căn cứ))
+- Tiêu đề sau một từ khóa với từ khóa kết thúc riêng (find_title_after), ví dụ trích yếu và văn
+  bản được công bố của Lệnh
+- Đoạn từ một từ khóa tới từ khóa kết thúc gần nhất, TỪ KHÓA\\s+(.*?)(?=KẾT THÚC|...)
+  (find_until), ví dụ căn cứ, mục tiêu của Chỉ thị
+- Các mục đánh số (\\d+)\\.\\s+(.*?):\\s*(.*?)(?=\\n\\d+\\.|KẾT THÚC|...|$) (find_numbered_items),
+  ví dụ nhiệm vụ của Chỉ thị
+  (tất cả dùng cờ IGNORECASE | DOTALL)
+
+Khi văn bản OCR dài không có từ khóa kết thúc, regex thử lại toàn bộ phần còn lại của văn bản
+cho mỗi điểm bắt đầu, tổng chi phí tăng theo bình phương độ dài. Ở đây kết quả regex sẽ trả về
+được tính trực tiếp: vị trí các từ khóa và các điểm ngắt chuỗi (";;", dòng trống) được tìm một
+lần, mỗi điểm bắt đầu chỉ còn vài phép tìm nhị phân. Kết quả giống hệt regex cũ.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Iterator, List, Optional, Tuple
+
+from .document_scanner import DocumentScan
+
+
+CAN_CU = ('căn cứ',)
+CAN_CU_KET_THUC = ('căn cứ', 'nay', 'quyết định', 'chính phủ', 'chủ tịch')
+SO_HIEU = ('số:',)
+TEN_LOAI = ('lệnh', 'luật', 'nghị định', 'quyết định', 'thông tư', 'chỉ thị')
+TRICH_YEU_KET_THUC = ('chủ tịch', 'thủ tướng', 'bộ trưởng', 'giám đốc', 'căn cứ')
+
+# Đầu mục đánh số: chỉ thử từ đầu một dãy chữ số, vì nếu match từ đầu dãy thất bại thì từ giữa
+# dãy (cùng phần sau dấu chấm) cũng thất bại
+_MUC_DANH_SO = re.compile(r'(?<!\d)(\d+)\.\s+')
+_MUC_DANH_SO_TIEP = re.compile(r'\n\d+\.')
+
+
+def _skip_space(text: str, pos: int) -> int:
+    """Vị trí ký tự không phải khoảng trắng đầu tiên từ pos (như \\s*)"""
+    end = len(text)
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _chain_breaks(text: str, separator: str) -> List[int]:
+    """
+    Các vị trí separator mà chuỗi [^sep]+(?:sep[^sep]+)* không thể đi qua:
+    separator đứng ngay trước một separator khác hoặc ở cuối văn bản
+    """
+    breaks = []
+    doubled = separator * 2
+    pos = text.find(doubled)
+    while pos != -1:
+        breaks.append(pos)
+        pos = text.find(doubled, pos + 1)
+    if text.endswith(separator):
+        breaks.append(len(text) - 1)
+    return breaks
+
+
+def _chain_end(breaks: List[int], start: int, default: int) -> int:
+    """Điểm dừng của chuỗi bắt đầu tại start"""
+    index = bisect_left(breaks, start)
+    return breaks[index] if index < len(breaks) else default
+
+
+def _last_between(positions: List[int], low: int, high: int) -> Optional[int]:
+    """Phần tử lớn nhất của positions nằm trong khoảng (low, high)"""
+    index = bisect_left(positions, high) - 1
+    if index >= 0 and positions[index] > low:
+        return positions[index]
+    return None
+
+
+def find_can_cu(scan: DocumentScan, start: int) -> List[str]:
+    """
+    Nội dung group 1 của mọi match của regex căn cứ pháp lý, tính từ vị trí start
+
+    Với một điểm bắt đầu group, regex (tham lam ở từng đoạn, lười ở số đoạn nhưng đi hết chiều sâu
+    trước khi lùi) dừng ở vị trí kết thúc lớn nhất thỏa look-ahead. Đó là lần xuất hiện cuối cùng của
+    từ khóa kết thúc trong chuỗi các đoạn, không đứng ngay sau dấu ";".
+    """
+    text = scan.text
+    heads = scan.positions(CAN_CU)
+    if not heads:
+        return []
+    ends = [pos for pos in scan.positions(CAN_CU_KET_THUC) if pos > 0 and text[pos - 1] != ';']
+    breaks = _chain_breaks(text, ';')
+    head_length = len(CAN_CU[0])
+
+    def match_end(group_start: int) -> Optional[int]:
+        if group_start >= len(text) or text[group_start] == ';':
+            return None
+        return _last_between(ends, group_start, _chain_end(breaks, group_start, len(text)))
+
+    groups = []
+    index = bisect_left(heads, start)
+    while index < len(heads):
+        space_start = heads[index] + head_length
+        space_end = _skip_space(text, space_start)
+        found = None
+        if space_end > space_start:
+            end = match_end(space_end)
+            if end is not None:
+                found = (space_end, end)
+            elif space_end - space_start >= 2:
+                # \s+ lùi lại một ký tự: group bắt đầu bằng khoảng trắng (lùi thêm không có kết quả mới)
+                end = match_end(space_end - 1)
+                if end is not None:
+                    found = (space_end - 1, end)
+
+        if found is None:
+            index += 1
+        else:
+            groups.append(text[found[0]:found[1]])
+            index = bisect_left(heads, found[1], index + 1)
+    return groups
+
+
+class _TitleScanner:
+    """Tìm group TIÊU ĐỀ của regex trích yếu cho từng điểm bắt đầu"""
+
+    def __init__(self, scan: DocumentScan, terminators: Tuple[str, ...] = TRICH_YEU_KET_THUC):
+        self.text = text = scan.text
+        ends = scan.positions(terminators)
+        self.breaks = _chain_breaks(text, '\n')
+        # Cuối dòng mà sau đó (bỏ qua khoảng trắng) là từ khóa kết thúc
+        line_ends = []
+        for end in ends:
+            pos = end - 1
+            while pos >= 0 and text[pos].isspace():
+                if text[pos] == '\n':
+                    line_ends.append(pos)
+                pos -= 1
+        self.line_ends = sorted(line_ends)
+        # Từ khóa kết thúc không nằm ở đầu dòng
+        self.inner_ends = [pos for pos in ends if pos > 0 and text[pos - 1] != '\n']
+
+    def match_end(self, group_start: int) -> Optional[int]:
+        """
+        Vị trí kết thúc group khi group bắt đầu tại group_start, None nếu không match
+
+        Regex thử lần lượt cuối từng dòng (tăng dần) trước, sau đó mới lùi vào trong dòng
+        từ dòng cuối cùng của chuỗi dòng liền nhau trở về trước.
+        """
+        text = self.text
+        if group_start >= len(text) or text[group_start] == '\n':
+            return None
+        chain_end = _chain_end(self.breaks, group_start, len(text))
+        index = bisect_left(self.line_ends, group_start)
+        if index < len(self.line_ends) and self.line_ends[index] <= chain_end:
+            return self.line_ends[index]
+        return _last_between(self.inner_ends, group_start, chain_end)
+
+    def first_span(self, starts: Iterator[int]) -> Optional[Tuple[int, int]]:
+        """Vị trí group của điểm bắt đầu đầu tiên (theo thứ tự thử của regex) có match"""
+        for group_start in starts:
+            end = self.match_end(group_start)
+            if end is not None:
+                return group_start, end
+        return None
+
+    def first_title(self, starts: Iterator[int]) -> Optional[str]:
+        """Group của điểm bắt đầu đầu tiên (theo thứ tự thử của regex) có match"""
+        span = self.first_span(starts)
+        return self.text[span[0]:span[1]] if span is not None else None
+
+
+def _starts_after_so_hieu(text: str, pos: int) -> Iterator[int]:
+    """
+    Các điểm bắt đầu group sau "Số:" theo thứ tự thử của \\s*[^\\n]+\\s*\\n\\s*, bỏ trùng
+
+    Trước hết là dòng kế tiếp dòng số hiệu, sau đó là các điểm khi \\s* đầu tiên lùi vào
+    khoảng trắng nhiều dòng ngay sau "Số:".
+    """
+    space_end = _skip_space(text, pos)
+    if space_end < len(text):
+        line_end = text.find('\n', space_end)
+        if line_end != -1:
+            yield from range(_skip_space(text, line_end), line_end, -1)
+    first_char = pos
+    while first_char < space_end and text[first_char] == '\n':
+        first_char += 1
+    first_newline = text.find('\n', first_char, space_end)
+    if first_newline != -1:
+        yield from range(space_end, first_newline, -1)
+
+
+def _starts_after_ten_loai(text: str, pos: int) -> Iterator[int]:
+    """Các điểm bắt đầu group sau tên loại văn bản theo thứ tự thử của \\s*\\n\\s*, bỏ trùng"""
+    space_end = _skip_space(text, pos)
+    first_newline = text.find('\n', pos, space_end)
+    if first_newline != -1:
+        yield from range(space_end, first_newline, -1)
+
+
+def _starts_after_space(text: str, pos: int) -> Iterator[int]:
+    """Các điểm bắt đầu group theo thứ tự thử của \\s*\\n?\\s*, bỏ trùng"""
+    yield from range(_skip_space(text, pos), pos - 1, -1)
+
+
+def _title_after(scan: DocumentScan, titles: _TitleScanner, start: int, heads: Tuple[str, ...],
+                 newline: bool = True) -> Optional[Tuple[int, int]]:
+    """Vị trí group TIÊU ĐỀ sau lần xuất hiện đầu tiên (từ start) của từ khóa có match"""
+    text = scan.text
+    folded = scan.folded
+    starts_after = _starts_after_ten_loai if newline else _starts_after_space
+    for head in scan.positions(heads):
+        if head >= start:
+            keyword = next(keyword for keyword in heads if folded.startswith(keyword, head))
+            span = titles.first_span(starts_after(text, head + len(keyword)))
+            if span is not None:
+                return span
+    return None
+
+
+def find_trich_yeu(scan: DocumentScan, start: int) -> Optional[str]:
+    """
+    Group TIÊU ĐỀ của regex trích yếu đầu tiên có match (theo thứ tự hai regex), tính từ start
+
+    Returns:
+        Group chưa strip, None nếu cả hai regex đều không match
+    """
+    text = scan.text
+    titles = _TitleScanner(scan)
+
+    for head in scan.positions(SO_HIEU):
+        if head >= start:
+            title = titles.first_title(_starts_after_so_hieu(text, head + len(SO_HIEU[0])))
+            if title is not None:
+                return title
+
+    span = _title_after(scan, titles, start, TEN_LOAI)
+    return text[span[0]:span[1]] if span is not None else None
+
+
+def find_title_after(scan: DocumentScan, start: int, heads: Tuple[str, ...], terminators: Tuple[str, ...],
+                     newline: bool = True) -> Optional[Tuple[int, int]]:
+    """
+    Vị trí group của match đầu tiên (từ start) của regex
+    (?:TỪ KHÓA|...)\\s*\\n\\s*([^\\n]+(?:\\n[^\\n]+)*?)(?=\\s*(?:KẾT THÚC|...))
+
+    Args:
+        heads: Các từ khóa mở đầu (chữ thường), không từ khóa nào là tiền tố của từ khóa khác
+        terminators: Các từ khóa kết thúc (chữ thường)
+        newline: False khi phần giữa từ khóa và group là \\s*\\n?\\s* (không bắt buộc xuống dòng)
+
+    Returns:
+        (đầu, cuối) của group chưa strip, None nếu không match
+    """
+    return _title_after(scan, _TitleScanner(scan, terminators), start, heads, newline)
+
+
+def _ends_after_separator(scan: DocumentScan, separator: str, terminators: Tuple[str, ...]) -> List[int]:
+    """Vị trí (tăng dần) các lần xuất hiện của SEPARATOR\\s*(?:KẾT THÚC|...)"""
+    text = scan.text
+    ends = []
+    for pos in scan.positions(terminators):
+        while pos > 0 and text[pos - 1].isspace():
+            pos -= 1
+        if pos > 0 and text[pos - 1] == separator:
+            ends.append(pos - 1)
+    return ends
+
+
+def find_until(scan: DocumentScan, start: int, heads: Tuple[str, ...], terminators: Tuple[str, ...],
+               separator: str = '') -> Optional[Tuple[int, int]]:
+    """
+    Vị trí group của match đầu tiên (từ start) của regex TỪ KHÓA\\s+(.*?)(?=KẾT THÚC|...), hoặc
+    TỪ KHÓA\\s+(.*?)(?=SEPARATOR\\s*(?:KẾT THÚC|...)) khi có separator
+
+    Khi một từ khóa mở đầu không có từ khóa kết thúc phía sau, regex thử lại phần còn lại của
+    văn bản cho từng lần xuất hiện tiếp theo; ở đây vị trí các từ khóa kết thúc được tìm một lần.
+    Group bắt đầu sau toàn bộ khoảng trắng và kết thúc ở từ khóa kết thúc gần nhất (từ khóa kết
+    thúc và separator không bắt đầu bằng khoảng trắng, nên \\s+ lùi lại không cho match mới).
+
+    Args:
+        heads: Các từ khóa mở đầu (chữ thường)
+        terminators: Các từ khóa kết thúc (chữ thường)
+        separator: Ký tự đứng trước từ khóa kết thúc (cách bởi khoảng trắng tùy ý)
+
+    Returns:
+        (đầu, cuối) của group chưa strip, None nếu không match
+    """
+    text = scan.text
+    folded = scan.folded
+    ends = _ends_after_separator(scan, separator, terminators) if separator else scan.positions(terminators)
+    for head in scan.positions(heads):
+        if head < start:
+            continue
+        keyword = next(keyword for keyword in heads if folded.startswith(keyword, head))
+        space_start = head + len(keyword)
+        group_start = _skip_space(text, space_start)
+        if group_start == space_start:
+            continue
+        index = bisect_left(ends, group_start)
+        if index < len(ends):
+            return group_start, ends[index]
+    return None
+
+
+def find_numbered_items(scan: DocumentScan, terminators: Tuple[str, ...]) -> List[Tuple[str, Tuple[int, int], Tuple[int, int]]]:
+    """
+    Các match (theo finditer) của regex (\\d+)\\.\\s+(.*?):\\s*(.*?)(?=\\n\\d+\\.|KẾT THÚC|...|$)
+
+    Với mỗi đầu mục, regex tìm dấu ":" tới hết văn bản khi không có, chi phí tăng theo bình
+    phương số đầu mục. Ở đây đầu mục chỉ match khi còn dấu ":" phía sau; group 2 kết thúc ở dấu
+    ":" đầu tiên, group 3 ở điểm kết thúc gần nhất (tìm một lần cho cả văn bản).
+
+    Args:
+        terminators: Các từ khóa kết thúc (chữ thường)
+
+    Returns:
+        Danh sách (số thứ tự, (đầu, cuối) group 2, (đầu, cuối) group 3), group chưa strip
+    """
+    text = scan.text
+    ends = set(scan.positions(terminators))
+    ends.update(match.start() for match in _MUC_DANH_SO_TIEP.finditer(text))
+    # $ không có MULTILINE: cuối văn bản, hoặc trước ký tự xuống dòng cuối cùng
+    ends.add(len(text))
+    if text.endswith('\n'):
+        ends.add(len(text) - 1)
+    ends = sorted(ends)
+    last_colon = text.rfind(':')
+
+    items = []
+    pos = 0
+    while True:
+        head = _MUC_DANH_SO.search(text, pos)
+        if head is None or head.end() > last_colon:
+            return items
+        colon = text.find(':', head.end())
+        body_start = _skip_space(text, colon + 1)
+        body_end = ends[bisect_left(ends, body_start)]
+        items.append((head.group(1), (head.end(), colon), (body_start, body_end)))
+        pos = body_end
@@ -0,0 +1,92 @@
+"""
+Danh sách processor theo loại văn bản
+
+Module của một processor chỉ được import và processor chỉ được khởi tạo khi loại văn bản đó
+được dùng lần đầu, nên chạy một file hoặc một loại văn bản không phải nạp cả 21 processor.
+"""
+
+import threading
+from importlib import import_module
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+# Loại văn bản -> (module trong package processors, tên lớp processor)
+PROCESSOR_CLASSES: Dict[str, Tuple[str, str]] = {
+    "Lệnh": ("lenh_processor", "LenhProcessor"),
+    "Luật": ("luat_processor", "LuatProcessor"),
+    "Nghị định": ("nghi_dinh_processor", "NghiDinhProcessor"),
+    "Nghị quyết": ("nghi_quyet_processor", "NghiQuyetProcessor"),
+    "Quyết định": ("quyet_dinh_processor", "QuyetDinhProcessor"),
+    "Thông tư": ("thong_tu_processor", "ThongTuProcessor"),
+    "Chỉ thị": ("chi_thi_processor", "ChiThiProcessor"),
+    "Công văn": ("cong_van_processor", "CongVanProcessor"),
+    "Công điện": ("cong_dien_processor", "CongDienProcessor"),
+    "Kết luận": ("ket_luan_processor", "KetLuanProcessor"),
+    "Pháp lệnh": ("phap_lenh_processor", "PhapLenhProcessor"),
+    "Thông báo": ("thong_bao_processor", "ThongBaoProcessor"),
+    "Hướng dẫn": ("huong_dan_processor", "HuongDanProcessor"),
+    "Kế hoạch": ("ke_hoach_processor", "KeHoachProcessor"),
+    "Quy định": ("quy_dinh_processor", "QuyDinhProcessor"),
+    "Quy chế": ("quy_che_processor", "QuyCheProcessor"),
+    "Phương án": ("phuong_an_processor", "PhuongAnProcessor"),
+    "Đề án": ("de_an_processor", "DeAnProcessor"),
+    "Thông tư liên tịch": ("thong_tu_lien_tich_processor", "ThongTuLienTichProcessor"),
+    "Văn bản hợp nhất": ("van_ban_hop_nhat_processor", "VanBanHopNhatProcessor"),
+    "Quy chuẩn việt nam": ("quy_chuan_viet_nam_processor", "QuyChuanVietNamProcessor"),
+}
+
+
+def processor_class(doc_type: str) -> type:
+    """Lớp processor của một loại văn bản (import module khi cần, không khởi tạo processor)"""
+    module_name, class_name = PROCESSOR_CLASSES[doc_type]
+    return getattr(import_module(f".{module_name}", __package__), class_name)
+
+
+class ProcessorRegistry(Mapping):
+    """
+    Mapping loại văn bản -> processor, khởi tạo processor ở lần truy cập đầu tiên
+
+    Kiểm tra `doc_type in registry` và duyệt các loại văn bản không khởi tạo processor nào.
+    """
+
+    def __init__(self, on_load: Optional[Callable[[str, Any], None]] = None):
+        """
+        Args:
+            on_load: Hàm được gọi với (loại văn bản, processor) ngay sau khi processor được khởi tạo
+        """
+        self._processors: Dict[str, Any] = {}
+        self._on_load = on_load
+        self._lock = threading.Lock()
+
+    def __getitem__(self, doc_type: str) -> Any:
+        processor = self._processors.get(doc_type)
+        if processor is not None:
+            return processor
+
+        with self._lock:
+            # Thread khác có thể đã khởi tạo trong lúc chờ lock
+            processor = self._processors.get(doc_type)
+            if processor is None:
+                processor = processor_class(doc_type)()
+                if self._on_load is not None:
+                    self._on_load(doc_type, processor)
+                self._processors[doc_type] = processor
+        return processor
+
+    def __contains__(self, doc_type: object) -> bool:
+        return doc_type in PROCESSOR_CLASSES
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PROCESSOR_CLASSES)
+
+    def __len__(self) -> int:
+        return len(PROCESSOR_CLASSES)
+
+    def loaded(self) -> Dict[str, Any]:
+        """Các processor đã được khởi tạo"""
+        return dict(self._processors)
+
+    def load_all(self) -> 'ProcessorRegistry':
+        """Khởi tạo processor cho mọi loại văn bản"""
+        for doc_type in self:
+            self[doc_type]
+        return self
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Service trích xuất văn bản pháp luật chạy thường trú
+
+Processor được khởi tạo một lần khi service khởi động và giữ nguyên giữa các request, nên mỗi
+văn bản chỉ tốn thời gian trích xuất, không tốn thời gian khởi động interpreter và import.
+Request được nhận đồng thời (mỗi kết nối một thread) và được xử lý trên một pool worker.
+Với --cache/--cache-file, văn bản đã gặp (cùng nội dung và loại văn bản) được trả kết quả từ
+cache mà không gửi tới worker; file cache dùng chung được với main.py.
+
+API (HTTP, JSON UTF-8):
+    POST /extract  {"text": "...", "doc_type": "Luật", "filename": "..."}  -> kết quả trích xuất
+                   (không có doc_type: loại văn bản được xác định từ phần đầu văn bản)
+    GET  /health   -> trạng thái service
+
+Cách chạy:
+    python server.py --port 8080 --workers 4
+    python server.py --socket /tmp/law-extractor.sock
+    python server.py --cache-file cache/results.sqlite --cache-ttl 86400
+
+    curl -s localhost:8080/extract -d '{"doc_type": "Luật", "text": "..."}'
+    curl -s --unix-socket /tmp/law-extractor.sock http://localhost/extract -d @van_ban.json
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from main import LawDocumentProcessor
+from utils import json_codec
+from utils.result_cache import ResultCache
+
+# Kích thước tối đa của body một request
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class ExtractionService:
+    """
+    Giữ processor đã khởi tạo và thực hiện trích xuất cho các request
+
+    Với workers <= 1, văn bản được xử lý ngay trong thread của request trên một bộ processor
+    dùng chung. Với workers > 1, văn bản được gửi tới process pool; mỗi worker giữ bộ
+    processor riêng, khởi tạo một lần.
+
+    Văn bản luôn được chuẩn hóa Unicode và xác định loại trong process chính. Cache (nếu có)
+    nằm trước cả hai cách xử lý và dùng cùng khóa với main.py (result_cache_key), nên một file
+    cache dùng chung với CLI được tra trúng từ cả hai phía.
+    """
+
+    def __init__(self, workers: int = 1, cache_options: Optional[Dict[str, Any]] = None):
+        self.workers = max(1, workers)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.processor: Optional[LawDocumentProcessor] = None
+        # Tham số của ResultCache, None để luôn trích xuất
+        self.cache_options = cache_options
+        self.cache: Optional[ResultCache] = None
+        self.requests = 0
+        self.errors = 0
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        """Khởi tạo processor (hoặc các worker) trước khi nhận request"""
+        # Processor của process chính chuẩn hóa, xác định loại văn bản và tra cache; chỉ khởi tạo
+        # các processor con khi tự trích xuất (workers <= 1)
+        self.processor = LawDocumentProcessor(cache_options=self.cache_options)
+        self.cache = self.processor.cache
+        if self.workers <= 1:
+            self.processor.processors.load_all()
+            return
+
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        # Gửi đồng thời một task mỗi worker để mọi worker được tạo và khởi tạo xong ngay
+        for future in [self.executor.submit(_ping_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def extract(self, text: str, doc_type: Optional[str] = None, filename: str = '') -> Dict[str, Any]:
+        """Trích xuất một văn bản; ValueError nếu loại văn bản không được hỗ trợ hoặc không xác định được"""
+        try:
+            extract = None if self.executor is None else self._extract_in_pool
+            result = self.processor.process_text(text, doc_type, filename, extract)
+        except Exception:
+            self._count(error=True)
+            raise
+        self._count(error=False)
+        return result
+
+    def _extract_in_pool(self, doc_type: str, text: str, filename: str) -> Dict[str, Any]:
+        return self.executor.submit(_extract_in_worker, doc_type, text, filename).result()
+
+    def _count(self, error: bool):
+        with self._stats_lock:
+            self.requests += 1
+            self.errors += error
+
+    def health(self) -> Dict[str, Any]:
+        """Trạng thái service"""
+        health = {
+            "status": "ok",
+            "workers": self.workers,
+            "so_request": self.requests,
+            "so_loi": self.errors,
+        }
+        if self.cache is not None:
+            health["cache"] = self.cache.stats()
+        return health
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+
+
+# Mỗi worker của process pool giữ một bộ processor riêng, khởi tạo một lần
+_worker_processor: Optional[LawDocumentProcessor] = None
+
+
+def _init_worker():
+    """Khởi tạo toàn bộ processor cho worker"""
+    global _worker_processor
+    _worker_processor = LawDocumentProcessor()
+    _worker_processor.processors.load_all()
+
+
+def _ping_worker() -> int:
+    return os.getpid()
+
+
+def _extract_in_worker(doc_type: str, text: str, filename: str) -> Dict[str, Any]:
+    """Trích xuất một văn bản đã chuẩn hóa Unicode bên trong worker"""
+    return _worker_processor.processors[doc_type].process(text, filename)
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """Xử lý request HTTP của service"""
+
+    protocol_version = "HTTP/1.1"
+    service: ExtractionService = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.service.health())
+        else:
+            self._send_json(404, {"error": f"Không tìm thấy: {self.path}"})
+
+    def do_POST(self):
+        # Body luôn được đọc hết trước khi trả lời để kết nối còn dùng lại được
+        status, body = self._read_request()
+        if self.path != '/extract':
+            self._send_json(404, {"error": f"Không tìm thấy: {self.path}"})
+            return
+        if status != 200:
+            self._send_json(status, body)
+            return
+
+        try:
+            result = self.service.extract(body['text'], body.get('doc_type'), body.get('filename') or '')
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            print(f"❌ Lỗi khi xử lý văn bản: {str(e)}")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, result)
+
+    def _read_request(self) -> Tuple[int, Dict[str, Any]]:
+        """Đọc và kiểm tra body JSON, trả về (mã HTTP, body hoặc thông báo lỗi)"""
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self.close_connection = True
+            return 411, {"error": "Thiếu Content-Length"}
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            return 413, {"error": f"Request quá lớn (tối đa {MAX_REQUEST_BYTES} byte)"}
+
+        try:
+            body = json_codec.loads(self.rfile.read(length).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return 400, {"error": f"JSON không hợp lệ: {str(e)}"}
+        if not isinstance(body, dict):
+            return 400, {"error": "Body phải là một object JSON"}
+        if not isinstance(body.get('text'), str):
+            return 400, {"error": "Thiếu trường 'text' (chuỗi)"}
+        if body.get('doc_type') is not None and not isinstance(body['doc_type'], str):
+            return 400, {"error": "Trường 'doc_type' phải là chuỗi"}
+        return 200, body
+
+    def _send_json(self, status: int, data: Dict[str, Any]):
+        payload = json_codec.dumps(data, compact=True).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self) -> str:
+        # Kết nối qua Unix socket không có địa chỉ IP
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        # Không in mỗi request ra console
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server trên Unix socket, mỗi kết nối một thread"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # BaseHTTPRequestHandler cần server_name và server_port
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def create_server(service: ExtractionService, host: str = '127.0.0.1', port: int = 8080,
+                  socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """Tạo server HTTP (TCP hoặc Unix socket) phục vụ service"""
+    # Header và body được ghi thành hai lần gửi; với TCP phải tắt Nagle để không bị trễ ~40ms
+    handler = type('Handler', (ExtractionRequestHandler,),
+                   {'service': service, 'disable_nagle_algorithm': not socket_path})
+    if socket_path:
+        Path(socket_path).unlink(missing_ok=True)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service trích xuất văn bản pháp luật")
+    parser.add_argument("--host", default="127.0.0.1", help="Địa chỉ lắng nghe (mặc định: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Cổng lắng nghe (mặc định: 8080)")
+    parser.add_argument("--socket", help="Lắng nghe trên Unix socket thay vì TCP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Số process xử lý song song (1: xử lý ngay trong thread của request)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Cache kết quả theo nội dung văn bản: request trùng nội dung không trích xuất lại")
+    parser.add_argument("--cache-file",
+                        help="Lưu cache kết quả trên đĩa (SQLite), dùng lại sau khi khởi động lại (bật --cache)")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="Số kết quả tối đa giữ trong bộ nhớ (mặc định: 1024)")
+    parser.add_argument("--cache-disk-size", type=int, default=100_000,
+                        help="Số kết quả tối đa lưu trong --cache-file (mặc định: 100000)")
+    parser.add_argument("--cache-ttl", type=float,
+                        help="Số giây một kết quả trong cache còn được dùng (mặc định: không hết hạn)")
+    args = parser.parse_args()
+
+    cache_options = None
+    if args.cache or args.cache_file:
+        cache_options = {"db_path": args.cache_file, "max_entries": args.cache_size,
+                         "max_disk_entries": args.cache_disk_size, "ttl": args.cache_ttl}
+    service = ExtractionService(args.workers, cache_options)
+    service.start()
+    server = create_server(service, args.host, args.port, args.socket)
+    address = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"🚀 Service đang chạy tại {address} ({service.workers} worker)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Đang dừng service...")
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket:
+            Path(args.socket).unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -2,10 +2,25 @@
 Utilities cho xử lý file JSON
 """
 
+import io
 import json
 import os
+import tarfile
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Iterator, NamedTuple, Optional, Tuple
+
+from . import json_codec
+
+# Bộ đệm ghi của file shard (JSONL, tar): gom nhiều văn bản nhỏ thành ít lần ghi xuống đĩa
+SHARD_BUFFER_BYTES = 1024 * 1024
+
+
+class OutputLocation(NamedTuple):
+    """Vị trí một bản ghi đã ghi: file, file bên trong tar (nếu có), vị trí byte trong shard (nếu có)"""
+    path: str
+    member: Optional[str] = None
+    offset: Optional[int] = None
 
 
 def read_json_file(file_path: Path) -> Optional[Dict[str, Any]]:
@@ -18,14 +33,72 @@ def read_json_file(file_path: Path) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary chứa nội dung file hoặc None nếu có lỗi
     """
+    content = read_text_file(file_path)
+    return parse_json_text(content, file_path) if content is not None else None
+
+
+def read_text_file(file_path: Path) -> Optional[str]:
+    """
+    Đọc nội dung file văn bản UTF-8 (bước đọc của read_json_file)
+    
+    Returns:
+        Nội dung file hoặc None nếu có lỗi
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            return f.read()
+    except (FileNotFoundError, UnicodeDecodeError) as e:
+        print(f"Lỗi đọc file {file_path}: {str(e)}")
+        return None
+
+
+def parse_json_text(content: str, file_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Parse nội dung JSON đã đọc từ file_path (bước parse của read_json_file)
+    
+    Returns:
+        Dictionary chứa nội dung file hoặc None nếu có lỗi
+    """
+    try:
+        return json_codec.loads(content)
+    except json.JSONDecodeError as e:
         print(f"Lỗi đọc file {file_path}: {str(e)}")
         return None
 
 
+def encode_json(data: Any, indent: Optional[int] = None, compact: bool = False) -> str:
+    """
+    Chuỗi JSON của dữ liệu (giữ nguyên tiếng Việt, không escape), mã hóa bằng backend của
+    json_codec
+    
+    Args:
+        data: Dữ liệu cần mã hóa
+        indent: Số space để indent JSON (None: trên một dòng)
+        compact: Ghi gọn nhất có thể (không indent, không khoảng trắng sau ',' và ':')
+    """
+    return json_codec.dumps(data, indent, compact)
+
+
+def _temp_path(file_path: Path) -> Path:
+    """File tạm cùng thư mục với file đích, để đổi tên là thao tác nguyên tử"""
+    return file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+
+
+def write_text_atomic(text: str, file_path: Path):
+    """
+    Ghi nội dung ra file tạm rồi đổi tên thành file đích, nên file đích không bao giờ ở
+    trạng thái ghi dở (hoặc là nội dung cũ, hoặc là nội dung mới đầy đủ)
+    """
+    temp_path = _temp_path(file_path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
 def write_json_file(data: Any, file_path: str, indent: int = 2) -> bool:
     """
     Ghi dữ liệu ra file JSON
@@ -43,14 +116,253 @@ def write_json_file(data: Any, file_path: str, indent: int = 2) -> bool:
         file_path = Path(file_path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=indent)
+        write_text_atomic(encode_json(data, indent), file_path)
         return True
     except Exception as e:
         print(f"Lỗi ghi file {file_path}: {str(e)}")
         return False
 
 
+def iter_jsonl_lines(file_path: Path) -> Iterator[Tuple[int, str]]:
+    """
+    Đọc lần lượt từng dòng của file JSONL mà không nạp cả file vào bộ nhớ
+    
+    Args:
+        file_path: Đường dẫn đến file JSONL
+        
+    Yields:
+        (số thứ tự dòng, nội dung dòng) cho các dòng không rỗng
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, line
+    except (FileNotFoundError, UnicodeDecodeError) as e:
+        print(f"Lỗi đọc file {file_path}: {str(e)}")
+
+
+class _ShardWriter:
+    """
+    Nền chung của các writer ghi mọi bản ghi của một loại văn bản vào một file shard
+    
+    Shard được ghi qua bộ đệm lớn vào file tạm và chỉ được đổi tên thành file đích khi đóng,
+    nên shard của lần chạy trước được giữ nguyên nếu lần chạy này bị dừng giữa chừng. Ở chế
+    độ append, bản ghi được ghi thẳng vào cuối file đích.
+    """
+    
+    def __init__(self, file_path: str, append: bool = False):
+        """
+        Args:
+            file_path: Đường dẫn file đầu ra
+            append: Ghi tiếp vào cuối file thay vì ghi đè
+        """
+        self.file_path = Path(file_path)
+        self.location = self.file_path
+        self.count = 0
+        self._append = append
+        self._file = None
+        self._temp_path: Optional[Path] = None
+    
+    def _open_file(self):
+        """Mở file (file tạm nếu không phải append), chỉ gọi khi có bản ghi đầu tiên"""
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._append:
+            target = self.file_path
+        else:
+            target = self._temp_path = _temp_path(self.file_path)
+        self._file = open(target, 'ab' if self._append else 'wb', buffering=SHARD_BUFFER_BYTES)
+    
+    def _finish(self):
+        """Ghi phần kết thúc của shard (nếu định dạng có) trước khi đóng file"""
+        pass
+    
+    def close(self):
+        """Đóng file và đổi tên file tạm thành file đích"""
+        if self._file is None:
+            return
+        try:
+            self._finish()
+            self._file.close()
+        except BaseException:
+            self.discard()
+            raise
+        self._file = None
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.file_path)
+            self._temp_path = None
+    
+    def discard(self):
+        """Bỏ các bản ghi chưa được commit, file đích giữ nguyên như trước"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            self._temp_path.unlink(missing_ok=True)
+            self._temp_path = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class JsonlWriter(_ShardWriter):
+    """Ghi lần lượt từng bản ghi ra file JSONL (mỗi dòng một JSON, không indent)"""
+    
+    def __init__(self, file_path: str, append: bool = False, compact: bool = False):
+        """
+        Args:
+            file_path: Đường dẫn file đầu ra
+            append: Ghi tiếp vào cuối file thay vì ghi đè
+            compact: Bỏ khoảng trắng sau ',' và ':'
+        """
+        super().__init__(file_path, append)
+        self.compact = compact
+        self._offset = 0
+    
+    def write(self, record: Any, source: str = '') -> OutputLocation:
+        """Ghi một bản ghi, file chỉ được mở khi có bản ghi đầu tiên"""
+        line = (encode_json(record, compact=self.compact) + '\n').encode('utf-8')
+        if self._file is None:
+            self._open_file()
+            self._offset = self._file.tell()
+        location = OutputLocation(str(self.file_path), offset=self._offset)
+        self._file.write(line)
+        self._offset += len(line)
+        self.count += 1
+        return location
+
+
+class TarShardWriter(_ShardWriter):
+    """
+    Ghi mỗi bản ghi thành một file JSON trong một file tar (<loại văn bản>.tar)
+    
+    Giải nén shard (tar -xf) cho đúng cấu trúc thư mục của định dạng mỗi văn bản một file.
+    """
+    
+    def __init__(self, file_path: str, member_dir: str, name_func: Callable[[Any, str], str],
+                 indent: int = 2, compact: bool = False, append: bool = False):
+        """
+        Args:
+            file_path: Đường dẫn file tar đầu ra
+            member_dir: Thư mục của các file JSON bên trong tar
+            name_func: Hàm trả về tên file cho một bản ghi (và nguồn của nó)
+            indent: Số space để indent JSON
+            compact: Ghi JSON gọn (không indent)
+            append: Thêm vào cuối file tar đã có thay vì ghi đè
+        """
+        super().__init__(file_path, append)
+        self.member_dir = member_dir
+        self.name_func = name_func
+        self.indent = indent
+        self.compact = compact
+        self._tar: Optional[tarfile.TarFile] = None
+        self._mtime = int(time.time())
+    
+    def _open_file(self):
+        if self._append and self.file_path.exists():
+            # Thêm vào tar đã có: tarfile cần đọc để tìm vị trí kết thúc
+            self._file = open(self.file_path, 'r+b', buffering=SHARD_BUFFER_BYTES)
+            self._tar = tarfile.open(fileobj=self._file, mode='a', format=tarfile.GNU_FORMAT)
+            return
+        super()._open_file()
+        # Định dạng GNU ghi tên file tiếng Việt trực tiếp (UTF-8), không cần thêm một header
+        # mở rộng cho mỗi file như định dạng PAX mặc định
+        self._tar = tarfile.open(fileobj=self._file, mode='w', format=tarfile.GNU_FORMAT)
+    
+    def write(self, record: Any, source: str = '') -> OutputLocation:
+        """Ghi một bản ghi, file chỉ được mở khi có bản ghi đầu tiên"""
+        data = encode_json(record, self.indent, self.compact).encode('utf-8')
+        info = tarfile.TarInfo(f"{self.member_dir}/{self.name_func(record, source)}")
+        info.size = len(data)
+        info.mtime = self._mtime
+        info.mode = 0o644
+        if self._tar is None:
+            self._open_file()
+        self._tar.addfile(info, io.BytesIO(data))
+        self.count += 1
+        # Nội dung file nằm ngay trước vị trí hiện tại, được đệm tới bội số của 512 byte
+        offset = self._tar.offset - (len(data) + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE * tarfile.BLOCKSIZE
+        return OutputLocation(str(self.file_path), info.name, offset)
+    
+    def _finish(self):
+        self._tar.close()
+        self._tar = None
+    
+    def discard(self):
+        self._tar = None
+        super().discard()
+
+
+class JsonDirectoryWriter:
+    """Ghi mỗi bản ghi ra một file JSON riêng trong cùng một thư mục"""
+    
+    def __init__(self, directory: str, name_func: Callable[[Any, str], str], indent: int = 2,
+                 compact: bool = False):
+        """
+        Args:
+            directory: Thư mục đầu ra
+            name_func: Hàm trả về tên file cho một bản ghi (và nguồn của nó)
+            indent: Số space để indent JSON
+            compact: Ghi JSON gọn (không indent)
+        """
+        self.directory = Path(directory)
+        self.location = self.directory
+        self.name_func = name_func
+        self.indent = indent
+        self.compact = compact
+        self.count = 0
+        self._created = False
+    
+    def write(self, record: Any, source: str = '') -> Optional[OutputLocation]:
+        """
+        Ghi một bản ghi (đổi tên nguyên tử), thư mục chỉ được tạo một lần khi có bản ghi đầu tiên
+        
+        Returns:
+            Vị trí file đã ghi, None nếu có lỗi
+        """
+        if not self._created:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._created = True
+        file_path = self.directory / self.name_func(record, source)
+        try:
+            write_text_atomic(encode_json(record, self.indent, self.compact), file_path)
+        except Exception as e:
+            print(f"Lỗi ghi file {file_path}: {str(e)}")
+            return None
+        self.count += 1
+        return OutputLocation(str(file_path))
+    
+    def close(self):
+        """Không giữ tài nguyên mở, có để cùng giao diện với các writer shard"""
+        pass
+    
+    def __enter__(self) -> 'JsonDirectoryWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _list_files(directory: Path, suffix: str) -> List[Path]:
+    """Lấy các file có phần mở rộng cho trước trong thư mục, đã sắp xếp"""
+    files = []
+    
+    if not directory.exists() or not directory.is_dir():
+        return files
+    
+    for file_path in directory.iterdir():
+        if file_path.is_file() and file_path.suffix.lower() == suffix:
+            files.append(file_path)
+    
+    return sorted(files)
+
+
 def get_all_json_files(directory: Path) -> List[Path]:
     """
     Lấy tất cả file JSON trong thư mục
@@ -61,16 +373,20 @@ def get_all_json_files(directory: Path) -> List[Path]:
     Returns:
         Danh sách đường dẫn các file JSON
     """
-    json_files = []
-    
-    if not directory.exists() or not directory.is_dir():
-        return json_files
-    
-    for file_path in directory.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() == '.json':
-            json_files.append(file_path)
+    return _list_files(directory, '.json')
+
+
+def get_all_jsonl_files(directory: Path) -> List[Path]:
+    """
+    Lấy tất cả file JSONL (shard nhiều văn bản) trong thư mục
     
-    return sorted(json_files)
+    Args:
+        directory: Thư mục cần quét
+        
+    Returns:
+        Danh sách đường dẫn các file JSONL
+    """
+    return _list_files(directory, '.jsonl')
 
 
 def create_output_directory(base_dir: str, sub_dir: str = "") -> Path:
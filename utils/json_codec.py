@@ -0,0 +1,119 @@
+"""
+Mã hóa/giải mã JSON qua backend có thể thay thế
+
+Mặc định dùng orjson để mã hóa nếu được cài (nhanh gần gấp đôi khi ghi kết quả indent=2),
+nếu không thì dùng module json của thư viện chuẩn. Giải mã luôn dùng thư viện chuẩn: với văn
+bản tiếng Việt dài và ít escape, json.loads nhanh hơn orjson.loads nhiều lần (đo bằng
+benchmarks/bench_json.py). Đầu ra của mọi backend giống hệt
+json.dumps(ensure_ascii=False): backend nhanh chỉ được dùng cho các dạng nó cho kết quả y hệt
+(indent=2 và dạng gọn), các dạng còn lại và dữ liệu backend nhanh không mã hóa được (số nguyên
+lớn hơn 64 bit, khóa không phải chuỗi) đi qua thư viện chuẩn. Khác biệt duy nhất là số thực:
+orjson viết 1e16 thay vì 1e+16 và ghi NaN/Infinity thành null (kết quả trích xuất không có số thực).
+
+Chọn backend bằng biến môi trường LAW_EXTRACTOR_JSON (auto, orjson, stdlib) hoặc set_codec().
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Type, Union
+
+# Biến môi trường chọn backend; process worker kế thừa nên dùng cùng backend
+CODEC_ENV = "LAW_EXTRACTOR_JSON"
+
+
+class StdlibCodec:
+    """Backend dùng module json của thư viện chuẩn"""
+
+    name = "stdlib"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Giải mã JSON (chuỗi hoặc bytes UTF-8), json.JSONDecodeError nếu không hợp lệ"""
+        return json.loads(data)
+
+    def dumps(self, data: Any, indent: Optional[int] = None, compact: bool = False) -> str:
+        """
+        Mã hóa dữ liệu thành JSON (giữ nguyên tiếng Việt, không escape)
+
+        Args:
+            indent: Số space để indent JSON (None: trên một dòng)
+            compact: Ghi gọn nhất có thể (không indent, không khoảng trắng sau ',' và ':')
+        """
+        if compact:
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(data, ensure_ascii=False, indent=indent)
+
+
+class OrjsonCodec(StdlibCodec):
+    """
+    Backend mã hóa bằng orjson, dùng thư viện chuẩn cho các trường hợp orjson không cho cùng
+    kết quả; giải mã bằng thư viện chuẩn (nhanh hơn với chuỗi dài)
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, data: Any, indent: Optional[int] = None, compact: bool = False) -> str:
+        if compact:
+            option = 0
+        elif indent == 2:
+            option = self._orjson.OPT_INDENT_2
+        else:
+            # orjson không có dạng một dòng với khoảng trắng sau ',' và ':'
+            return super().dumps(data, indent, compact)
+        try:
+            return self._orjson.dumps(data, option=option).decode('utf-8')
+        except TypeError:
+            return super().dumps(data, indent, compact)
+
+
+CODECS: Dict[str, Type[StdlibCodec]] = {
+    "orjson": OrjsonCodec,
+    "stdlib": StdlibCodec,
+}
+
+
+def create_codec(name: str = "auto") -> StdlibCodec:
+    """
+    Tạo backend theo tên; "auto" chọn orjson nếu được cài, không thì thư viện chuẩn
+
+    Raises:
+        ValueError: Tên backend không hợp lệ
+        ImportError: Backend được chọn chưa được cài
+    """
+    if name == "auto":
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return StdlibCodec()
+    if name not in CODECS:
+        raise ValueError(f"Không hỗ trợ JSON backend: {name} (chọn một trong: auto, {', '.join(CODECS)})")
+    return CODECS[name]()
+
+
+_codec = create_codec(os.environ.get(CODEC_ENV) or "auto")
+
+
+def get_codec() -> StdlibCodec:
+    """Backend đang dùng"""
+    return _codec
+
+
+def set_codec(name: str) -> StdlibCodec:
+    """Đổi backend cho cả process (và các worker được tạo sau đó)"""
+    global _codec
+    _codec = create_codec(name)
+    os.environ[CODEC_ENV] = name
+    return _codec
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Giải mã JSON bằng backend đang dùng"""
+    return _codec.loads(data)
+
+
+def dumps(data: Any, indent: Optional[int] = None, compact: bool = False) -> str:
+    """Mã hóa JSON bằng backend đang dùng (cùng tham số với StdlibCodec.dumps)"""
+    return _codec.dumps(data, indent, compact)
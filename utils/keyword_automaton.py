@@ -0,0 +1,93 @@
+"""
+Automaton Aho-Corasick tìm đồng thời nhiều từ khóa trong một lần duyệt văn bản
+
+Chi phí tìm kiếm tỷ lệ với độ dài văn bản (cộng số kết quả), không phụ thuộc số từ khóa.
+Bảng chuyển trạng thái được tính sẵn (đã đi theo liên kết fail), nên mỗi ký tự chỉ cần
+một hoặc hai lần tra dict.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class KeywordAutomaton:
+    """Tập từ khóa (kèm giá trị) được biên dịch thành automaton, tìm phân biệt hoa thường"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        """
+        Args:
+            keywords: Các cặp (từ khóa, giá trị trả về khi gặp từ khóa)
+        """
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, Any]]] = [[]]
+        for keyword, value in keywords:
+            if not keyword:
+                raise ValueError("Từ khóa không được rỗng")
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((len(keyword), value))
+
+        # Duyệt theo chiều rộng: liên kết fail của một trạng thái luôn ở mức nông hơn
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [{} for _ in goto]
+        order = deque(goto[0].values())
+        while order:
+            state = order.popleft()
+            # Trạng thái chỉ giữ các chuyển khác với gốc; ký tự không có trong bảng quay về gốc
+            if fail[state]:
+                delta[state].update(delta[fail[state]])
+                outputs[state] = outputs[state] + outputs[fail[state]]
+            for char, next_state in goto[state].items():
+                fail[next_state] = self._fail_target(goto, fail, fail[state], char, state)
+                order.append(next_state)
+            delta[state].update(goto[state])
+
+        self._root = goto[0]
+        self._delta = delta
+        self._outputs = [tuple(sorted(output, key=lambda item: -item[0])) for output in outputs]
+
+    @staticmethod
+    def _fail_target(goto: List[Dict[str, int]], fail: List[int], state: int, char: str,
+                     parent: int) -> int:
+        """Trạng thái dài nhất là hậu tố thực sự của (parent + char)"""
+        if parent == 0:
+            return 0
+        while True:
+            next_state = goto[state].get(char)
+            if next_state is not None:
+                return next_state
+            if state == 0:
+                return 0
+            state = fail[state]
+
+    def iter_matches(self, text: str, start: int = 0,
+                     end: Optional[int] = None) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Mọi lần xuất hiện của các từ khóa trong text[start:end], kể cả chồng lấn nhau
+
+        Yields:
+            (vị trí bắt đầu, vị trí kết thúc, giá trị), theo thứ tự vị trí kết thúc tăng dần;
+            cùng vị trí kết thúc thì từ khóa dài hơn trước
+        """
+        root = self._root
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        if end is None:
+            end = len(text)
+        for pos in range(start, end):
+            char = text[pos]
+            next_state = delta[state].get(char)
+            if next_state is None:
+                next_state = root.get(char, 0)
+            state = next_state
+            if outputs[state]:
+                for length, value in outputs[state]:
+                    yield pos + 1 - length, pos + 1, value
@@ -0,0 +1,131 @@
+"""
+Manifest các văn bản đã xử lý, dùng cho chế độ xử lý tăng dần (incremental)
+
+Mỗi nguồn đầu vào (file JSON hoặc một dòng của shard JSONL) được lưu cùng phiên bản
+processor, hash nội dung và kết quả trích xuất. Lần chạy sau chỉ trích xuất lại những
+nguồn mới hoặc đã thay đổi; kết quả của các nguồn còn lại được lấy từ manifest.
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from . import json_codec
+
+
+class Fingerprint(NamedTuple):
+    """Dấu vân tay của một nguồn đầu vào"""
+    version: str
+    content_hash: str
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+
+
+class ManifestEntry(NamedTuple):
+    """Một bản ghi trong manifest"""
+    source: str
+    doc_type: str
+    fingerprint: Fingerprint
+    result: Dict[str, Any]
+
+
+def hash_bytes(data: bytes) -> str:
+    """Hash nội dung dùng trong manifest"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ProcessingManifest:
+    """Manifest lưu trong SQLite, tra cứu theo nguồn mà không phải nạp toàn bộ vào bộ nhớ"""
+
+    # Số bản ghi thay đổi giữa hai lần commit
+    COMMIT_EVERY = 1000
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Đường dẫn file SQLite của manifest
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = time.time_ns()
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " source TEXT PRIMARY KEY,"
+            " doc_type TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " size INTEGER,"
+            " mtime_ns INTEGER,"
+            " result TEXT NOT NULL,"
+            " run_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_doc_type ON entries (doc_type, run_id)")
+
+    def get(self, source: str) -> Optional[ManifestEntry]:
+        """Bản ghi của một nguồn, None nếu nguồn chưa từng được xử lý"""
+        row = self._conn.execute(
+            "SELECT doc_type, version, content_hash, size, mtime_ns, result FROM entries WHERE source = ?",
+            (source,)
+        ).fetchone()
+        if row is None:
+            return None
+        doc_type, version, content_hash, size, mtime_ns, result = row
+        return ManifestEntry(source, doc_type, Fingerprint(version, content_hash, size, mtime_ns), json_codec.loads(result))
+
+    def record(self, source: str, doc_type: str, fingerprint: Fingerprint, result: Dict[str, Any]):
+        """Lưu (hoặc cập nhật) kết quả mới trích xuất của một nguồn"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, doc_type, fingerprint.version, fingerprint.content_hash,
+             fingerprint.size, fingerprint.mtime_ns, json_codec.dumps(result, compact=True), self.run_id)
+        )
+        self._changed()
+
+    def touch(self, source: str, fingerprint: Fingerprint):
+        """Đánh dấu một nguồn không đổi đã được gặp lại trong lần chạy này"""
+        self._conn.execute(
+            "UPDATE entries SET size = ?, mtime_ns = ?, run_id = ? WHERE source = ?",
+            (fingerprint.size, fingerprint.mtime_ns, self.run_id, source)
+        )
+        self._changed()
+
+    def prune(self, doc_types: Iterable[str]) -> int:
+        """
+        Xóa bản ghi của các nguồn không còn xuất hiện trong lần chạy này
+
+        Args:
+            doc_types: Các loại văn bản đã được quét đầy đủ trong lần chạy này
+
+        Returns:
+            Số bản ghi đã xóa
+        """
+        removed = 0
+        for doc_type in doc_types:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE doc_type = ? AND run_id != ?", (doc_type, self.run_id)
+            )
+            removed += cursor.rowcount
+        self._conn.commit()
+        return removed
+
+    def _changed(self):
+        """Commit định kỳ để không giữ transaction quá lớn"""
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        """Commit và đóng manifest"""
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self) -> 'ProcessingManifest':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
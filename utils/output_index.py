@@ -0,0 +1,130 @@
+"""
+Chỉ mục các kết quả đã ghi ra thư mục đầu ra
+
+Mỗi nguồn đầu vào (file JSON hoặc một dòng của shard JSONL) được lưu cùng loại văn bản, số
+hiệu và vị trí kết quả (file, file bên trong tar, vị trí byte trong shard). Tra cứu theo nguồn
+hoặc theo số hiệu dùng chỉ mục của SQLite, không phải quét thư mục đầu ra hay đọc lại kết quả.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+from .file_utils import OutputLocation
+
+
+class IndexEntry(NamedTuple):
+    """Một bản ghi trong chỉ mục"""
+    source: str
+    doc_type: str
+    so_hieu: Optional[str]
+    location: OutputLocation
+
+
+class OutputIndex:
+    """Chỉ mục lưu trong SQLite, ghi cùng lúc với kết quả"""
+
+    # Số bản ghi thay đổi giữa hai lần commit
+    COMMIT_EVERY = 1000
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Đường dẫn file SQLite của chỉ mục (đường dẫn kết quả được lưu tương đối
+                với thư mục chứa file này)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = time.time_ns()
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            " source TEXT PRIMARY KEY,"
+            " doc_type TEXT NOT NULL,"
+            " so_hieu TEXT,"
+            " path TEXT NOT NULL,"
+            " member TEXT,"
+            " byte_offset INTEGER,"
+            " run_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outputs_so_hieu ON outputs (so_hieu)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outputs_doc_type ON outputs (doc_type, run_id)")
+
+    def get(self, source: str) -> Optional[IndexEntry]:
+        """Kết quả của một nguồn, None nếu nguồn chưa có kết quả"""
+        row = self._conn.execute(
+            "SELECT source, doc_type, so_hieu, path, member, byte_offset FROM outputs WHERE source = ?",
+            (source,)
+        ).fetchone()
+        return self._entry(row) if row is not None else None
+
+    def find(self, so_hieu: str) -> List[IndexEntry]:
+        """Các kết quả có số hiệu cho trước (nhiều văn bản có thể trùng số hiệu)"""
+        rows = self._conn.execute(
+            "SELECT source, doc_type, so_hieu, path, member, byte_offset FROM outputs WHERE so_hieu = ?"
+            " ORDER BY source",
+            (so_hieu,)
+        ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def __contains__(self, source: object) -> bool:
+        return self._conn.execute("SELECT 1 FROM outputs WHERE source = ?", (source,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM outputs").fetchone()[0]
+
+    def _entry(self, row) -> IndexEntry:
+        source, doc_type, so_hieu, path, member, offset = row
+        return IndexEntry(source, doc_type, so_hieu, OutputLocation(path, member, offset))
+
+    def record(self, source: str, doc_type: str, so_hieu: Optional[str], location: OutputLocation):
+        """Lưu (hoặc cập nhật) vị trí kết quả của một nguồn"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (source, doc_type, so_hieu, location.path, location.member, location.offset, self.run_id)
+        )
+        self._changed()
+
+    def touch(self, source: str):
+        """Đánh dấu kết quả của một nguồn vẫn còn (không ghi lại) trong lần chạy này"""
+        self._conn.execute("UPDATE outputs SET run_id = ? WHERE source = ?", (self.run_id, source))
+        self._changed()
+
+    def prune(self, doc_types: Iterable[str]) -> int:
+        """
+        Xóa bản ghi của các nguồn không còn xuất hiện trong lần chạy này
+
+        Args:
+            doc_types: Các loại văn bản đã được ghi lại đầy đủ trong lần chạy này
+
+        Returns:
+            Số bản ghi đã xóa
+        """
+        removed = 0
+        for doc_type in doc_types:
+            cursor = self._conn.execute(
+                "DELETE FROM outputs WHERE doc_type = ? AND run_id != ?", (doc_type, self.run_id)
+            )
+            removed += cursor.rowcount
+        self._conn.commit()
+        return removed
+
+    def _changed(self):
+        """Commit định kỳ để không giữ transaction quá lớn"""
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        """Commit và đóng chỉ mục"""
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self) -> 'OutputIndex':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
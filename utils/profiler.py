@@ -0,0 +1,162 @@
+"""
+Đo thời gian xử lý theo loại văn bản: từng phương thức extract_* của processor và các bước
+đọc file, parse JSON, ghi kết quả (chế độ --profile của main.py)
+
+Thời gian của mỗi mục là thời gian riêng (self time): thời gian của các extractor được gọi
+lồng bên trong đã được trừ ra, nên tổng các mục bằng tổng thời gian đã đo.
+"""
+
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from . import json_codec
+
+# Mục ứng với thời gian riêng của process() (ngoài các extractor)
+PROCESS = 'process'
+
+
+class Profiler:
+    """Cộng dồn số lần gọi, tổng và lớn nhất của thời gian theo (loại văn bản, mục)"""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, List[float]]] = {}
+        self.started_at = time.perf_counter()
+        # Thời gian của các mục con đang chạy lồng nhau, để tính thời gian riêng
+        self._stack: List[float] = []
+
+    def add(self, doc_type: str, name: str, seconds: float, calls: int = 1,
+            longest: Optional[float] = None):
+        """Ghi nhận thời gian của một mục"""
+        entry = self.stats.setdefault(doc_type, {}).setdefault(name, [0, 0.0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds if longest is None else longest)
+
+    @contextmanager
+    def measure(self, doc_type: str, name: str):
+        """Đo thời gian riêng của khối lệnh"""
+        stack = self._stack
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(doc_type, name, elapsed - stack.pop())
+            if stack:
+                stack[-1] += elapsed
+
+    def _wrap(self, doc_type: str, name: str, method: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            with self.measure(doc_type, name):
+                return method(*args, **kwargs)
+        timed.__wrapped__ = method
+        return timed
+
+    def instrument(self, processor: Any, doc_type: str):
+        """
+        Đo process() và mọi phương thức extract_* của processor
+
+        Phương thức được bọc trên instance, nên lời gọi self.extract_...() bên trong process()
+        cũng được đo; lời gọi super().extract_...() được tính vào phương thức gọi nó.
+        """
+        for name in dir(type(processor)):
+            if name == PROCESS or name.startswith('extract_'):
+                method = getattr(processor, name)
+                if callable(method):
+                    setattr(processor, name, self._wrap(doc_type, name, method))
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Dict[str, List[float]]]:
+        """Số liệu thô (để gửi từ worker về process chính)"""
+        stats = self.stats
+        if reset:
+            self.stats = {}
+        return stats
+
+    def merge(self, stats: Dict[str, Dict[str, List[float]]]):
+        """Gộp số liệu thô của profiler khác"""
+        for doc_type, items in stats.items():
+            for name, (calls, total, longest) in items.items():
+                self.add(doc_type, name, total, calls, longest)
+
+    def report(self) -> Dict[str, Any]:
+        """Báo cáo dạng dict: theo loại văn bản và tổng hợp theo mục"""
+        measured = sum(total for items in self.stats.values() for _, total, _ in items.values())
+
+        def item_report(calls, total, longest):
+            return {
+                "so_lan": calls,
+                "tong_ms": round(total * 1000, 3),
+                "trung_binh_ms": round(total * 1000 / calls, 3) if calls else 0.0,
+                "lon_nhat_ms": round(longest * 1000, 3),
+                "ty_le": round(total / measured, 4) if measured else 0.0,
+            }
+
+        theo_loai = {}
+        theo_muc: Dict[str, List[float]] = {}
+        for doc_type, items in sorted(self.stats.items()):
+            type_total = sum(total for _, total, _ in items.values())
+            theo_loai[doc_type] = {
+                "so_van_ban": items[PROCESS][0] if PROCESS in items else 0,
+                "tong_ms": round(type_total * 1000, 3),
+                "muc": {name: item_report(*items[name])
+                        for name in sorted(items, key=lambda name: items[name][1], reverse=True)},
+            }
+            for name, (calls, total, longest) in items.items():
+                entry = theo_muc.setdefault(name, [0, 0.0, 0.0])
+                entry[0] += calls
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+
+        return {
+            "tong_quan": {
+                "thoi_gian_chay_ms": round((time.perf_counter() - self.started_at) * 1000, 3),
+                "thoi_gian_do_duoc_ms": round(measured * 1000, 3),
+                "so_van_ban": sum(loai["so_van_ban"] for loai in theo_loai.values()),
+            },
+            "theo_muc": {name: item_report(*theo_muc[name])
+                         for name in sorted(theo_muc, key=lambda name: theo_muc[name][1], reverse=True)},
+            "theo_loai": theo_loai,
+        }
+
+    @staticmethod
+    def format_table(report: Dict[str, Any], limit: int = 0) -> str:
+        """Bảng text các mục tốn thời gian nhất theo (loại văn bản, mục)"""
+        rows = [(doc_type, name, item)
+                for doc_type, loai in report["theo_loai"].items()
+                for name, item in loai["muc"].items()]
+        rows.sort(key=lambda row: row[2]["tong_ms"], reverse=True)
+        if limit:
+            rows = rows[:limit]
+
+        header = ("Loại văn bản", "Mục", "Số lần", "Tổng (ms)", "TB (ms)", "Max (ms)", "%")
+        lines = [(doc_type, name, str(item["so_lan"]), f"{item['tong_ms']:.1f}",
+                  f"{item['trung_binh_ms']:.3f}", f"{item['lon_nhat_ms']:.1f}",
+                  f"{item['ty_le'] * 100:.1f}")
+                 for doc_type, name, item in rows]
+        widths = [max(len(row[i]) for row in [header] + lines) for i in range(len(header))]
+
+        def format_row(row):
+            return "  ".join(cell.ljust(width) if i < 2 else cell.rjust(width)
+                             for i, (cell, width) in enumerate(zip(row, widths)))
+
+        tong_quan = report["tong_quan"]
+        output = [format_row(header), "  ".join("-" * width for width in widths)]
+        output.extend(format_row(row) for row in lines)
+        output.append("")
+        output.append(f"Văn bản: {tong_quan['so_van_ban']}, thời gian đo được: "
+                      f"{tong_quan['thoi_gian_do_duoc_ms']:.1f} ms, thời gian chạy: "
+                      f"{tong_quan['thoi_gian_chay_ms']:.1f} ms")
+        return "\n".join(output)
+
+    def write(self, json_file: str, table_file: str) -> Dict[str, Any]:
+        """Ghi báo cáo JSON và bảng text đầy đủ, trả về báo cáo"""
+        report = self.report()
+        Path(json_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(json_file, 'w', encoding='utf-8') as f:
+            f.write(json_codec.dumps(report, indent=2))
+        with open(table_file, 'w', encoding='utf-8') as f:
+            f.write(self.format_table(report) + "\n")
+        return report
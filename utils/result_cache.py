@@ -0,0 +1,200 @@
+"""
+Cache kết quả trích xuất theo nội dung văn bản
+
+Khóa gồm hash nội dung văn bản, loại văn bản và phiên bản processor: cùng một văn bản được yêu
+cầu lại (dù từ nguồn khác) thì lấy kết quả đã có, không trích xuất lại; khi code processor thay
+đổi thì phiên bản đổi theo nên kết quả cũ không còn được dùng.
+
+Cache có hai tầng:
+    - LRU trong bộ nhớ, giới hạn số kết quả
+    - SQLite trên đĩa (tùy chọn), dùng chung giữa các lần chạy và giữa các process
+
+Kết quả lưu quá TTL (nếu có) được coi như chưa có và bị xóa khi gặp lại.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import json_codec
+
+# Khóa cache: (hash nội dung, loại văn bản, phiên bản processor)
+CacheKey = Tuple[str, str, str]
+
+# Các chỉ số hit/miss của cache
+STAT_NAMES = ("hits", "disk_hits", "misses", "expired", "evictions")
+
+
+class ResultCache:
+    """Cache LRU trong bộ nhớ, có thể kèm bản lưu trên đĩa (SQLite)"""
+
+    # Số kết quả được lưu giữa hai lần dọn các mục vượt giới hạn trên đĩa
+    EVICT_EVERY = 100
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 1024,
+                 max_disk_entries: int = 100_000, ttl: Optional[float] = None):
+        """
+        Args:
+            db_path: Đường dẫn file SQLite của cache (None để chỉ cache trong bộ nhớ)
+            max_entries: Số kết quả tối đa giữ trong bộ nhớ (0 để chỉ dùng cache trên đĩa)
+            max_disk_entries: Số kết quả tối đa lưu trên đĩa
+            ttl: Thời gian (giây) một kết quả còn được dùng (None để không hết hạn)
+        """
+        self.max_entries = max(0, max_entries)
+        self.max_disk_entries = max(1, max_disk_entries)
+        self.ttl = ttl
+        # Khóa -> (kết quả dạng JSON gọn, thời điểm lưu); lưu chuỗi để người dùng kết quả
+        # không sửa được nội dung trong cache
+        self._entries: 'OrderedDict[CacheKey, Tuple[str, float]]' = OrderedDict()
+        self._stats = dict.fromkeys(STAT_NAMES, 0)
+        self._stored = 0
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit: kết quả vừa lưu được các process khác thấy ngay
+            self._conn = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " content_hash TEXT NOT NULL,"
+                " doc_type TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " used_at REAL NOT NULL,"
+                " PRIMARY KEY (content_hash, doc_type, version))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)")
+
+    @staticmethod
+    def make_key(text: str, doc_type: str, version: str) -> CacheKey:
+        """Khóa cache của một văn bản"""
+        content_hash = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+        return content_hash, doc_type, version
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Kết quả đã lưu (bản sao mới mỗi lần gọi), None nếu chưa có hoặc đã hết hạn"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[1], now):
+                    self._remove(key)
+                    self._count('expired', 'misses')
+                    return None
+                self._entries.move_to_end(key)
+                self._count('hits')
+                return json_codec.loads(entry[0])
+
+            row = None
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, stored_at FROM results"
+                    " WHERE content_hash = ? AND doc_type = ? AND version = ?", key
+                ).fetchone()
+            if row is None:
+                self._count('misses')
+                return None
+            if self._expired(row[1], now):
+                self._remove(key)
+                self._count('expired', 'misses')
+                return None
+            # Thời điểm dùng trên đĩa chỉ được cập nhật khi lấy từ đĩa, không phải mỗi lần hit
+            # trong bộ nhớ; đủ để dọn các kết quả lâu không dùng
+            self._conn.execute(
+                "UPDATE results SET used_at = ? WHERE content_hash = ? AND doc_type = ? AND version = ?",
+                (now, *key)
+            )
+            self._remember(key, row[0], row[1])
+            self._count('hits', 'disk_hits')
+            return json_codec.loads(row[0])
+
+    def put(self, key: CacheKey, result: Dict[str, Any]):
+        """Lưu kết quả trích xuất của một văn bản"""
+        payload = json_codec.dumps(result, compact=True)
+        now = time.time()
+        with self._lock:
+            self._remember(key, payload, now)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", (*key, payload, now, now)
+            )
+            self._stored += 1
+            if self._stored >= self.EVICT_EVERY:
+                self._evict_disk(now)
+                self._stored = 0
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        """
+        Số lần hit/miss của cache
+
+        Args:
+            reset: Đặt lại các chỉ số về 0 (worker gửi số liệu từng lô về process chính)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            if reset:
+                self._stats = dict.fromkeys(STAT_NAMES, 0)
+        return stats
+
+    def merge(self, stats: Dict[str, int]):
+        """Cộng số liệu hit/miss từ cache của process khác (worker)"""
+        with self._lock:
+            for name, value in stats.items():
+                self._stats[name] += value
+
+    def _remember(self, key: CacheKey, payload: str, stored_at: float):
+        """Đưa kết quả vào LRU trong bộ nhớ, loại kết quả lâu không dùng nhất nếu vượt giới hạn"""
+        if not self.max_entries:
+            return
+        self._entries[key] = (payload, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._count('evictions')
+
+    def _remove(self, key: CacheKey):
+        """Xóa một kết quả khỏi cả bộ nhớ và đĩa"""
+        self._entries.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute(
+                "DELETE FROM results WHERE content_hash = ? AND doc_type = ? AND version = ?", key
+            )
+
+    def _evict_disk(self, now: float):
+        """Xóa trên đĩa các kết quả đã hết hạn và các kết quả lâu không dùng vượt giới hạn"""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl,))
+        cursor = self._conn.execute(
+            "DELETE FROM results WHERE rowid IN"
+            " (SELECT rowid FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+        self._stats['evictions'] += max(cursor.rowcount, 0)
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _count(self, *names: str):
+        for name in names:
+            self._stats[name] += 1
+
+    def close(self):
+        """Đóng cache trên đĩa"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
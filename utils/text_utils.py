@@ -3,7 +3,38 @@ Utilities cho xử lý và làm sạch text
 """
 
 import re
-from typing import List, Dict, Optional
+import unicodedata
+from functools import lru_cache
+from typing import List, Dict, Iterator, Optional, Pattern, Tuple
+
+from .keyword_automaton import KeywordAutomaton
+
+# Tên người Việt Nam: các từ viết hoa chữ cái đầu, cách nhau bởi khoảng trắng
+_PERSON_NAME = re.compile(r'^([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ]+(?:\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ]+)*)$')
+
+
+# Dạng chuẩn Unicode của văn bản khi đưa vào processor; pattern và từ khóa được biên dịch ở
+# cùng dạng này
+UNICODE_FORM = 'NFC'
+
+
+def normalize_unicode(text: str) -> Tuple[str, bool]:
+    """
+    Đưa văn bản về dạng chuẩn Unicode (NFC: chữ có dấu ở dạng dựng sẵn), làm một lần khi đọc
+    văn bản đầu vào
+    
+    OCR/pdftotext có thể cho chữ có dấu ở dạng tổ hợp (chữ cái + dấu rời, NFD), không khớp
+    với các lớp ký tự tiếng Việt trong pattern. Văn bản đã ở dạng NFC (hầu hết) chỉ qua bước
+    kiểm tra nhanh, không bị sao chép.
+    
+    Args:
+        text: Văn bản đầu vào
+        
+    Returns:
+        (văn bản ở dạng NFC, văn bản có bị chuẩn hóa không)
+    """
+    normalized = unicodedata.normalize(UNICODE_FORM, text)
+    return normalized, normalized is not text and normalized != text
 
 
 def clean_text(text: str) -> str:
@@ -19,12 +50,9 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Loại bỏ các ký tự không cần thiết
-    text = re.sub(r'\s+', ' ', text)  # Thay nhiều space thành 1
-    text = re.sub(r'\n\s*\n', '\n', text)  # Loại bỏ dòng trống thừa
-    text = text.strip()
-    
-    return text
+    # Thay mỗi chuỗi khoảng trắng (kể cả xuống dòng, dòng trống) thành 1 space, bỏ khoảng
+    # trắng hai đầu: cùng kết quả với re.sub(r'\s+', ' ', text).strip() nhưng không qua regex
+    return ' '.join(text.split())
 
 
 def normalize_whitespace(text: str) -> str:
@@ -64,18 +92,8 @@ def extract_lines_containing(text: str, keywords: List[str], case_sensitive: boo
     Returns:
         Danh sách các dòng chứa từ khóa
     """
-    lines = text.split('\n')
-    matching_lines = []
-    
-    flags = 0 if case_sensitive else re.IGNORECASE
-    
-    for line in lines:
-        for keyword in keywords:
-            if re.search(re.escape(keyword), line, flags):
-                matching_lines.append(line.strip())
-                break
-    
-    return matching_lines
+    matcher = _keyword_matcher(tuple(keywords), case_sensitive)
+    return [text[start:end].strip() for start, end in matcher.iter_lines(text)]
 
 
 def remove_empty_lines(text: str) -> str:
@@ -124,38 +142,27 @@ def split_into_sections(text: str, section_markers: List[str]) -> Dict[str, str]
     Returns:
         Dictionary với key là marker và value là nội dung phần đó
     """
+    # Marker rỗng luôn khớp nhưng không được coi là marker (như vòng lặp cũ), nên các marker
+    # đứng sau nó không bao giờ được chọn
+    if '' in section_markers:
+        section_markers = section_markers[:section_markers.index('')]
+    matcher = _keyword_matcher(tuple(section_markers), False)
     sections = {}
     current_section = None
-    current_content = []
+    content_start = 0
     
-    lines = text.split('\n')
-    
-    for line in lines:
-        line_stripped = line.strip()
-        
-        # Kiểm tra xem có phải marker mới không
-        found_marker = None
-        for marker in section_markers:
-            if re.search(re.escape(marker), line_stripped, re.IGNORECASE):
-                found_marker = marker
-                break
+    for line_start, line_end, index in matcher.iter_marker_lines(text):
+        # Lưu section trước đó (nếu giữa hai marker có ít nhất một dòng)
+        if current_section is not None and line_start > content_start:
+            sections[current_section] = text[content_start:line_start - 1].strip()
         
-        if found_marker:
-            # Lưu section trước đó
-            if current_section and current_content:
-                sections[current_section] = '\n'.join(current_content).strip()
-            
-            # Bắt đầu section mới
-            current_section = found_marker
-            current_content = []
-        else:
-            # Thêm vào content của section hiện tại
-            if current_section:
-                current_content.append(line)
+        # Bắt đầu section mới
+        current_section = section_markers[index]
+        content_start = line_end + 1
     
     # Lưu section cuối cùng
-    if current_section and current_content:
-        sections[current_section] = '\n'.join(current_content).strip()
+    if current_section is not None and content_start <= len(text):
+        sections[current_section] = text[content_start:].strip()
     
     return sections
 
@@ -210,15 +217,146 @@ def extract_person_name(text: str) -> Optional[str]:
     Returns:
         Tên người hoặc None nếu không tìm thấy
     """
-    # Pattern cho tên người Việt Nam
-    pattern = r'^([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ]+(?:\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ]+)*)$'
-    
-    lines = text.strip().split('\n')
-    
     # Tìm từ cuối lên để lấy tên người ký
-    for i in range(len(lines) - 1, -1, -1):
-        line = lines[i].strip()
-        if line and re.match(pattern, line):
+    for line in iter_lines_reversed(text):
+        line = line.strip()
+        if line and _PERSON_NAME.match(line):
             return line
     
-    return None
\ No newline at end of file
+    return None
+
+
+def iter_lines_reversed(text: str) -> Iterator[str]:
+    """
+    Sinh các dòng của văn bản từ dòng cuối lên, không tách toàn bộ văn bản
+    
+    Cho cùng các dòng như reversed(text.split('\\n')) nhưng chỉ đọc tới dòng nơi gọi dừng lại,
+    nên tìm chữ ký ở cuối văn bản dài chỉ chạm tới vài KB cuối
+    
+    Args:
+        text: Văn bản cần duyệt
+        
+    Returns:
+        Iterator các dòng (chưa strip), dòng cuối trước
+    """
+    end = len(text)
+    while end >= 0:
+        start = text.rfind('\n', 0, end) + 1
+        yield text[start:end]
+        end = start - 1
+
+
+# Các nhóm ký tự (sau khi chuyển chữ thường) mà re.IGNORECASE coi là tương đương nhưng
+# str.lower() không đưa về cùng một ký tự; mỗi ký tự được đổi về ký tự đại diện của nhóm
+_CASE_EQUIVALENTS = str.maketrans({
+    'ı': 'i', 'ſ': 's', 'μ': 'µ', 'ι': '\u0345', '\u1fbe': '\u0345', '\u1fd3': '\u0390',
+    '\u1fe3': '\u03b0', 'ϐ': 'β', 'ϵ': 'ε', 'ϑ': 'θ', 'ϰ': 'κ', 'ϖ': 'π', 'ϱ': 'ρ', 'σ': 'ς',
+    'ϕ': 'φ', 'ᲀ': 'в', 'ᲁ': 'д', 'ᲂ': 'о', 'ᲃ': 'с', 'ᲄ': 'т', 'ᲅ': 'т', 'ᲆ': 'ъ', 'ᲇ': 'ѣ',
+    'ꙋ': 'ᲈ', 'ẛ': 'ṡ', 'ﬆ': 'ﬅ',
+})
+_CASE_EQUIVALENT_CHARS = re.compile('[' + ''.join(chr(code) for code in _CASE_EQUIVALENTS) + ']')
+
+
+def fold_case(text: str) -> str:
+    """
+    Bản chữ thường của text, cùng độ dài và vị trí với bản gốc, coi là bằng nhau các ký tự mà
+    re.IGNORECASE coi là tương đương (dùng chung cho KeywordFilter và DocumentScan)
+    """
+    # str.lower() đổi İ thành hai ký tự (làm lệch vị trí); re.IGNORECASE coi İ là i
+    if 'İ' in text:
+        text = text.replace('İ', 'i')
+    folded = text.lower()
+    if _CASE_EQUIVALENT_CHARS.search(folded):
+        folded = folded.translate(_CASE_EQUIVALENTS)
+    return folded
+
+
+def _alternation_pattern(words: List[str]) -> str:
+    """
+    Regex khớp một trong các từ, được phân nhánh theo tiền tố chung (trie) để mỗi vị trí chỉ
+    phải thử một nhánh cho mỗi ký tự, không phải thử lần lượt từng từ
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        parts = []
+        # Chuỗi ký tự không phân nhánh được nối trực tiếp, chỉ đệ quy ở điểm phân nhánh
+        while len(node) == 1 and '' not in node:
+            char, node = next(iter(node.items()))
+            parts.append(re.escape(char))
+        if node:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            group = '(?:' + '|'.join(branches) + ')'
+            parts.append(group + '?' if '' in node else group)
+        return ''.join(parts)
+
+    return build(trie)
+
+
+class _KeywordMatcher:
+    """Tìm các dòng chứa một trong các từ khóa bằng một regex biên dịch sẵn cho cả tập từ khóa"""
+
+    def __init__(self, keywords: Tuple[str, ...], case_sensitive: bool):
+        self.case_sensitive = case_sensitive
+        # Từ khóa rỗng khớp mọi dòng; từ khóa chứa xuống dòng không bao giờ nằm trọn trong một dòng
+        self.matches_all = '' in keywords
+        # Từ khóa được so với văn bản đã chuẩn hóa Unicode nên cũng phải ở cùng dạng
+        self.keywords = [(index, self._fold(unicodedata.normalize(UNICODE_FORM, keyword)))
+                         for index, keyword in enumerate(keywords) if keyword and '\n' not in keyword]
+        words = sorted({keyword for _, keyword in self.keywords})
+        self.pattern: Optional[Pattern] = re.compile(_alternation_pattern(words)) if words else None
+        self._automaton: Optional[KeywordAutomaton] = None
+
+    def _fold(self, text: str) -> str:
+        return text if self.case_sensitive else fold_case(text)
+
+    def iter_lines(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(đầu dòng, cuối dòng) của các dòng chứa ít nhất một từ khóa, theo thứ tự"""
+        if self.matches_all:
+            start = 0
+            for line in text.split('\n'):
+                yield start, start + len(line)
+                start += len(line) + 1
+            return
+        if self.pattern is None:
+            return
+
+        folded = self._fold(text)
+        search = self.pattern.search
+        match = search(folded)
+        while match:
+            line_start = folded.rfind('\n', 0, match.start()) + 1
+            line_end = folded.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(folded)
+            yield line_start, line_end
+            match = search(folded, line_end + 1)
+
+    def iter_marker_lines(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        (đầu dòng, cuối dòng, chỉ số từ khóa) của các dòng mà dòng đã strip chứa từ khóa;
+        chỉ số là của từ khóa đứng đầu danh sách trong số các từ khóa có mặt
+        """
+        if self._automaton is None:
+            self._automaton = KeywordAutomaton((keyword, index) for index, keyword in self.keywords)
+        automaton = self._automaton
+
+        folded = self._fold(text)
+        for line_start, line_end in self.iter_lines(text):
+            line = folded[line_start:line_end]
+            content_start = line_start + len(line) - len(line.lstrip())
+            content_end = line_start + len(line.rstrip())
+            indices = [index for _, _, index in automaton.iter_matches(folded, content_start, content_end)]
+            if indices:
+                yield line_start, line_end, min(indices)
+
+
+@lru_cache(maxsize=128)
+def _keyword_matcher(keywords: Tuple[str, ...], case_sensitive: bool) -> _KeywordMatcher:
+    """Matcher của một tập từ khóa, biên dịch một lần và dùng lại cho các lần gọi sau"""
+    return _KeywordMatcher(keywords, case_sensitive)